@@ -0,0 +1,317 @@
+"""作答统计: 每道题 / 每种题型的作答次数、正确率、平均用时和常见错误答案
+
+    python analytics.py summary [--db quiz.db]
+    python analytics.py top [--order wrong|rate] [--type fill_in] [--min-attempts 3] [--limit 30] [--out top.csv]
+    python analytics.py rebuild
+
+统计表由 attempts 上的触发器在写入作答记录的同一事务中增量更新, 查询只读这几张
+汇总表, 不扫描作答明细。第一次建表时从已有的作答记录回填一次。
+"""
+import sys
+import csv
+import sqlite3
+import argparse
+
+from quiz_engine import TYPE_NAMES
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS question_stats (
+        question_id INTEGER PRIMARY KEY,
+        attempts INTEGER NOT NULL,
+        correct INTEGER NOT NULL,
+        timed INTEGER NOT NULL,         -- 记录了用时的作答次数
+        total_ms INTEGER NOT NULL,
+        last_at TEXT
+    )""",
+    # 按错误次数 / 错误率排序直接走索引 (表达式须与 TOP_ORDERS 中的一致)
+    "CREATE INDEX IF NOT EXISTS idx_question_stats_wrong ON question_stats(attempts - correct)",
+    "CREATE INDEX IF NOT EXISTS idx_question_stats_rate "
+    "ON question_stats(CAST(attempts - correct AS REAL) / attempts, attempts)",
+    """CREATE TABLE IF NOT EXISTS type_stats (
+        type TEXT PRIMARY KEY,
+        attempts INTEGER NOT NULL,
+        correct INTEGER NOT NULL,
+        timed INTEGER NOT NULL,
+        total_ms INTEGER NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS wrong_answers (
+        question_id INTEGER NOT NULL,
+        answer TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (question_id, answer)
+    ) WITHOUT ROWID""",
+]
+
+TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS attempts_stats_ai AFTER INSERT ON attempts BEGIN
+        INSERT INTO question_stats (question_id, attempts, correct, timed, total_ms, last_at)
+        VALUES (new.question_id, 1, new.is_correct, new.elapsed_ms IS NOT NULL,
+                IFNULL(new.elapsed_ms, 0), new.answered_at)
+        ON CONFLICT(question_id) DO UPDATE SET
+            attempts = attempts + 1,
+            correct = correct + excluded.correct,
+            timed = timed + excluded.timed,
+            total_ms = total_ms + excluded.total_ms,
+            last_at = excluded.last_at;
+        INSERT INTO type_stats (type, attempts, correct, timed, total_ms)
+        SELECT type, 1, new.is_correct, new.elapsed_ms IS NOT NULL, IFNULL(new.elapsed_ms, 0)
+        FROM questions WHERE id = new.question_id
+        ON CONFLICT(type) DO UPDATE SET
+            attempts = attempts + 1,
+            correct = correct + excluded.correct,
+            timed = timed + excluded.timed,
+            total_ms = total_ms + excluded.total_ms;
+        INSERT INTO wrong_answers (question_id, answer, count)
+        SELECT new.question_id, new.answer, 1 WHERE new.is_correct = 0 AND new.answer IS NOT NULL
+        ON CONFLICT(question_id, answer) DO UPDATE SET count = count + 1;
+    END""",
+    # 合并重复题 (dedup_index.py merge) 时作答记录改指向保留的题, 统计随之转移
+    """CREATE TRIGGER IF NOT EXISTS attempts_stats_au AFTER UPDATE OF question_id ON attempts
+    WHEN old.question_id != new.question_id BEGIN
+        UPDATE question_stats SET
+            attempts = attempts - 1,
+            correct = correct - old.is_correct,
+            timed = timed - (old.elapsed_ms IS NOT NULL),
+            total_ms = total_ms - IFNULL(old.elapsed_ms, 0)
+        WHERE question_id = old.question_id;
+        DELETE FROM question_stats WHERE question_id = old.question_id AND attempts <= 0;
+        INSERT INTO question_stats (question_id, attempts, correct, timed, total_ms, last_at)
+        VALUES (new.question_id, 1, new.is_correct, new.elapsed_ms IS NOT NULL,
+                IFNULL(new.elapsed_ms, 0), new.answered_at)
+        ON CONFLICT(question_id) DO UPDATE SET
+            attempts = attempts + 1,
+            correct = correct + excluded.correct,
+            timed = timed + excluded.timed,
+            total_ms = total_ms + excluded.total_ms,
+            last_at = MAX(last_at, excluded.last_at);
+        UPDATE wrong_answers SET count = count - 1
+        WHERE old.is_correct = 0 AND question_id = old.question_id AND answer = old.answer;
+        DELETE FROM wrong_answers WHERE question_id = old.question_id AND count <= 0;
+        INSERT INTO wrong_answers (question_id, answer, count)
+        SELECT new.question_id, new.answer, 1 WHERE new.is_correct = 0 AND new.answer IS NOT NULL
+        ON CONFLICT(question_id, answer) DO UPDATE SET count = count + 1;
+    END""",
+]
+
+REBUILD = [
+    "DELETE FROM question_stats",
+    "DELETE FROM type_stats",
+    "DELETE FROM wrong_answers",
+    """INSERT INTO question_stats (question_id, attempts, correct, timed, total_ms, last_at)
+       SELECT question_id, COUNT(*), SUM(is_correct), COUNT(elapsed_ms), IFNULL(SUM(elapsed_ms), 0),
+              MAX(answered_at)
+       FROM attempts GROUP BY question_id""",
+    """INSERT INTO type_stats (type, attempts, correct, timed, total_ms)
+       SELECT q.type, SUM(s.attempts), SUM(s.correct), SUM(s.timed), SUM(s.total_ms)
+       FROM question_stats s JOIN questions q ON q.id = s.question_id GROUP BY q.type""",
+    """INSERT INTO wrong_answers (question_id, answer, count)
+       SELECT question_id, answer, COUNT(*) FROM attempts
+       WHERE is_correct = 0 AND answer IS NOT NULL GROUP BY question_id, answer""",
+]
+
+# 排序方式 -> (排序表达式, 并列时的次序); 过滤条件也用同一表达式, 并列时的次序与索引同向,
+# 查询才会整个走索引, 不对并列的行 (常常是大多数) 再排序
+TOP_ORDERS = {
+    "wrong": ("s.attempts - s.correct", "s.question_id DESC"),
+    "rate": ("CAST(s.attempts - s.correct AS REAL) / s.attempts", "s.attempts DESC, s.question_id DESC"),
+}
+
+
+def ensure_schema(conn):
+    """建统计表和触发器; 统计表是新建的就从已有作答记录回填 (attempts 表须已有 elapsed_ms 列)"""
+    fresh = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'question_stats'").fetchone() is None
+    with conn:
+        for sql in SCHEMA + TRIGGERS:
+            conn.execute(sql)
+        if fresh:
+            for sql in REBUILD:
+                conn.execute(sql)
+
+
+def rebuild(conn):
+    """从作答明细重算全部统计 (手工改过 attempts 或题型时使用)"""
+    with conn:
+        for sql in REBUILD:
+            conn.execute(sql)
+
+
+class QuestionStat:
+    """一道题的统计, 附带最常见的几个错误答案"""
+
+    __slots__ = ("question_id", "type", "question", "attempts", "correct", "timed", "total_ms",
+                 "wrong_answers")
+
+    def __init__(self, question_id, q_type, question, attempts, correct, timed, total_ms):
+        self.question_id = question_id
+        self.type = q_type
+        self.question = question
+        self.attempts = attempts
+        self.correct = correct
+        self.timed = timed
+        self.total_ms = total_ms
+        self.wrong_answers = []     # [(答案, 次数), ...]
+
+    @property
+    def wrong(self):
+        return self.attempts - self.correct
+
+    @property
+    def accuracy(self):
+        return self.correct / self.attempts if self.attempts else 0.0
+
+    @property
+    def mean_seconds(self):
+        return self.total_ms / self.timed / 1000 if self.timed else None
+
+
+class Analytics:
+    """只读汇总表的查询; 每次查询单独开连接, 可在任意线程中使用"""
+
+    WRONG_ANSWERS_SHOWN = 3
+
+    def __init__(self, db_path="quiz.db"):
+        self.db_path = db_path
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        # 旧库还没有统计表时补建并回填
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'question_stats'").fetchone() is None:
+            from attempt_store import ensure_schema as ensure_attempt_schema
+            ensure_attempt_schema(conn)
+        return conn
+
+    def by_type(self):
+        """[(题型, 作答次数, 正确次数, 平均用时秒或 None), ...]"""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT type, attempts, correct, timed, total_ms FROM type_stats "
+                                "ORDER BY attempts DESC").fetchall()
+        finally:
+            conn.close()
+        return [(q_type, attempts, correct, total_ms / timed / 1000 if timed else None)
+                for q_type, attempts, correct, timed, total_ms in rows]
+
+    def by_chapter(self):
+        """[(章号, 作答次数, 正确次数, 平均用时秒或 None), ...]; 章号 0 为未归类
+
+        章节可以重新划分 (exam_paper.py chapters), 不单独维护汇总表, 按题目汇总现算。
+        """
+        conn = self._connect()
+        try:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(questions)")}
+            chapter = "IFNULL(q.chapter, 0)" if "chapter" in columns else "0"
+            rows = conn.execute(
+                f"SELECT {chapter} AS ch, SUM(s.attempts), SUM(s.correct), SUM(s.timed), SUM(s.total_ms) "
+                "FROM question_stats s JOIN questions q ON q.id = s.question_id "
+                "GROUP BY ch ORDER BY ch").fetchall()
+        finally:
+            conn.close()
+        return [(ch, attempts, correct, total_ms / timed / 1000 if timed else None)
+                for ch, attempts, correct, timed, total_ms in rows]
+
+    def top_questions(self, order="wrong", q_type=None, min_attempts=1, limit=50):
+        """最常答错的题: [QuestionStat, ...]"""
+        key, tie = TOP_ORDERS[order]
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT s.question_id, q.type, q.question, s.attempts, s.correct, s.timed, s.total_ms "
+                "FROM question_stats s JOIN questions q ON q.id = s.question_id "
+                f"WHERE {key} > 0 AND s.attempts >= :min_attempts AND (:type IS NULL OR q.type = :type) "
+                f"ORDER BY {key} DESC, {tie} LIMIT :limit",
+                {"min_attempts": min_attempts, "type": q_type, "limit": limit}).fetchall()
+            stats = [QuestionStat(*row) for row in rows]
+            for stat in stats:
+                stat.wrong_answers = conn.execute(
+                    "SELECT answer, count FROM wrong_answers WHERE question_id = ? "
+                    "ORDER BY count DESC, answer LIMIT ?",
+                    (stat.question_id, self.WRONG_ANSWERS_SHOWN)).fetchall()
+        finally:
+            conn.close()
+        return stats
+
+
+def format_seconds(seconds):
+    return "-" if seconds is None else f"{seconds:.1f}s"
+
+
+def format_wrong_answers(pairs):
+    return "  ".join(f"{answer} ×{count}" for answer, count in pairs)
+
+
+# --- 命令行 ---
+
+def cmd_summary(args):
+    analytics = Analytics(args.db)
+    print(f"{'题型':<8}{'作答':>10}{'正确率':>10}{'平均用时':>10}")
+    for q_type, attempts, correct, mean in analytics.by_type():
+        print(f"{TYPE_NAMES.get(q_type, q_type):<8}{attempts:>10}{correct / attempts:>10.1%}"
+              f"{format_seconds(mean):>10}")
+    print(f"\n{'章节':<8}{'作答':>10}{'正确率':>10}{'平均用时':>10}")
+    for chapter, attempts, correct, mean in analytics.by_chapter():
+        name = f"第{chapter}章" if chapter else "未归类"
+        print(f"{name:<8}{attempts:>10}{correct / attempts:>10.1%}{format_seconds(mean):>10}")
+    return 0
+
+
+def cmd_top(args):
+    stats = Analytics(args.db).top_questions(args.order, args.type, args.min_attempts, args.limit)
+    for stat in stats:
+        print(f"{stat.question_id:>8} [{TYPE_NAMES.get(stat.type, stat.type)}] 错 {stat.wrong}/{stat.attempts} "
+              f"({1 - stat.accuracy:.0%})  {format_seconds(stat.mean_seconds)}  {stat.question[:40]}")
+        if stat.wrong_answers:
+            print(f"{'':>10}常见错误: {format_wrong_answers(stat.wrong_answers)}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["question_id", "type", "attempts", "wrong", "accuracy", "mean_seconds",
+                             "wrong_answers", "question"])
+            for stat in stats:
+                mean = stat.mean_seconds
+                writer.writerow([stat.question_id, stat.type, stat.attempts, stat.wrong,
+                                 round(stat.accuracy, 4), "" if mean is None else round(mean, 1),
+                                 format_wrong_answers(stat.wrong_answers), stat.question])
+    return 0
+
+
+def cmd_rebuild(args):
+    conn = sqlite3.connect(args.db)
+    try:
+        from attempt_store import ensure_schema as ensure_attempt_schema
+        ensure_attempt_schema(conn)
+        rebuild(conn)
+        count = conn.execute("SELECT COUNT(*) FROM question_stats").fetchone()[0]
+    finally:
+        conn.close()
+    print(f"已重算 {count} 道题的统计")
+    return 0
+
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default="quiz.db", help="SQLite 数据库路径")
+    parser = argparse.ArgumentParser(description="作答统计")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("summary", parents=[common], help="按题型和章节汇总")
+
+    top = commands.add_parser("top", parents=[common], help="最常答错的题目")
+    top.add_argument("--order", choices=sorted(TOP_ORDERS), default="wrong", help="按错误次数或错误率排序")
+    top.add_argument("--type", help="只看某种题型, 如 fill_in")
+    top.add_argument("--min-attempts", type=int, default=1, help="至少作答过几次")
+    top.add_argument("--limit", type=int, default=30)
+    top.add_argument("--out", help="结果写成 CSV")
+
+    commands.add_parser("rebuild", parents=[common], help="从作答明细重算统计")
+
+    args = parser.parse_args(argv)
+    handler = {"summary": cmd_summary, "top": cmd_top, "rebuild": cmd_rebuild}[args.command]
+    try:
+        return handler(args)
+    except (OSError, sqlite3.Error) as e:
+        print(f"统计失败: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+import time
+
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+                               QAbstractItemView, QHeaderView, QComboBox, QSpinBox, QPushButton, QTabWidget,
+                               QWidget)
+from PySide6.QtCore import Qt
+
+from analytics import format_seconds, format_wrong_answers
+from quiz_engine import TYPE_NAMES
+
+# 排序方式: (显示名称, Analytics.top_questions 的 order)
+TOP_ORDERS = [
+    ("按错误次数", "wrong"),
+    ("按错误率", "rate"),
+]
+
+TYPE_FILTERS = [
+    ("全部题型", None),
+    ("选择题", "single_choice"),
+    ("判断题", "true_false"),
+    ("填空题", "fill_in"),
+]
+
+QUESTION_COLUMNS = ["题目 id", "题型", "作答", "答错", "正确率", "平均用时", "常见错误答案", "题目"]
+SUMMARY_COLUMNS = ["作答", "正确率", "平均用时"]
+
+TOP_LIMIT = 100
+
+
+def make_table(columns):
+    table = QTableWidget(0, len(columns))
+    table.setHorizontalHeaderLabels(columns)
+    table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    table.setSelectionBehavior(QAbstractItemView.SelectRows)
+    table.verticalHeader().hide()
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+    table.horizontalHeader().setStretchLastSection(True)
+    return table
+
+
+def fill_table(table, rows):
+    table.setRowCount(len(rows))
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            item = QTableWidgetItem(str(value))
+            if isinstance(value, (int, float)):
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            table.setItem(r, c, item)
+
+
+def summary_rows(rows, name_of):
+    return [(name_of(key), attempts, f"{correct / attempts:.1%}", format_seconds(mean))
+            for key, attempts, correct, mean in rows]
+
+
+class AnalyticsDialog(QDialog):
+    """作答统计: 最常答错的题目、分题型和分章节的正确率; 只读汇总表, 打开不扫描作答明细"""
+
+    def __init__(self, analytics, on_jump_question, on_review=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("作答统计")
+        self.resize(900, 600)
+        self.analytics = analytics
+        self.on_jump_question = on_jump_question
+        self.on_review = on_review
+        self.stats = []
+
+        layout = QVBoxLayout(self)
+        self.tabs = QTabWidget()
+        layout.addWidget(self.tabs)
+
+        # --- 题目 ---
+        page = QWidget()
+        page_layout = QVBoxLayout(page)
+        filter_layout = QHBoxLayout()
+        self.order_box = QComboBox()
+        for name, _ in TOP_ORDERS:
+            self.order_box.addItem(name)
+        self.type_box = QComboBox()
+        for name, _ in TYPE_FILTERS:
+            self.type_box.addItem(name)
+        self.min_attempts = QSpinBox()
+        self.min_attempts.setRange(1, 1000)
+        self.min_attempts.setPrefix("至少作答 ")
+        self.min_attempts.setSuffix(" 次")
+        for widget in (self.order_box, self.type_box):
+            widget.currentIndexChanged.connect(self.load_top)
+        self.min_attempts.valueChanged.connect(self.load_top)
+        filter_layout.addWidget(self.order_box)
+        filter_layout.addWidget(self.type_box)
+        filter_layout.addWidget(self.min_attempts)
+        filter_layout.addStretch()
+        self.info_label = QLabel("")
+        self.info_label.setStyleSheet("color: #555;")
+        filter_layout.addWidget(self.info_label)
+        page_layout.addLayout(filter_layout)
+
+        self.top_table = make_table(QUESTION_COLUMNS)
+        self.top_table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.top_table.cellDoubleClicked.connect(self.jump_to_row)
+        page_layout.addWidget(self.top_table)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.btn_review = QPushButton("🔁 选中的题加入间隔复习")
+        self.btn_review.setEnabled(on_review is not None)
+        self.btn_review.clicked.connect(self.review_selected)
+        button_layout.addWidget(self.btn_review)
+        btn_jump = QPushButton("跳转到题目")
+        btn_jump.clicked.connect(lambda: self.jump_to_row(self.top_table.currentRow()))
+        button_layout.addWidget(btn_jump)
+        page_layout.addLayout(button_layout)
+        self.tabs.addTab(page, "最常答错")
+
+        # --- 题型 / 章节 ---
+        self.type_table = make_table(["题型"] + SUMMARY_COLUMNS)
+        self.tabs.addTab(self.type_table, "按题型")
+        self.chapter_table = make_table(["章节"] + SUMMARY_COLUMNS)
+        self.tabs.addTab(self.chapter_table, "按章节")
+        self.chapters_loaded = False
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+
+        self.load_top()
+        fill_table(self.type_table, summary_rows(self.analytics.by_type(),
+                                                 lambda q_type: TYPE_NAMES.get(q_type, q_type)))
+
+    def load_top(self):
+        started = time.perf_counter()
+        self.stats = self.analytics.top_questions(
+            order=TOP_ORDERS[self.order_box.currentIndex()][1],
+            q_type=TYPE_FILTERS[self.type_box.currentIndex()][1],
+            min_attempts=self.min_attempts.value(),
+            limit=TOP_LIMIT)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        fill_table(self.top_table, [
+            (s.question_id, TYPE_NAMES.get(s.type, s.type), s.attempts, s.wrong, f"{s.accuracy:.0%}",
+             format_seconds(s.mean_seconds), format_wrong_answers(s.wrong_answers), s.question[:60])
+            for s in self.stats])
+        self.info_label.setText(f"{len(self.stats)} 道 ({elapsed_ms:.1f} ms)")
+
+    def on_tab_changed(self, index):
+        # 分章节统计要按题目现算, 切到这一页时才查询
+        if self.tabs.widget(index) is self.chapter_table and not self.chapters_loaded:
+            self.chapters_loaded = True
+            fill_table(self.chapter_table, summary_rows(self.analytics.by_chapter(),
+                                                        lambda ch: f"第{ch}章" if ch else "未归类"))
+
+    def selected_ids(self):
+        rows = sorted({index.row() for index in self.top_table.selectionModel().selectedRows()})
+        return [self.stats[row].question_id for row in rows]
+
+    def review_selected(self):
+        ids = self.selected_ids()
+        if not ids:
+            self.info_label.setText("请先选中题目")
+            return
+        added = self.on_review(ids)
+        self.info_label.setText(f"已加入复习队列 {added} 道 (已在队列中的 {len(ids) - added} 道保持原排期)")
+
+    def jump_to_row(self, row, column=0):
+        if 0 <= row < len(self.stats):
+            self.on_jump_question(self.stats[row].question_id)
+            self.close()
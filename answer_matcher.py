@@ -0,0 +1,243 @@
+"""填空题答案匹配: 标准答案在加载时编译成规范形式的集合, 判分只做集合查找
+
+规范化规则:
+  * NFKC (全角转半角)、忽略大小写、空白和标点; 负号 "-"、分数线 "/" 和数字中的小数点保留;
+    数字之间的空格和逗号也保留 ("6 4" 不是 64, "1,00" 不是 100), 只有合乎三位分节的
+    千位分隔符会去掉 ("1,000" 即 1000);
+  * 数值等价: 64 / 2^6 / 2**6 / 40H / 0x40 / 0b1000000 / 1000000(2) 视为同一个值,
+    1/2 与 0.5 也相等; 数值在去标点之前解析, 所以 -1 不等于 1, 1/2 不等于 12;
+    有前导零的整数 (010) 不按数值比较; 单独的 b/B 后缀不当作二进制 (10B 是 10 字节),
+    二进制须写 0b 前缀或 (2)、B₂ 后缀;
+  * 常见术语的中英文等价写法, 见 EQUIVALENTS;
+  * 多空答案按 "、" 分空, 逐空比较; 用户也可以用逗号、分号等分隔,
+    或者把各空连写在一起。单空答案总是整体比较, 不拆分用户答案。
+
+自检: python answer_matcher.py [--db quiz.db]
+"""
+import re
+import sys
+import sqlite3
+import argparse
+import unicodedata
+from fractions import Fraction
+from functools import lru_cache
+
+# 多空答案的分隔符 (标准答案只用 "、")
+_BLANK_SPLIT_RE = re.compile(r'[、,，;；/|]+')
+# 数字之间的小数点和逗号要保留, 其余标点去掉
+_LONE_DOT_RE = re.compile(r'(?<!\d)[.,]|[.,](?!\d)')
+# 三位分节的千位分隔符: 1,000 / 12,345,678
+_THOUSANDS_RE = re.compile(r'(?<![\d.,])\d{1,3}(?:,\d{3})+(?![\d,])')
+_SPACE_RE = re.compile(r'\s+')
+
+# 规范文本里保留的标点: 负号和分数线
+_KEPT_PUNCT = "-/"
+
+# 以下数值写法作用于 compact_text (未去标点), 符号由 numeric_value 单独处理
+_INT = r'(?:0|[1-9]\d*)'        # 不接受前导零
+_DECIMAL_RE = re.compile(_INT + r'(?:\.\d+)?')
+_FRACTION_RE = re.compile(f'({_INT})/({_INT})')
+_HEX_RE = re.compile(r'0x([0-9a-f]+)|([0-9][0-9a-f]*)h')
+# B₂ 经 NFKC 后是 "b2"
+_BIN_RE = re.compile(r'0b([01]+)|([01]+)(?:\(2\)|b2)|\(([01]+)\)2')
+_POWER_RE = re.compile(r'(\d+)(?:\^|\*\*|的)(\d+)(?:次方|次幂)?')
+MAX_EXPONENT = 64
+
+# 同一概念的不同写法, 同组内任意写法互相等价
+EQUIVALENTS = [
+    ("直接存储器存取", "dma"),
+    ("精简指令集计算机", "risc"),
+    ("复杂指令集计算机", "cisc"),
+    ("超大规模集成电路", "vlsi"),
+    ("动态随机存取器", "动态随机存储器", "dram"),
+    ("静态随机存储器", "sram"),
+    ("电可擦除可编程只读存储器", "eeprom", "e2prom"),
+    ("中断驱动方式", "中断方式"),
+    ("通道方式", "通道"),
+]
+
+
+def _space(m):
+    # 数字之间的空白压成一个空格, 其余去掉
+    text, start, end = m.string, m.start(), m.end()
+    return " " if 0 < start and end < len(text) and text[start - 1].isdigit() and text[end].isdigit() else ""
+
+
+def compact_text(text):
+    """NFKC + 小写 + 去空白 (数字之间的除外) + 去千位分隔符, 标点保留 (数值在这一步之后解析)"""
+    text = unicodedata.normalize("NFKC", str(text)).lower().replace("\u2212", "-")
+    text = _THOUSANDS_RE.sub(lambda m: m.group().replace(",", ""), text)
+    return _SPACE_RE.sub(_space, text)
+
+
+def canonical_text(text):
+    """compact_text + 去标点; 负号、分数线和数字之间的小数点、逗号保留"""
+    text = _LONE_DOT_RE.sub("", compact_text(text))
+    return "".join(ch for ch in text
+                   if ch in ".," or ch in _KEPT_PUNCT or unicodedata.category(ch)[0] != "P")
+
+
+def numeric_value(text):
+    """compact_text 的结果 -> 数值 (Fraction); 不是数值写法时返回 None"""
+    sign = -1 if text[:1] == "-" else 1
+    if text[:1] in "+-":
+        text = text[1:]
+    m = _DECIMAL_RE.fullmatch(text)
+    if m:
+        return sign * Fraction(text)
+    m = _FRACTION_RE.fullmatch(text)
+    if m and int(m.group(2)) != 0:
+        return sign * Fraction(int(m.group(1)), int(m.group(2)))
+    m = _HEX_RE.fullmatch(text)
+    if m:
+        return sign * Fraction(int(m.group(1) or m.group(2), 16))
+    m = _BIN_RE.fullmatch(text)
+    if m:
+        return sign * Fraction(int(m.group(1) or m.group(2) or m.group(3), 2))
+    m = _POWER_RE.fullmatch(text)
+    if m and int(m.group(2)) <= MAX_EXPONENT:
+        return sign * Fraction(int(m.group(1)) ** int(m.group(2)))
+    return None
+
+
+_EQUIVALENT_KEYS = {}
+for _group in EQUIVALENTS:
+    _keys = frozenset(canonical_text(word) for word in _group)
+    for _key in _keys:
+        _EQUIVALENT_KEYS[_key] = _keys
+
+
+def blank_keys(text):
+    """单个空的全部可接受键: 规范文本、等价写法, 以及数值键 '#值'"""
+    canon = canonical_text(text)
+    keys = {canon}
+    keys.update(_EQUIVALENT_KEYS.get(canon, ()))
+    value = numeric_value(compact_text(text))
+    if value is not None:
+        keys.add(f"#{value}")
+    return frozenset(keys)
+
+
+@lru_cache(maxsize=65536)
+def user_blanks(user_answer):
+    """用户答案 -> (各空的键集合, ...), 以及整个答案的键集合; 批量阅卷时同样的答案只处理一次
+
+    "/" 既是分空符又是分数线, 所以 "1/2" 既拆成两空, 整体上也是数值 1/2。
+    """
+    parts = [p for p in _BLANK_SPLIT_RE.split(str(user_answer)) if p.strip()]
+    if len(parts) <= 1:
+        # 没有分隔符时也允许用空格分空, 如 "23 52"
+        parts = str(user_answer).split() or [""]
+    return tuple(blank_keys(p) for p in parts), blank_keys(user_answer)
+
+
+class CompiledAnswer:
+    """编译后的填空题标准答案"""
+
+    __slots__ = ("blanks", "joined")
+
+    def __init__(self, answer):
+        parts = [p for p in str(answer).split("、") if p.strip()] or [str(answer)]
+        self.blanks = tuple(blank_keys(p) for p in parts)
+        # 各空连写 ("010010") 也算对
+        self.joined = "".join(canonical_text(p) for p in parts) if len(parts) > 1 else None
+
+    def matches(self, user_answer):
+        blanks, whole = user_blanks(user_answer)
+        if self.joined is None:
+            # 单空题整体比较, 用户答案里的空格、分数线不当作分空 ("IT 资源"、"1/2")
+            return bool(whole & self.blanks[0])
+        if len(blanks) == len(self.blanks):
+            if all(accepted & given for accepted, given in zip(self.blanks, blanks)):
+                return True
+        return self.joined in whole
+
+
+class AnswerMatcher:
+    """按题目 id 缓存编译结果, 每道题的标准答案只编译一次"""
+
+    def __init__(self):
+        self.compiled = {}
+
+    def get(self, question_id, answer):
+        compiled = self.compiled.get(question_id)
+        if compiled is None:
+            compiled = self.compiled[question_id] = CompiledAnswer(answer)
+        return compiled
+
+    def matches(self, question_id, answer, user_answer):
+        return self.get(question_id, answer).matches(user_answer)
+
+
+# --- 自检 ---
+
+# (标准答案, 用户答案, 是否应判对)
+SELF_CHECKS = [
+    ("64", "2^6", True),
+    ("64", "2**6", True),
+    ("64", "40H", True),
+    ("64", "0x40", True),
+    ("64", "0b1000000", True),
+    ("64", "1000000(2)", True),
+    ("10", "1010B₂", True),
+    ("0.5", "1/2", True),
+    ("1/2", "0.5", True),
+    ("1/2", "1/2", True),
+    ("-1", "-1", True),
+    ("-1", "－1", True),
+    ("23、52", "23, 52", True),
+    ("0、1、0、0、1、0", "010010", True),
+    ("DMA", "直接存储器存取", True),
+    ("IT资源", "IT 资源", True),
+    # 去标点之前要先解析符号和分数, 单独的 b/B 不是二进制
+    ("-1", "1", False),
+    ("1", "-1", False),
+    ("1/2", "12", False),
+    ("12", "1/2", False),
+    ("a-b-c", "abc", False),
+    ("2", "10B", False),
+    ("2", "10b", False),
+    # 数字之间的空格、不合三位分节的逗号和前导零都不能凑出数值
+    ("64", "6 4", False),
+    ("100", "1,00", False),
+    ("10", "010", False),
+    ("1000", "1,000", True),
+]
+
+
+def self_check(db_path=None):
+    """返回不通过的条目列表; 给定 db_path 时还检查题库里每个填空题答案都能匹配自身"""
+    failures = []
+    for answer, user_answer, expected in SELF_CHECKS:
+        if CompiledAnswer(answer).matches(user_answer) != expected:
+            failures.append(f"{answer!r} vs {user_answer!r}: 应判{'对' if expected else '错'}")
+    if db_path:
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute("SELECT id, answer FROM questions "
+                                "WHERE type IN ('fill_in', 'fill_in_the_blank')").fetchall()
+        finally:
+            conn.close()
+        for qid, answer in rows:
+            if not CompiledAnswer(answer).matches(answer):
+                failures.append(f"题目 {qid}: 答案 {answer!r} 不匹配自身")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="填空题答案匹配规则自检")
+    parser.add_argument("--db", default="quiz.db", help="SQLite 数据库路径; 为空时只跑内置用例")
+    args = parser.parse_args(argv)
+    try:
+        failures = self_check(args.db)
+    except sqlite3.Error as e:
+        print(f"读取题库失败: {e}", file=sys.stderr)
+        return 1
+    for failure in failures:
+        print(failure)
+    print(f"自检完成: {len(failures)} 项不通过")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+import sqlite3
+import datetime
+import threading
+import queue
+
+import analytics
+from perf_trace import tracer
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS attempts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id INTEGER NOT NULL,
+        question_id INTEGER NOT NULL,
+        answer TEXT,
+        is_correct INTEGER NOT NULL,
+        answered_at TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_attempts_session ON attempts(session_id, question_id)",
+]
+
+INSERT_ATTEMPT = ("INSERT INTO attempts (session_id, question_id, answer, is_correct, answered_at, elapsed_ms) "
+                  "VALUES (?, ?, ?, ?, ?, ?)")
+
+
+def ensure_schema(conn):
+    for sql in SCHEMA:
+        conn.execute(sql)
+    # 按试卷作答的会话记录试卷 id (见 exam_paper.py), 旧库补上该列
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+    if "paper_id" not in columns:
+        conn.execute("ALTER TABLE sessions ADD COLUMN paper_id INTEGER")
+    # 作答用时 (毫秒), 旧记录为 NULL
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(attempts)")}
+    if "elapsed_ms" not in columns:
+        conn.execute("ALTER TABLE attempts ADD COLUMN elapsed_ms INTEGER")
+    conn.commit()
+    # 统计表由 attempts 上的触发器维护, 须在写入任何作答记录之前建好
+    analytics.ensure_schema(conn)
+
+
+def now_text():
+    return datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class DbWriter(threading.Thread):
+    """后台写库线程: 攒批 executemany, 一个事务提交一批, 不阻塞界面
+
+    写入失败的批次整批回滚后逐行重写, 只丢弃出错的行; 错误记在 error / lost 中, 由 take_error 取走,
+    或在 flush / close 时重新抛出, 不会悄悄丢掉作答记录。
+    """
+
+    BATCH_SIZE = 500
+    _STOP = object()
+
+    def __init__(self, db_path="quiz.db"):
+        super().__init__(name="quiz-db-writer", daemon=True)
+        self.db_path = db_path
+        self.queue = queue.Queue()
+        self.error = None
+        self.lost = 0       # 因写入失败而丢弃的行数
+        self._error_lock = threading.Lock()
+
+    def submit(self, sql, params):
+        self.queue.put((sql, params))
+
+    def take_error(self):
+        """取走最近一次写入错误: (sqlite3.Error, 丢弃的行数); 没有错误时返回 None"""
+        with self._error_lock:
+            if self.error is None:
+                return None
+            result = (self.error, self.lost)
+            self.error, self.lost = None, 0
+            return result
+
+    def raise_error(self):
+        failure = self.take_error()
+        if failure is not None:
+            error, lost = failure
+            raise sqlite3.OperationalError(f"{lost} 条记录写入失败: {error}") from error
+
+    def flush(self):
+        """阻塞直到已提交的数据全部写入; 期间有批次写入失败时抛出 sqlite3.Error"""
+        self.queue.join()
+        self.raise_error()
+
+    def close(self):
+        """写完队列中剩余的数据后退出; 有未报告的写入失败时抛出 sqlite3.Error"""
+        self.queue.put(self._STOP)
+        self.join()
+        self.raise_error()
+
+    def run(self):
+        conn = tracer.watch_connection(sqlite3.connect(self.db_path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+        stopping = False
+        while not stopping:
+            batch = [self.queue.get()]
+            # 阻塞拿到第一条后, 把已经排队的都捞出来一起写
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if self._STOP in batch:
+                stopping = True
+                batch = [item for item in batch if item is not self._STOP]
+            if batch:
+                with tracer.span("db_write", rows=len(batch)):
+                    self._write(conn, batch)
+            for _ in range(len(batch) + stopping):
+                self.queue.task_done()
+
+        conn.close()
+
+    def _write(self, conn, batch):
+        try:
+            with conn:
+                # 相邻的同一条 SQL 合并成一次 executemany, 保持提交顺序
+                start = 0
+                for i in range(1, len(batch) + 1):
+                    if i == len(batch) or batch[i][0] != batch[start][0]:
+                        conn.executemany(batch[start][0], [params for _, params in batch[start:i]])
+                        start = i
+        except sqlite3.Error:
+            # 整批已回滚; 逐行重写, 只丢弃真正写不进去的行
+            for sql, params in batch:
+                try:
+                    with conn:
+                        conn.execute(sql, params)
+                except sqlite3.Error as e:
+                    with self._error_lock:
+                        self.error = e
+                        self.lost += 1
+
+
+class AttemptStore:
+    """作答记录持久化: 会话管理 + 通过 DbWriter 异步写入 attempts 表"""
+
+    def __init__(self, db_path="quiz.db"):
+        self.db_path = db_path
+        conn = sqlite3.connect(db_path)
+        ensure_schema(conn)
+        conn.close()
+
+        self.writer = DbWriter(db_path)
+        self.writer.start()
+
+    def last_session(self):
+        """返回最近一次 (非试卷) 会话 id 及每道题最后一次作答: [(question_id, type, answer, is_correct), ...]"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute("SELECT MAX(id) FROM sessions WHERE paper_id IS NULL").fetchone()
+            if row[0] is None:
+                return None, []
+            session_id = row[0]
+            rows = conn.execute(
+                "SELECT a.question_id, q.type, a.answer, a.is_correct "
+                "FROM attempts a JOIN questions q ON q.id = a.question_id "
+                "WHERE a.id IN (SELECT MAX(id) FROM attempts WHERE session_id = ? GROUP BY question_id) "
+                "ORDER BY a.question_id",
+                (session_id,)
+            ).fetchall()
+            return session_id, rows
+        finally:
+            conn.close()
+
+    def new_session(self, paper_id=None):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                cursor = conn.execute("INSERT INTO sessions (started_at, paper_id) VALUES (?, ?)",
+                                      (now_text(), paper_id))
+            return cursor.lastrowid
+        finally:
+            conn.close()
+
+    def flush(self):
+        self.writer.flush()
+
+    def take_error(self):
+        return self.writer.take_error()
+
+    def log_attempt(self, session_id, question_id, answer, is_correct, elapsed_ms=None):
+        self.writer.submit(INSERT_ATTEMPT, (session_id, question_id, answer, int(is_correct), now_text(),
+                                            elapsed_ms))
+
+    def close(self):
+        self.writer.close()
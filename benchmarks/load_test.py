@@ -0,0 +1,237 @@
+"""答题服务 (quiz_server.py) 压力测试: 模拟一个班的学生同时在本机答题
+
+用法:
+    python benchmarks/load_test.py [--students 300] [--answers 50] [--size 100000] [--out result.json]
+    python benchmarks/load_test.py --url http://127.0.0.1:8765 ...    # 压测已在运行的服务
+
+不给 --url 时, 在临时目录复制一份题库 (默认 quiz.db, --size 时用生成的题库) 并在子进程中
+启动服务, 压测结束后停止服务, 核对库中的作答记录条数与成功提交的次数是否一致。
+每个学生各用一条 keep-alive 连接: 新建会话, 从随机位置开始顺序翻页答题, 作答间可加思考时间。
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import signal
+import socket
+import asyncio
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from run_benchmarks import percentile, cached_bank, peak_rss_mb   # noqa: E402
+from question_source import option_value                           # noqa: E402
+
+FILL_ANSWERS = ["寄存器", "64", "主存、Cache", "DMA"]
+
+
+class Student:
+    """一名模拟学生: 一条连接, 一个会话"""
+
+    def __init__(self, host, port, rng, stats):
+        self.host = host
+        self.port = port
+        self.rng = rng
+        self.stats = stats
+        self.reader = self.writer = None
+        self.pages = {}
+
+    async def request(self, method, path, body=None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n")
+        started = time.perf_counter()
+        self.writer.write(head.encode("latin-1") + payload)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        data = json.loads(await self.reader.readexactly(length))
+        self.stats.record(path.split("?")[0], (time.perf_counter() - started) * 1000, status)
+        return status, data
+
+    async def run(self, answers, think_ms):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            _, info = await self.request("GET", "/api/info")
+            _, session = await self.request("POST", "/api/sessions")
+            count, page_size = info["count"], info["page_size"]
+
+            index = self.rng.randrange(count)
+            for _ in range(answers):
+                page_no, offset = divmod(index, page_size)
+                page = self.pages.get(page_no)
+                if page is None:
+                    _, data = await self.request("GET", f"/api/questions?page={page_no}")
+                    page = self.pages[page_no] = data["questions"]
+                qid, q_type, _, options = page[offset]
+
+                values = [option_value(option) for option in json.loads(options)] if options else []
+                answer = self.rng.choice(values) if values else self.rng.choice(FILL_ANSWERS)
+                status, _ = await self.request("POST", "/api/answers", {
+                    "session_id": session["session_id"], "question_id": qid, "answer": answer,
+                    "elapsed_ms": self.rng.randrange(2000, 60000)})
+                if status == 200:
+                    self.stats.submitted += 1
+
+                index = (index + 1) % count
+                if think_ms:
+                    await asyncio.sleep(self.rng.uniform(0, 2 * think_ms) / 1000)
+        finally:
+            self.writer.close()
+
+
+class Stats:
+    def __init__(self):
+        self.samples = {}       # 接口 -> [毫秒, ...]
+        self.errors = 0
+        self.submitted = 0
+
+    def record(self, endpoint, ms, status):
+        self.samples.setdefault(endpoint, []).append(ms)
+        if status != 200:
+            self.errors += 1
+
+    def summary(self, seconds):
+        result = {"seconds": seconds, "errors": self.errors, "submitted": self.submitted,
+                  "answers_per_second": self.submitted / seconds if seconds else 0.0, "endpoints": {}}
+        for endpoint, samples in sorted(self.samples.items()):
+            result["endpoints"][endpoint] = {
+                "count": len(samples),
+                "p50_ms": percentile(samples, 50),
+                "p95_ms": percentile(samples, 95),
+                "p99_ms": percentile(samples, 99),
+                "max_ms": max(samples),
+            }
+        return result
+
+
+async def run_load(host, port, students, answers, think_ms, seed):
+    stats = Stats()
+    rng = random.Random(seed)
+    crowd = [Student(host, port, random.Random(rng.random()), stats) for _ in range(students)]
+    started = time.perf_counter()
+    results = await asyncio.gather(*(s.run(answers, think_ms) for s in crowd), return_exceptions=True)
+    seconds = time.perf_counter() - started
+    failures = [r for r in results if isinstance(r, BaseException)]
+    summary = stats.summary(seconds)
+    summary["students"] = students
+    summary["failed_students"] = len(failures)
+    if failures:
+        summary["first_failure"] = repr(failures[0])
+    return summary
+
+
+# --- 本地启动服务 ---
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_path, port, readers):
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "quiz_server.py"), "--db", db_path,
+                             "--host", "127.0.0.1", "--port", str(port), "--readers", str(readers)])
+    deadline = time.perf_counter() + 120
+    while time.perf_counter() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("答题服务启动失败")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise TimeoutError("等待答题服务启动超时")
+
+
+def stop_server(proc):
+    # SIGINT 让服务写完队列中的作答记录再退出
+    proc.send_signal(signal.SIGINT if sys.platform != "win32" else signal.CTRL_C_EVENT)
+    try:
+        proc.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def count_attempts(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM attempts").fetchone()[0]
+    except sqlite3.OperationalError:    # 还没有 attempts 表
+        return 0
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="答题服务压力测试")
+    parser.add_argument("--url", help="已在运行的服务地址; 不给时在本机临时启动一个")
+    parser.add_argument("--db", default=os.path.join(ROOT, "quiz.db"), help="临时服务使用的题库 (会先复制)")
+    parser.add_argument("--size", type=int, help="改用生成的题库 (benchmarks/.cache/)")
+    parser.add_argument("--readers", type=int, default=8, help="临时服务的只读连接数")
+    parser.add_argument("--students", type=int, default=300, help="并发学生数")
+    parser.add_argument("--answers", type=int, default=50, help="每名学生的作答数")
+    parser.add_argument("--think-ms", type=float, default=0, help="平均思考时间 (毫秒)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="结果 JSON 路径")
+    args = parser.parse_args(argv)
+
+    proc = workdir = None
+    if args.url:
+        url = urlsplit(args.url if "://" in args.url else "http://" + args.url)
+        host, port = url.hostname, url.port or 8765
+    else:
+        workdir = tempfile.mkdtemp(prefix="quiz-load-")
+        db_path = os.path.join(workdir, "quiz.db")
+        shutil.copy(cached_bank(args.size) if args.size else args.db, db_path)
+        before = count_attempts(db_path)
+        host, port = "127.0.0.1", free_port()
+        proc = start_server(db_path, port, args.readers)
+
+    try:
+        result = asyncio.run(run_load(host, port, args.students, args.answers, args.think_ms, args.seed))
+    finally:
+        if proc is not None:
+            stop_server(proc)
+
+    result["client_peak_rss_mb"] = peak_rss_mb()
+    if proc is not None:
+        # 写线程攒批写入, 服务退出后核对是否一条不少
+        result["attempts_written"] = count_attempts(db_path) - before
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"学生 {result['students']} 名 (失败 {result['failed_students']}), 提交 {result['submitted']} 次, "
+          f"错误 {result['errors']}, 用时 {result['seconds']:.2f}s, {result['answers_per_second']:,.0f} 次/秒")
+    for endpoint, s in result["endpoints"].items():
+        print(f"  {endpoint:<16} {s['count']:>8}  p50 {s['p50_ms']:7.2f}  p95 {s['p95_ms']:7.2f}  "
+              f"p99 {s['p99_ms']:7.2f}  max {s['max_ms']:7.2f} ms")
+    if "attempts_written" in result:
+        print(f"  写入作答记录 {result['attempts_written']} 条")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    ok = not result["failed_students"] and not result["errors"]
+    if "attempts_written" in result:
+        ok = ok and result["attempts_written"] == result["submitted"]
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
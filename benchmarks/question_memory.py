@@ -0,0 +1,117 @@
+"""题目内存占用对比: 改造前的字典列表 (基线) vs Question (__slots__)
+
+另列出分页改造中间版本的 "原始行 + 字典" 缓存作参考; 倍数都相对基线计算。
+
+用法:
+    python benchmarks/question_memory.py [--db quiz.db] [--limit N]
+    python benchmarks/question_memory.py --generate 100000
+"""
+import os
+import sys
+import json
+import random
+import sqlite3
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_source import QuestionSource
+
+SELECT_SQL = "SELECT id, type, question, options, answer FROM questions ORDER BY id LIMIT ?"
+
+
+def generated_db(count, seed=0):
+    """内存库, 题目长度和题型比例与 quiz.db 接近"""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE questions (id INTEGER PRIMARY KEY, type TEXT, question TEXT, "
+                 "options TEXT, answer TEXT)")
+    rows = []
+    for i in range(1, count + 1):
+        q_type = rng.choice(["single_choice", "true_false", "fill_in"])
+        question = f"题目 {i} 关于存储系统与总线的" + "描述" * rng.randint(5, 20) + "( )。"
+        if q_type == "single_choice":
+            options = [f"{c}. 选项内容{i}{c}" for c in "ABCD"]
+            answer = rng.choice("ABCD")
+        elif q_type == "true_false":
+            options = ["正确 (T)", "错误 (F)"]
+            answer = rng.choice("TF")
+        else:
+            options = []
+            answer = "寄存器"
+        rows.append((i, q_type, question, json.dumps(options, ensure_ascii=False), answer))
+    conn.executemany("INSERT INTO questions VALUES (?, ?, ?, ?, ?)", rows)
+    return conn
+
+
+def dict_decode(row):
+    # 基线 (分页之前的 main.py): 整个题库解码成字典列表, 原始行不保留
+    return {
+        "id": row[0],
+        "type": row[1],
+        "question": row[2],
+        "options": json.loads(row[3]) if row[3] else [],
+        "answer": row[4],
+    }
+
+
+def paged_decode(row):
+    # 中间版本的 QuestionSource: 原始行页缓存和解码后的字典同时留在缓存里
+    return row, dict_decode(row)
+
+
+def text_payload(conn, limit):
+    """题干、选项、答案文本本身的大小; 三种表示都必须保存这部分, 差别只在结构开销"""
+    total = 0
+    for row in conn.execute(SELECT_SQL, (limit,)):
+        q = QuestionSource._decode(row)
+        total += sys.getsizeof(q.question) + sys.getsizeof(q.answer)
+        total += sum(sys.getsizeof(option) for option in q.options)
+    return total
+
+
+def measure(conn, limit, build, repeat=3):
+    """取 repeat 次中的最小值, 排除首次运行时模块级缓存等一次性分配"""
+    return min(_measure_once(conn, limit, build) for _ in range(repeat))
+
+
+def _measure_once(conn, limit, build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [build(row) for row in conn.execute(SELECT_SQL, (limit,))]
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, len(records)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="对比题目对象的内存占用")
+    parser.add_argument("--db", default="quiz.db", help="SQLite 数据库路径")
+    parser.add_argument("--generate", type=int, help="改用 N 道随机生成的题目")
+    parser.add_argument("--limit", type=int, default=QuestionSource.PAGE_SIZE * QuestionSource.MAX_PAGES,
+                        help="参与统计的题目数, 默认等于页缓存的容量")
+    args = parser.parse_args(argv)
+
+    conn = generated_db(args.generate) if args.generate else sqlite3.connect(args.db)
+    limit = args.generate or args.limit
+
+    results = [
+        ("字典 (基线)", measure(conn, limit, dict_decode)),
+        ("原始行 + 字典", measure(conn, limit, paged_decode)),
+        ("Question", measure(conn, limit, QuestionSource._decode)),
+    ]
+    payload = text_payload(conn, limit)
+    baseline = results[0][1][0]
+    print(f"文本本身: {payload / max(results[0][1][1], 1):.0f} B/题")
+    print(f"{'表示':<10} {'题数':>8}  {'总占用':>12}  {'每题':>9}  {'每题结构开销':>10}  对比")
+    for name, (size, count) in results:
+        count = max(count, 1)
+        overhead = (size - payload) / count
+        print(f"{name:<10} {count:>8}  {size / 1024:>8.1f} KiB  {size / count:>7.0f} B  {overhead:>10.0f} B  "
+              f"总 {baseline / max(size, 1):.2f}x / 开销 {(baseline - payload) / max(size - payload, 1):.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,374 @@
+"""界面热路径基准测试 (offscreen Qt)
+
+用法:
+    python benchmarks/run_benchmarks.py [--sizes 1000,100000,1000000] [--out results.json]
+                                        [--baseline baseline.json] [--tolerance 0.2]
+
+对每种题库规模生成一份题库 (缓存在 benchmarks/.cache/), 在独立子进程中复制一份后启动
+QuizApp, 依次测量启动加载、show_question (顺序 / 随机跳转)、check_answer、
+题目概览和错题导出; 记录延迟分位数、峰值 RSS 和 Qt 对象数, 以 JSON 输出。
+给定 --baseline 时按 p95 比较, 超出容差的操作记为回归, 退出码为 1。
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import platform
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CACHE_DIR = os.path.join(ROOT, "benchmarks", ".cache")
+DEFAULT_SIZES = [1000, 100000, 1000000]
+GENERATOR_VERSION = 1
+
+
+# --- 题库生成 ---
+
+def generate_bank(path, size, seed=0):
+    """生成与 quiz.db 结构相同的题库, 题型比例接近真实题库"""
+    from init_db import ensure_schema, content_hash, to_db_row
+
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        ensure_schema(conn)
+        batch = []
+        for i in range(1, size + 1):
+            q_type = rng.choice(["single_choice", "single_choice", "true_false", "fill_in"])
+            question = f"题目 {i}: 关于存储系统与总线的" + "描述" * rng.randint(5, 30) + "( )。"
+            if q_type == "single_choice":
+                options = [f"{c}. 选项{c} 的内容 {i}" for c in "ABCD"]
+                answer = rng.choice("ABCD")
+            elif q_type == "true_false":
+                options = ["正确 (T)", "错误 (F)"]
+                answer = rng.choice("TF")
+            else:
+                options = []
+                answer = rng.choice(["寄存器", "64", "主存、Cache"])
+            batch.append(to_db_row((i, q_type, question, options, answer,
+                                    content_hash(q_type, question, options, answer))))
+            if len(batch) >= 10000:
+                conn.executemany("INSERT INTO questions (original_id, type, question, options, answer, "
+                                 "content_hash) VALUES (?, ?, ?, ?, ?, ?)", batch)
+                batch = []
+        if batch:
+            conn.executemany("INSERT INTO questions (original_id, type, question, options, answer, "
+                             "content_hash) VALUES (?, ?, ?, ?, ?, ?)", batch)
+        conn.commit()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+
+
+def cached_bank(size):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f"bank_{size}_v{GENERATOR_VERSION}.db")
+    if not os.path.exists(path):
+        tmp = path + ".tmp"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        generate_bank(tmp, size)
+        os.replace(tmp, path)
+    return path
+
+
+# --- 统计 ---
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def peak_rss_mb():
+    """本进程的峰值常驻内存 (MB); resource 只在 Unix 上有, Windows 上改用 psutil, 都没有时返回 None"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        # Windows 上 peak_wset 为峰值工作集, 其他平台只有当前 rss
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    # Linux 上 ru_maxrss 单位为 KiB, macOS 上为字节
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def format_mb(value, width=8):
+    return f"{'-':>{width}}" if value is None else f"{value:>{width}.1f}"
+
+
+def summarize(samples_ms, app, window, extra=None):
+    from PySide6.QtCore import QObject
+
+    result = {
+        "count": len(samples_ms),
+        "mean_ms": sum(samples_ms) / len(samples_ms) if samples_ms else 0.0,
+        "p50_ms": percentile(samples_ms, 50),
+        "p95_ms": percentile(samples_ms, 95),
+        "p99_ms": percentile(samples_ms, 99),
+        "max_ms": max(samples_ms) if samples_ms else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "widgets": len(app.allWidgets()),
+        "qobjects": len(window.findChildren(QObject)),
+    }
+    if extra:
+        result.update(extra)
+    return result
+
+
+# --- 各项测量 (在子进程中运行) ---
+
+def wait_until(app, predicate, timeout=600):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("等待超时")
+        app.processEvents()
+        time.sleep(0.0005)
+
+
+def bench_size(size, samples, seed=0):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    bank = cached_bank(size)
+    workdir = tempfile.mkdtemp(prefix="quiz-bench-")
+    try:
+        shutil.copy(bank, os.path.join(workdir, "quiz.db"))
+        os.chdir(workdir)
+
+        from PySide6.QtWidgets import QApplication
+        import main
+
+        # 全文索引的后台重建会和测量争抢 CPU, 这里不启动
+        main.QuizApp.start_search_index = lambda self: None
+
+        app = QApplication.instance() or QApplication([])
+        rng = random.Random(seed)
+        results = {}
+
+        # 启动: 构造窗口 -> 首题显示 -> 后台加载完成
+        started = time.perf_counter()
+        window = main.QuizApp()
+        window.show()
+        first_ms = (time.perf_counter() - started) * 1000
+        wait_until(app, lambda: not window.loading)
+        loaded_ms = (time.perf_counter() - started) * 1000
+        results["load_data"] = summarize([loaded_ms], app, window, {"first_question_ms": first_ms})
+
+        n = len(window.questions)
+
+        def timed(fn, count):
+            times = []
+            for i in range(count):
+                t = time.perf_counter()
+                fn(i)
+                times.append((time.perf_counter() - t) * 1000)
+            app.processEvents()
+            return times
+
+        window.jump_to(0)
+        times = timed(lambda i: window.next_question(), min(samples, n - 1))
+        results["show_question_sequential"] = summarize(times, app, window)
+
+        targets = [rng.randrange(n) for _ in range(samples)]
+        times = timed(lambda i: window.jump_to(targets[i]), samples)
+        results["show_question_random"] = summarize(times, app, window)
+
+        # 作答: 选择题选 A, 判断题选 T, 填空题填固定答案; 约一半会答错
+        answer_targets = rng.sample(range(n), min(samples, n))
+
+        def answer(i):
+            window.jump_to(answer_targets[i])
+            q = window.questions[window.current_index]
+            if q.values:
+                window.option_panel.select_value(q.values[0])
+            else:
+                window.option_panel.input_field.setText("寄存器")
+            t = time.perf_counter()
+            window.check_answer()
+            return (time.perf_counter() - t) * 1000
+
+        times = [answer(i) for i in range(len(answer_targets))]
+        results["check_answer"] = summarize(times, app, window)
+
+        from PySide6.QtCore import QCoreApplication, QEvent
+        from question_board import QuestionBoardDialog
+
+        def open_board(i):
+            dialog = QuestionBoardDialog(window.session, window.current_index, window.jump_to, window)
+            dialog.show()
+            app.processEvents()
+            dialog.close()
+            dialog.deleteLater()
+            # processEvents 不处理延迟删除, 需要显式投递, 否则对象数会虚高
+            QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+        times = timed(open_board, max(3, samples // 50))
+        app.processEvents()
+        results["open_question_board"] = summarize(times, app, window)
+
+        results["export_error_report"] = bench_export(app, window, size)
+
+        # 统计面板只读汇总表, 打开时间不应随作答记录增长 (导出测量已补了最多 10 万条)
+        from analytics import Analytics
+        from analytics_dialog import AnalyticsDialog
+
+        def open_analytics(i):
+            dialog = AnalyticsDialog(Analytics("quiz.db"), window.jump_to_question_id, parent=window)
+            dialog.show()
+            app.processEvents()
+            dialog.close()
+            dialog.deleteLater()
+            QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+        times = timed(open_analytics, max(3, samples // 50))
+        results["open_analytics"] = summarize(times, app, window)
+
+        window.close()
+        app.processEvents()
+        return results
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def bench_export(app, window, size):
+    """后台导出错题: 总耗时, 以及导出期间事件循环的最大停顿 (界面是否卡顿)"""
+    from report_export import ExportWorker
+
+    # 补足错题, 使导出行数随题库规模增长 (最多 10 万行)
+    wrong = min(size, 100000)
+    window.attempt_store.flush()
+    conn = sqlite3.connect("quiz.db")
+    with conn:
+        conn.executemany(
+            "INSERT INTO attempts (session_id, question_id, answer, is_correct, answered_at) "
+            "VALUES (?, ?, 'X', 0, '2026-01-01 00:00:00')",
+            ((window.session_id, qid) for qid in range(1, wrong + 1)))
+    conn.close()
+
+    path = os.path.abspath("export.jsonl")
+    worker = ExportWorker("quiz.db", path, "jsonl", session_id=window.session_id)
+    gaps = []
+    started = time.perf_counter()
+    worker.start()
+    last = time.perf_counter()
+    while not worker.isFinished():
+        app.processEvents()
+        now = time.perf_counter()
+        gaps.append((now - last) * 1000)
+        last = now
+        time.sleep(0.001)
+    total_ms = (time.perf_counter() - started) * 1000
+    app.processEvents()
+    worker.wait()
+
+    result = summarize([total_ms], app, window, {
+        "rows": wrong,
+        "event_loop_gap_p99_ms": percentile(gaps, 99),
+        "event_loop_gap_max_ms": max(gaps) if gaps else 0.0,
+        "file_mb": os.path.getsize(path) / (1024 * 1024),
+    })
+    os.remove(path)
+    return result
+
+
+# --- 主进程: 调度与基线比较 ---
+
+def run_worker(size, samples):
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", str(size),
+                           "--samples", str(samples)],
+                          capture_output=True, text=True, encoding="utf-8")
+    if proc.returncode != 0:
+        raise RuntimeError(f"{size} 题的基准测试失败:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, tolerance):
+    """按 p95 比较, 返回 [(规模, 操作, 基线, 当前, 比值)] 中超出容差的部分"""
+    regressions = []
+    for size, ops in results["results"].items():
+        for op, stats in ops.items():
+            base = baseline.get("results", {}).get(size, {}).get(op)
+            if not base or base["p95_ms"] <= 0:
+                continue
+            ratio = stats["p95_ms"] / base["p95_ms"]
+            if ratio > 1 + tolerance:
+                regressions.append((size, op, base["p95_ms"], stats["p95_ms"], ratio))
+    return regressions
+
+
+def print_table(results):
+    print(f"{'规模':>8}  {'操作':<26} {'次数':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} "
+          f"{'RSS MB':>8} {'widgets':>8}")
+    for size, ops in results["results"].items():
+        for op, s in ops.items():
+            print(f"{size:>8}  {op:<26} {s['count']:>5} {s['p50_ms']:>9.3f} {s['p95_ms']:>9.3f} "
+                  f"{s['p99_ms']:>9.3f} {s['max_ms']:>9.3f} {format_mb(s['peak_rss_mb'])} {s['widgets']:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="QuizApp 热路径基准测试 (offscreen)")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="题库规模, 逗号分隔")
+    parser.add_argument("--samples", type=int, default=200, help="每项操作的采样次数")
+    parser.add_argument("--out", help="结果 JSON 路径")
+    parser.add_argument("--baseline", help="用于比较的基线 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="p95 允许的相对增幅")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        # 子进程: 只测一种规模, 结果作为最后一行 JSON 输出
+        print(json.dumps(bench_size(args.worker, args.samples)))
+        return 0
+
+    import PySide6
+    results = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "pyside6": PySide6.__version__,
+            "platform": platform.platform(),
+            "samples": args.samples,
+        },
+        "results": {},
+    }
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        started = time.perf_counter()
+        cached_bank(size)
+        results["results"][str(size)] = run_worker(size, args.samples)
+        print(f"{size} 题完成, 用时 {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    print_table(results)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for size, op, base, now, ratio in regressions:
+            print(f"回归: {size} 题 {op} p95 {base:.3f} ms -> {now:.3f} ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print("与基线相比没有回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,634 @@
+"""近似重复题检测: 字符 shingle + MinHash 签名 + LSH 分桶, 不做两两比较
+
+    python dedup_index.py refresh [--db quiz.db]                  # 增量更新索引 (首次为全量)
+    python dedup_index.py report [--threshold 0.4] [--out dup.csv] [--limit 50] [--members 20]
+    python dedup_index.py merge <保留的题目 id> <重复题 id> [...]
+
+签名用单次哈希的 MinHash (one permutation hashing): 每个 shingle 只算一次 crc32,
+按高位分到 BINS 个桶取最小值, 空桶从右侧最近的非空桶借值 (旋转致密化)。
+签名按 BANDS 段各 ROWS 个值分段, 任意一段完全相同即为候选, 先按签名估计的相似度粗筛,
+再由 PairChecker 精确比较: shingle 集合的 Jaccard 相似度, 同题型的题还要求答案相同、
+题干没有替换关键词 (如 "原码" / "补码"、"移位" / "加法"), 避免把模板相同的题当成重复。
+填空题把答案填回空中再比较, 与同一陈述改写成的判断题可以互相匹配。
+题目增删改由触发器登记到 dedup_dirty, refresh 只处理这些题; init_db.py / docx_import.py
+导入后会自动调用并列出新题中的疑似重复。
+"""
+import re
+import sys
+import csv
+import json
+import zlib
+import random
+import difflib
+import operator
+import time
+import sqlite3
+import argparse
+import datetime
+import unicodedata
+from array import array
+
+from answer_matcher import canonical_text
+
+SHINGLE = 2             # shingle 长度 (字符); 中文题干短, 用二元组
+BIN_BITS = 7
+BINS = 1 << BIN_BITS    # 签名长度
+BANDS = 32              # LSH 分段数; BANDS * ROWS == BINS
+ROWS = 4
+CANDIDATE_SLACK = 0.15  # 签名估计的误差余量, 粗筛阈值为 threshold - CANDIDATE_SLACK
+ANSWER_SIMILARITY = 0.5  # 选择题正确选项内容的相似度下限
+INDEX_VERSION = 2       # 签名算法或比较文本变化时加一, refresh 发现版本不同会全量重建
+MAX_BUCKET = 200        # 超过这个大小的桶 (模板化的题目) 不展开成候选对
+REFRESH_CHUNK = 5000
+CHECK_LIMIT = 20000     # 导入后逐题查相似的上限, 更多时 (如首次建索引) 改为提示运行 report
+DEFAULT_THRESHOLD = 0.4
+
+SCHEMA = [
+    # 签名: BINS 个 16 位值; 删除旧分桶时据此重算桶键
+    """CREATE TABLE IF NOT EXISTS dedup_signatures (
+        question_id INTEGER PRIMARY KEY,
+        signature BLOB NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS dedup_bands (
+        band INTEGER NOT NULL,
+        key INTEGER NOT NULL,
+        question_id INTEGER NOT NULL,
+        PRIMARY KEY (band, key, question_id)
+    ) WITHOUT ROWID""",
+    "CREATE TABLE IF NOT EXISTS dedup_dirty (question_id INTEGER PRIMARY KEY)",
+    "CREATE TABLE IF NOT EXISTS dedup_meta (version INTEGER NOT NULL)",
+    """CREATE TRIGGER IF NOT EXISTS questions_dedup_ai AFTER INSERT ON questions BEGIN
+        INSERT OR IGNORE INTO dedup_dirty VALUES (new.id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS questions_dedup_au AFTER UPDATE OF type, question, options, answer ON questions BEGIN
+        INSERT OR IGNORE INTO dedup_dirty VALUES (old.id);
+        INSERT OR IGNORE INTO dedup_dirty VALUES (new.id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS questions_dedup_ad AFTER DELETE ON questions BEGIN
+        INSERT OR IGNORE INTO dedup_dirty VALUES (old.id);
+    END""",
+    # 被合并掉的题目; 导入时据此跳过, 不会被重新导入
+    """CREATE TABLE IF NOT EXISTS question_merges (
+        question_id INTEGER PRIMARY KEY,
+        merged_into INTEGER NOT NULL,
+        original_id INTEGER,
+        content_hash TEXT,
+        type TEXT NOT NULL,
+        question TEXT NOT NULL,
+        answer TEXT NOT NULL,
+        merged_at TEXT NOT NULL
+    )""",
+]
+
+_STRIP_RE = re.compile(r'[\W_]+', re.UNICODE)
+_LABEL_RE = re.compile(r'^\s*[A-Ha-h]\s*[.．、]\s*')
+# 以下两个作用于 NFKC + 小写之后的文本
+_BLANK_RE = re.compile(r'_{2,}|\(\s*\)')
+_GLOSS_RE = re.compile(r'\([a-z][a-z\s-]*\)')     # 中文术语后的英文注释, 如 "云计算(cloud computing)"
+
+FILL_TYPES = ("fill_in", "fill_in_the_blank")
+
+
+def ensure_schema(conn):
+    for sql in SCHEMA:
+        conn.execute(sql)
+    conn.commit()
+
+
+def merged_questions(conn, columns):
+    """question_merges 中的行; 还没有合并过 (表不存在) 时为空"""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'question_merges'").fetchone() is None:
+        return []
+    return conn.execute(f"SELECT {columns} FROM question_merges").fetchall()
+
+
+def normalize_text(text):
+    return unicodedata.normalize("NFKC", str(text)).lower()
+
+
+def question_text(q_type, question, options, answer=""):
+    """参与比较的文本: 题干 + 选项内容; 判断题的 正确 / 错误 选项人人相同, 不计入
+
+    填空题的答案按顺序填回空中 (没有空时接在题干后), 英文注释去掉。
+    """
+    text = normalize_text(question)
+    if q_type in FILL_TYPES:
+        blanks = iter(normalize_text(answer).split("、"))
+        filled = _BLANK_RE.sub(lambda m: next(blanks, ""), text)
+        text = filled if filled != text else text + normalize_text(answer)
+    parts = [_GLOSS_RE.sub("", text)]
+    if options and q_type != "true_false":
+        parts.extend(_LABEL_RE.sub("", normalize_text(option)) for option in options)
+    return _STRIP_RE.sub("", " ".join(parts))
+
+
+def shingle_hashes(text):
+    """文本中全部长度为 SHINGLE 的子串的 32 位哈希; 短于 SHINGLE 的文本整体算一个"""
+    data = text.encode("utf-32-le")
+    width = 4 * SHINGLE
+    if len(text) <= SHINGLE:
+        return {zlib.crc32(data)} if text else set()
+    return {zlib.crc32(data[i:i + width]) for i in range(0, len(data) - width + 4, 4)}
+
+
+def signature(hashes):
+    """单次哈希 MinHash: BINS 个 16 位值; 没有 shingle 时返回 None"""
+    if not hashes:
+        return None
+    mins = [None] * BINS
+    for h in hashes:
+        # 乘法散列打散 crc32 的线性结构, 高 BIN_BITS 位选桶, 其余位取最小值
+        h = (h * 0x9E3779B1) & 0xFFFFFFFF
+        b = h >> (32 - BIN_BITS)
+        v = h & ((1 << (32 - BIN_BITS)) - 1)
+        if mins[b] is None or v < mins[b]:
+            mins[b] = v
+    sig = array("H", bytes(2 * BINS))
+    # 从右往左扫一遍, 记下右侧最近的非空桶 (越过末尾时绕回开头第一个非空桶)
+    nearest = BINS + next(b for b in range(BINS) if mins[b] is not None)
+    for b in range(BINS - 1, -1, -1):
+        v = mins[b]
+        if v is not None:
+            nearest = b
+            sig[b] = v & 0xFFFF
+        else:
+            # 借来的值加上距离偏移, 与原桶的值区分开
+            sig[b] = (mins[nearest % BINS] + (nearest - b) * 0x9E37) & 0xFFFF
+    return sig
+
+
+def band_keys(sig):
+    """每段 ROWS 个 16 位值正好拼成一个有符号 64 位整数"""
+    data = sig.tobytes()
+    step = 2 * ROWS
+    return [int.from_bytes(data[i:i + step], "little", signed=True) for i in range(0, len(data), step)]
+
+
+def similarity(sig_a, sig_b):
+    """签名估计的 Jaccard 相似度"""
+    return sum(map(operator.eq, sig_a, sig_b)) / BINS
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def bigrams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)} or {text}
+
+
+def substitutes_term(stem_a, stem_b):
+    """两段题干之间是否有 "替换" 而不只是增删: 双方各有至少两个字被换掉"""
+    matcher = difflib.SequenceMatcher(None, stem_a, stem_b, autojunk=False)
+    return any(tag == "replace" and i2 - i1 >= 2 and j2 - j1 >= 2
+               for tag, i1, i2, j1, j2 in matcher.get_opcodes())
+
+
+class PairChecker:
+    """候选对的精确比较; 每道题的比较特征只算一次"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.features = {}
+
+    def _features(self, qid):
+        feature = self.features.get(qid)
+        if feature is None:
+            row = self.conn.execute("SELECT type, question, options, answer FROM questions WHERE id = ?",
+                                    (qid,)).fetchone()
+            if row is None:
+                return None
+            q_type, question, options, answer = row
+            options = json.loads(options) if options else []
+            feature = self.features[qid] = (
+                q_type,
+                shingle_hashes(question_text(q_type, question, options, answer)),
+                answer_key(q_type, options, answer),
+                _STRIP_RE.sub("", normalize_text(question)),
+            )
+        return feature
+
+    def score(self, a, b, threshold=0.0):
+        """精确相似度; 同题型但答案不同或题干替换了关键词时为 0
+
+        低于 threshold 的对不再做较慢的答案和题干检查。
+        """
+        fa, fb = self._features(a), self._features(b)
+        if fa is None or fb is None:
+            return 0.0
+        score = jaccard(fa[1], fb[1])
+        if score >= threshold and fa[0] == fb[0]:
+            if not same_answer(fa[0], fa[2], fb[2]) or substitutes_term(fa[3], fb[3]):
+                return 0.0
+        return score
+
+
+def answer_key(q_type, options, answer):
+    """用于比较答案的键: 选择题为正确选项的内容, 填空题为各空的规范文本"""
+    if q_type in FILL_TYPES:
+        return tuple(canonical_text(part) for part in str(answer).split("、"))
+    if q_type == "single_choice":
+        for option in options:
+            label = _LABEL_RE.match(option)
+            if label and option.strip()[:1].upper() == str(answer).strip().upper():
+                return _STRIP_RE.sub("", normalize_text(option[label.end():]))
+    return normalize_text(answer).strip()
+
+
+def same_answer(q_type, key_a, key_b):
+    if q_type == "single_choice":
+        # 选项措辞可能略有不同 ("只适用于" / "只适合于")
+        return key_a == key_b or jaccard(bigrams(key_a), bigrams(key_b)) >= ANSWER_SIMILARITY
+    return key_a == key_b
+
+
+def decode_signature(blob):
+    sig = array("H")
+    sig.frombytes(blob)
+    return sig
+
+
+class DedupIndex:
+    """quiz.db 中的近似重复索引"""
+
+    def __init__(self, db_path="quiz.db"):
+        self.db_path = db_path
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def refresh(self):
+        """增量更新: 只处理登记过的题目; 返回重新计算过签名的题目 id"""
+        conn = self._connect()
+        updated = []
+        try:
+            fresh = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'dedup_signatures'").fetchone() is None
+            with conn:
+                if not fresh and self._stale_version(conn):
+                    # 签名算法变了: 旧签名和分桶全部作废, 触发器按新定义重建
+                    conn.execute("DROP TRIGGER IF EXISTS questions_dedup_au")
+                    conn.execute("DELETE FROM dedup_signatures")
+                    conn.execute("DELETE FROM dedup_bands")
+                    fresh = True
+                for sql in SCHEMA:
+                    conn.execute(sql)
+                if fresh:
+                    conn.execute("DELETE FROM dedup_meta")
+                    conn.execute("INSERT INTO dedup_meta VALUES (?)", (INDEX_VERSION,))
+                    conn.execute("INSERT OR IGNORE INTO dedup_dirty SELECT id FROM questions")
+
+            while True:
+                ids = [r[0] for r in conn.execute(
+                    "SELECT question_id FROM dedup_dirty ORDER BY question_id LIMIT ?", (REFRESH_CHUNK,))]
+                if not ids:
+                    break
+                marks = ",".join("?" * len(ids))
+                old = conn.execute(
+                    f"SELECT question_id, signature FROM dedup_signatures WHERE question_id IN ({marks})",
+                    ids).fetchall()
+                rows = conn.execute(f"SELECT id, type, question, options, answer FROM questions "
+                                    f"WHERE id IN ({marks})", ids).fetchall()
+
+                stale = [(band, key, qid) for qid, blob in old
+                         for band, key in enumerate(band_keys(decode_signature(blob)))]
+                signatures, bands = [], []
+                for qid, q_type, question, options, answer in rows:
+                    sig = signature(shingle_hashes(question_text(
+                        q_type, question, json.loads(options) if options else (), answer)))
+                    if sig is None:
+                        continue
+                    signatures.append((qid, sig.tobytes()))
+                    bands.extend((band, key, qid) for band, key in enumerate(band_keys(sig)))
+                    updated.append(qid)
+
+                with conn:
+                    conn.executemany("DELETE FROM dedup_bands WHERE band = ? AND key = ? AND question_id = ?",
+                                     stale)
+                    conn.execute(f"DELETE FROM dedup_signatures WHERE question_id IN ({marks})", ids)
+                    conn.executemany("INSERT INTO dedup_signatures VALUES (?, ?)", signatures)
+                    conn.executemany("INSERT OR IGNORE INTO dedup_bands VALUES (?, ?, ?)", bands)
+                    conn.execute(f"DELETE FROM dedup_dirty WHERE question_id IN ({marks})", ids)
+        finally:
+            conn.close()
+        return updated
+
+    @staticmethod
+    def _stale_version(conn):
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'dedup_meta'").fetchone() is None:
+            return True
+        row = conn.execute("SELECT version FROM dedup_meta").fetchone()
+        return row is None or row[0] != INDEX_VERSION
+
+    def find_groups(self, threshold=DEFAULT_THRESHOLD):
+        """全库疑似重复分组: 逐个扫描共享的桶, 相似的题并入同一组
+
+        返回 (DuplicateGroups, 跳过的超大桶数)。已在同一组的两道题不再比较,
+        所以每道题记下的最高相似度只是参考值。相似度为 PairChecker 的精确值。
+        """
+        conn = self._connect()
+        try:
+            groups = DuplicateGroups()
+            checker = PairChecker(conn)
+            oversized = 0
+            signatures = {}
+
+            def sig_of(qid):
+                sig = signatures.get(qid)
+                if sig is None:
+                    blob = conn.execute("SELECT signature FROM dedup_signatures WHERE question_id = ?",
+                                        (qid,)).fetchone()[0]
+                    sig = signatures[qid] = decode_signature(blob)
+                return sig
+
+            bucket, members = None, []
+            # 按主键顺序流式扫描, 同一桶的行相邻
+            for band, key, qid in conn.execute("SELECT band, key, question_id FROM dedup_bands"):
+                if (band, key) != bucket:
+                    oversized += self._collect(members, groups, sig_of, checker, threshold)
+                    bucket, members = (band, key), []
+                members.append(qid)
+            oversized += self._collect(members, groups, sig_of, checker, threshold)
+            return groups, oversized
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _collect(members, groups, sig_of, checker, threshold):
+        if len(members) < 2:
+            return 0
+        if len(members) > MAX_BUCKET:
+            return 1
+        find = groups.find
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                if find(a) != find(b) and similarity(sig_of(a), sig_of(b)) >= threshold - CANDIDATE_SLACK:
+                    score = checker.score(a, b, threshold)
+                    if score >= threshold:
+                        groups.union(a, b, score)
+        return 0
+
+    def similar_to(self, question_ids, threshold=DEFAULT_THRESHOLD):
+        """给定题目 (如新导入的) 的疑似重复: [(较小的题目 id, 较大的题目 id, 相似度), ...], 每对一次"""
+        conn = self._connect()
+        try:
+            # 两道题都在 question_ids 里时同一对会查到两次, 按 (小 id, 大 id) 只留一次
+            best = {}
+            checker = PairChecker(conn)
+            for qid in question_ids:
+                row = conn.execute("SELECT signature FROM dedup_signatures WHERE question_id = ?",
+                                   (qid,)).fetchone()
+                if row is None:
+                    continue
+                sig = decode_signature(row[0])
+                others = set()
+                for band, key in enumerate(band_keys(sig)):
+                    others.update(r[0] for r in conn.execute(
+                        "SELECT question_id FROM dedup_bands WHERE band = ? AND key = ? LIMIT ?",
+                        (band, key, MAX_BUCKET + 1)))
+                others.discard(qid)
+                for other in sorted(others):
+                    blob = conn.execute("SELECT signature FROM dedup_signatures WHERE question_id = ?",
+                                        (other,)).fetchone()[0]
+                    if similarity(sig, decode_signature(blob)) < threshold - CANDIDATE_SLACK:
+                        continue
+                    score = checker.score(qid, other, threshold)
+                    pair = (min(qid, other), max(qid, other))
+                    if score >= threshold and score > best.get(pair, 0):
+                        best[pair] = score
+            return [(a, b, score) for (a, b), score in sorted(best.items())]
+        finally:
+            conn.close()
+
+    def merge(self, keep_id, duplicate_ids):
+        """把重复题合并到 keep_id: 作答记录、复习状态、试卷题目改指向保留的题, 然后删除重复题
+
+        题型不同的题不能合并; 返回改写的作答记录条数。
+        """
+        from init_db import ensure_schema as ensure_question_schema     # init_db 导入本模块, 此处延迟导入
+
+        conn = self._connect()
+        try:
+            # 旧库先补齐 content_hash 等列
+            ensure_question_schema(conn)
+            ensure_schema(conn)
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            keep = conn.execute("SELECT type FROM questions WHERE id = ?", (keep_id,)).fetchone()
+            if keep is None:
+                raise ValueError(f"题目 {keep_id} 不存在")
+
+            moved = 0
+            now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            with conn:
+                for dup_id in duplicate_ids:
+                    if dup_id == keep_id:
+                        continue
+                    row = conn.execute("SELECT original_id, content_hash, type, question, answer "
+                                       "FROM questions WHERE id = ?", (dup_id,)).fetchone()
+                    if row is None:
+                        raise ValueError(f"题目 {dup_id} 不存在")
+                    if row[2] != keep[0]:
+                        raise ValueError(f"题目 {dup_id} 与 {keep_id} 题型不同, 不能合并")
+                    conn.execute("INSERT OR REPLACE INTO question_merges VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                 (dup_id, keep_id) + row + (now,))
+                    # 之前合并到这道题的记录一并改指向
+                    conn.execute("UPDATE question_merges SET merged_into = ? WHERE merged_into = ?",
+                                 (keep_id, dup_id))
+
+                    if "attempts" in tables:
+                        moved += conn.execute("UPDATE attempts SET question_id = ? WHERE question_id = ?",
+                                              (keep_id, dup_id)).rowcount
+                    if "paper_items" in tables:
+                        self._merge_paper_items(conn, keep_id, dup_id)
+                    if "review_state" in tables:
+                        self._merge_review_state(conn, keep_id, dup_id)
+                    conn.execute("DELETE FROM questions WHERE id = ?", (dup_id,))
+        finally:
+            conn.close()
+        # 删除触发器已登记, 顺带清掉重复题的签名和分桶
+        self.refresh()
+        return moved
+
+    @staticmethod
+    def _merge_paper_items(conn, keep_id, dup_id):
+        """试卷中的重复题换成保留的题, 选项顺序和重排后的答案按保留的题重新计算
+
+        原来的 option_order 在选项数相同时沿用, 否则按 (试卷, 位置) 派生的种子重新打乱;
+        同一份试卷里已经有保留的题时, 直接去掉重复题这一项。
+        """
+        from exam_paper import LETTERS, answer_position, shuffle_item     # exam_paper 间接导入本模块
+
+        q_type, n_options, answer = conn.execute(
+            "SELECT type, IFNULL(json_array_length(options), 0), answer FROM questions WHERE id = ?",
+            (keep_id,)).fetchone()
+        pos = answer_position(q_type, n_options, answer)
+        items = conn.execute("SELECT paper_id, position, option_order FROM paper_items WHERE question_id = ?",
+                             (dup_id,)).fetchall()
+        for paper_id, position, order in items:
+            if conn.execute("SELECT 1 FROM paper_items WHERE paper_id = ? AND question_id = ?",
+                            (paper_id, keep_id)).fetchone():
+                conn.execute("DELETE FROM paper_items WHERE paper_id = ? AND position = ?", (paper_id, position))
+                continue
+            if pos < 0:
+                order, paper_answer = None, None
+            elif order and sorted(order) == list(LETTERS[:n_options]):
+                paper_answer = LETTERS[order.index(LETTERS[pos])]
+            else:
+                order, paper_answer = shuffle_item(random.Random(f"merge:{paper_id}:{position}"), n_options, pos)
+            conn.execute("UPDATE paper_items SET question_id = ?, option_order = ?, answer = ? "
+                         "WHERE paper_id = ? AND position = ?", (keep_id, order, paper_answer, paper_id, position))
+
+    @staticmethod
+    def _merge_review_state(conn, keep_id, dup_id):
+        """两道题都有复习状态时保留更早到期的那份, 让题目尽早回到复习队列"""
+        states = dict(conn.execute("SELECT question_id, due FROM review_state WHERE question_id IN (?, ?)",
+                                   (keep_id, dup_id)))
+        if dup_id not in states:
+            return
+        if keep_id in states and states[keep_id] <= states[dup_id]:
+            conn.execute("DELETE FROM review_state WHERE question_id = ?", (dup_id,))
+            return
+        conn.execute("DELETE FROM review_state WHERE question_id = ?", (keep_id,))
+        conn.execute("UPDATE review_state SET question_id = ? WHERE question_id = ?", (keep_id, dup_id))
+
+
+class DuplicateGroups:
+    """并查集: 疑似重复的题目按连通分量分组"""
+
+    def __init__(self):
+        self.parent = {}
+        self.best = {}      # 题目 id -> 与组内其他题的最高相似度
+
+    def find(self, x):
+        parent = self.parent
+        root = parent.get(x, x)
+        if root == x:
+            return x
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while x != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a, b, score):
+        self.parent[self.find(a)] = self.find(b)
+        self.parent.setdefault(b, b)
+        for x in (a, b):
+            if score > self.best.get(x, 0):
+                self.best[x] = score
+
+    def __iter__(self):
+        """各组的题目 id 列表, 大的组在前"""
+        groups = {}
+        for x in self.parent:
+            groups.setdefault(self.find(x), []).append(x)
+        return iter(sorted((sorted(g) for g in groups.values()), key=lambda g: (-len(g), g[0])))
+
+
+def check_imported(db_path, question_ids, limit=10, file=sys.stdout):
+    """导入后调用: 增量更新索引, 列出本次导入新增 / 修改的题目 (question_ids) 中的疑似重复
+
+    首次建索引时 refresh 会处理全库, 但只有导入真正写入的题才参与比较。
+    """
+    index = DedupIndex(db_path)
+    index.refresh()
+    if not question_ids:
+        return
+    if len(question_ids) > CHECK_LIMIT:
+        print(f"本次导入 {len(question_ids)} 道, 运行 python dedup_index.py report 查看疑似重复", file=file)
+        return
+    pairs = index.similar_to(question_ids)
+    if not pairs:
+        return
+    conn = sqlite3.connect(db_path)
+    try:
+        print(f"疑似重复 {len(pairs)} 对 (python dedup_index.py report 查看全部分组):", file=file)
+        for qid, other, score in pairs[:limit]:
+            texts = dict(conn.execute("SELECT id, question FROM questions WHERE id IN (?, ?)", (qid, other)))
+            print(f"  {qid} ~ {other} ({score:.2f}): {texts.get(qid, '')[:30]}  |  {texts.get(other, '')[:30]}",
+                  file=file)
+    finally:
+        conn.close()
+
+
+# --- 命令行 ---
+
+def cmd_refresh(args):
+    started = time.perf_counter()
+    updated = DedupIndex(args.db).refresh()
+    print(f"更新签名 {len(updated)} 道  用时 {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+def cmd_report(args):
+    index = DedupIndex(args.db)
+    started = time.perf_counter()
+    index.refresh()
+    groups, oversized = index.find_groups(args.threshold)
+    clusters = list(groups)
+    print(f"疑似重复 {sum(len(g) for g in clusters)} 道, {len(clusters)} 组, 跳过超大桶 {oversized} 个  "
+          f"用时 {time.perf_counter() - started:.2f}s")
+
+    conn = sqlite3.connect(args.db)
+    try:
+        def details(ids):
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                yield from conn.execute(f"SELECT id, type, question, answer FROM questions "
+                                        f"WHERE id IN ({marks}) ORDER BY id", chunk)
+
+        for n, group in enumerate(clusters[:args.limit], 1):
+            print(f"\n[{n}] {len(group)} 道")
+            for qid, q_type, question, answer in details(group[:args.members]):
+                print(f"  {qid:>8} [{q_type}] ({groups.best.get(qid, 0):.2f}) {question[:60]}  ->  {answer}")
+            if len(group) > args.members:
+                print(f"  ... 另有 {len(group) - args.members} 道")
+
+        if args.out:
+            with open(args.out, "w", encoding="utf-8-sig", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["group", "question_id", "type", "similarity", "question", "answer"])
+                for n, group in enumerate(clusters, 1):
+                    writer.writerows((n, qid, q_type, round(groups.best.get(qid, 0), 3), question, answer)
+                                     for qid, q_type, question, answer in details(group))
+    finally:
+        conn.close()
+    return 0
+
+
+def cmd_merge(args):
+    moved = DedupIndex(args.db).merge(args.keep, args.duplicates)
+    print(f"已合并 {len(args.duplicates)} 道题到 {args.keep}, 改写作答记录 {moved} 条")
+    return 0
+
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default="quiz.db", help="SQLite 数据库路径")
+    parser = argparse.ArgumentParser(description="近似重复题检测与合并")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("refresh", parents=[common], help="增量更新去重索引")
+
+    report = commands.add_parser("report", parents=[common], help="列出疑似重复的题目")
+    report.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="相似度阈值 (0-1)")
+    report.add_argument("--limit", type=int, default=50, help="最多显示的组数")
+    report.add_argument("--members", type=int, default=20, help="每组最多显示的题数")
+    report.add_argument("--out", help="全部分组写成 CSV")
+
+    merge = commands.add_parser("merge", parents=[common], help="把重复题合并到一道题")
+    merge.add_argument("keep", type=int, help="保留的题目 id")
+    merge.add_argument("duplicates", type=int, nargs="+", help="要合并掉的题目 id")
+
+    args = parser.parse_args(argv)
+    handler = {"refresh": cmd_refresh, "report": cmd_report, "merge": cmd_merge}[args.command]
+    try:
+        return handler(args)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"去重失败: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
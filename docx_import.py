@@ -0,0 +1,278 @@
+"""从课堂练习 .docx 中提取选择 / 判断 / 填空题并导入 quiz.db
+
+用法:
+    python docx_import.py [文件或目录 ...] [--db quiz.db] [--workers N] [--dry-run] [--no-dedup]
+
+默认处理 课堂练习/ 下的全部 .docx。直接解析 docx 中的 word/document.xml,
+多个文档由进程池并行解析; 与库中已有题目 (按规范化后的题干 + 答案) 去重后一次性批量写入。
+只导入能确定答案的客观题, 计算题、问答题会被跳过。
+"""
+import os
+import re
+import sys
+import glob
+import time
+import hashlib
+import sqlite3
+import zipfile
+import argparse
+import unicodedata
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+from init_db import ensure_schema, content_hash, to_db_row
+from dedup_index import merged_questions, check_imported
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+DEFAULT_SOURCES = [os.path.join("课堂练习", "*.docx")]
+
+TRUE_FALSE_OPTIONS = ["正确 (T)", "错误 (F)"]
+TF_ANSWERS = {"T": "T", "F": "F", "X": "F", "×": "F", "√": "T", "✓": "T", "✗": "F"}
+
+_NUMBERED_RE = re.compile(r'^\s*(\d{1,3})\s*[.．、]\s*(\S.*)$')
+_OPTION_RE = re.compile(r'([A-D])\s*[.．、]\s*')
+_INLINE_CHOICE_RE = re.compile(r'[（(]\s*([A-D])\s*[)）]')
+# 答案紧贴在下划线之间, 如 "__主机____"; 下划线旁有空格的视为空白
+_BLANK_ANSWER_RE = re.compile(r'_{2,}([^_\s](?:[^_]*[^_\s])?)_{2,}')
+_BLANK_RE = re.compile(r'_{2,}')
+_TF_PAREN_RE = re.compile(r'[（(]\s*([TFX×√✓✗])\s*[)）]?\s*$')
+_TF_TAIL_RE = re.compile(r'[。.]\s*([TF])\s*$')
+_PUNCT_RE = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def read_paragraphs(path):
+    """按段落读出 docx 正文文本 (含表格单元格), 去掉空段落"""
+    with zipfile.ZipFile(path) as z:
+        root = ET.fromstring(z.read("word/document.xml"))
+    paragraphs = []
+    for para in root.iter(W_NS + "p"):
+        text = "".join(node.text or "" for node in para.iter(W_NS + "t"))
+        text = " ".join(text.split())
+        if text:
+            paragraphs.append(text)
+    return paragraphs
+
+
+def split_options(text):
+    """'A．电子元件 B．云盘 ...' -> [('A', '电子元件'), ('B', '云盘'), ...]"""
+    marks = list(_OPTION_RE.finditer(text))
+    if not marks or marks[0].start() != 0:
+        return []
+    options = []
+    for i, m in enumerate(marks):
+        end = marks[i + 1].start() if i + 1 < len(marks) else len(text)
+        options.append((m.group(1), text[m.end():end].strip()))
+    return options
+
+
+def make_question(q_type, question, options, answer, source):
+    return {"type": q_type, "question": question.strip(), "options": options,
+            "answer": answer.strip(), "source": source}
+
+
+def parse_true_false(text, source):
+    for pattern in (_TF_PAREN_RE, _TF_TAIL_RE):
+        m = pattern.search(text)
+        if m and len(text) > m.end() - m.start() + 4:
+            stem = text[:m.start()].strip()
+            return make_question("true_false", stem, list(TRUE_FALSE_OPTIONS), TF_ANSWERS[m.group(1)], source)
+    return None
+
+
+def parse_fill_in(text, source):
+    answers = _BLANK_ANSWER_RE.findall(text)
+    if not answers:
+        return None
+    stem = _BLANK_ANSWER_RE.sub("______", text)
+    return make_question("fill_in", stem, [], "、".join(a.strip() for a in answers), source)
+
+
+def extract_questions(path):
+    """解析单个 docx, 返回题目字典列表 (在子进程中运行)"""
+    paragraphs = read_paragraphs(path)
+    source = os.path.basename(path)
+    questions = []
+
+    pending = {}       # 题号 -> 等待答案表的题目
+    current = None     # 正在收集选项的选择题
+    table = None       # 正在读取的 "题号 / 答案" 表格单元
+
+    def finish_current():
+        nonlocal current
+        if current is None:
+            return
+        number, item = current
+        current = None
+        if len(item["options"]) >= 2:
+            item["type"] = "single_choice"
+            if item["answer"]:
+                questions.append(item)
+            else:
+                pending[number] = item
+        elif _BLANK_RE.search(item["question"]) and not item["answer"]:
+            # 只有空白没有答案的填空题, 等后面的答案表
+            item["type"] = "fill_in"
+            pending[number] = item
+
+    def finish_table():
+        nonlocal table
+        if table is None:
+            return
+        cells = [c for c in table if c not in ("题号", "答案")]
+        for number, answer in zip(cells[0::2], cells[1::2]):
+            item = pending.pop(number, None)
+            if item is None:
+                continue
+            if item["type"] == "true_false":
+                answer = TF_ANSWERS.get(answer, answer)
+            item["answer"] = answer
+            questions.append(item)
+        pending.clear()
+        table = None
+
+    for text in paragraphs:
+        # 答案表: "题号" "答案" 表头后跟着一串短单元格
+        if text in ("题号", "答案") and (table is not None or pending or current):
+            finish_current()
+            if table is None:
+                table = []
+            table.append(text)
+            continue
+        if table is not None:
+            if len(text) <= 12:
+                table.append(text)
+                continue
+            finish_table()
+
+        options = split_options(text)
+        if options and current is not None:
+            current[1]["options"].extend(f"{letter}. {body}" for letter, body in options)
+            continue
+
+        finish_current()
+
+        m = _NUMBERED_RE.match(text)
+        stem = m.group(2) if m else text
+
+        tf = parse_true_false(stem, source)
+        if tf:
+            questions.append(tf)
+            continue
+
+        fill = parse_fill_in(stem, source)
+        if fill:
+            questions.append(fill)
+            continue
+
+        if m:
+            number = m.group(1)
+            answer = ""
+            inline = _INLINE_CHOICE_RE.search(stem)
+            if inline:
+                answer = inline.group(1)
+                stem = _INLINE_CHOICE_RE.sub("( )", stem)
+            current = (number, make_question("", stem, [], answer, source))
+
+    finish_current()
+    finish_table()
+    return questions
+
+
+def dedupe_key(q_type, question, answer):
+    """去重键: 忽略全半角、空白和标点差异"""
+    text = unicodedata.normalize("NFKC", f"{q_type}|{question}|{answer}").lower()
+    return hashlib.sha1(_PUNCT_RE.sub("", text).encode("utf-8")).hexdigest()
+
+
+def collect_sources(paths):
+    files = []
+    for path in paths or DEFAULT_SOURCES:
+        if os.path.isdir(path):
+            files.extend(glob.glob(os.path.join(path, "*.docx")))
+        else:
+            files.extend(glob.glob(path))
+    # Word 打开文档时生成的 ~$ 临时文件不处理
+    return sorted(f for f in set(files) if not os.path.basename(f).startswith("~$"))
+
+
+def ingest(paths, db_path="quiz.db", workers=None, dry_run=False):
+    """返回统计字典: files / extracted / duplicates / inserted / seconds, 以及 new (待插入的行) / new_ids"""
+    started = time.perf_counter()
+    files = collect_sources(paths)
+
+    # 各文档互不依赖, 交给进程池并行解析; 结果按文件名顺序合并, 保证可复现
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(extract_questions, files))
+
+    conn = sqlite3.connect(db_path)
+    try:
+        ensure_schema(conn)
+        seen = {dedupe_key(t, q, a) for t, q, a in
+                conn.execute("SELECT type, question, answer FROM questions")}
+        # 合并掉的重复题也算已有, 不再重新导入
+        seen.update(dedupe_key(t, q, a) for t, q, a in merged_questions(conn, "type, question, answer"))
+
+        rows = []
+        duplicates = 0
+        for items in results:
+            for item in items:
+                key = dedupe_key(item["type"], item["question"], item["answer"])
+                if key in seen:
+                    duplicates += 1
+                    continue
+                seen.add(key)
+                digest = content_hash(item["type"], item["question"], item["options"], item["answer"])
+                rows.append(to_db_row((None, item["type"], item["question"], item["options"],
+                                       item["answer"], digest)))
+
+        new_ids = []
+        if rows and not dry_run:
+            # questions.id 是 AUTOINCREMENT, 本次插入的行都大于插入前的最大 id
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM questions").fetchone()[0]
+            with conn:
+                conn.executemany(
+                    "INSERT INTO questions (original_id, type, question, options, answer, content_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            new_ids = [r[0] for r in conn.execute("SELECT id FROM questions WHERE id > ?", (last_id,))]
+    finally:
+        conn.close()
+
+    return {
+        "files": len(files),
+        "extracted": sum(len(items) for items in results),
+        "duplicates": duplicates,
+        "inserted": 0 if dry_run else len(rows),
+        "new": rows,
+        "new_ids": new_ids,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="从课堂练习 docx 导入客观题到 quiz.db")
+    parser.add_argument("paths", nargs="*", help="docx 文件、目录或通配符, 默认 课堂练习/*.docx")
+    parser.add_argument("--db", default="quiz.db", help="SQLite 数据库路径")
+    parser.add_argument("--workers", type=int, default=None, help="解析进程数, 默认等于 CPU 核数")
+    parser.add_argument("--dry-run", action="store_true", help="只解析和去重, 不写入数据库")
+    parser.add_argument("--no-dedup", action="store_true", help="导入后不检查近似重复")
+    args = parser.parse_args(argv)
+
+    try:
+        stats = ingest(args.paths, args.db, args.workers, args.dry_run)
+    except (OSError, zipfile.BadZipFile, ET.ParseError, sqlite3.Error) as e:
+        print(f"导入失败: {e}", file=sys.stderr)
+        return 1
+
+    if args.dry_run:
+        for row in stats["new"]:
+            print(f"[{row[1]}] {row[2]}  ->  {row[4]}")
+    print(f"解析 {stats['files']} 个文档, 提取 {stats['extracted']} 题, 重复 {stats['duplicates']} 题, "
+          f"{'将新增' if args.dry_run else '新增'} {len(stats['new'])} 题  用时 {stats['seconds']:.2f}s")
+    if stats["inserted"] and not args.no_dedup:
+        check_imported(args.db, stats["new_ids"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
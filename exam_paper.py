@@ -0,0 +1,464 @@
+"""分层抽样组卷: 按 题型 × 章节 抽题, 打乱选择题选项并重排答案, 批量生成试卷
+
+    python exam_paper.py chapters [--db quiz.db]            # 按课程笔记为未归类的题目标注章节
+    python exam_paper.py generate --count 10000 --spec single_choice=20,true_false=10,fill_in=10
+                                  [--chapters 1-3,5] [--seed 2024] [--batch 名称] [--out papers.jsonl]
+    python exam_paper.py list [--db quiz.db]
+    python main.py --paper <试卷 id>                         # 在界面中按试卷答题
+
+每种题型的题量按所选各章的题目数成比例分配到各章 (最大余数法), 同一批次每份试卷的章节分布相同。
+第 n 份试卷由 (seed, n) 决定, 可单独重现; 同一批次内的试卷互不相同 (与已生成的试卷重复时换派生种子重抽)。
+默认写入 quiz.db 的 papers / paper_items 表; --out 为 .jsonl 时写出试卷和对应的答案文件。
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import sqlite3
+import argparse
+import datetime
+from array import array
+
+from init_db import ensure_schema
+from question_source import Question, QuestionSource
+from quiz_engine import TYPE_NAMES
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS papers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        batch TEXT NOT NULL,
+        number INTEGER NOT NULL,
+        seed TEXT NOT NULL,
+        spec TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_papers_batch ON papers(batch, number)",
+    # option_order 为试卷中各选项对应的原选项字母 ('CADB'), answer 为重排后的答案;
+    # 未打乱的题两者均为 NULL, 答案即题库中的原答案
+    """CREATE TABLE IF NOT EXISTS paper_items (
+        paper_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        question_id INTEGER NOT NULL,
+        option_order TEXT,
+        answer TEXT,
+        PRIMARY KEY (paper_id, position)
+    ) WITHOUT ROWID""",
+]
+
+LETTERS = "ABCDEFGH"
+SHUFFLE_TYPES = ("single_choice",)      # 判断题的 正确 / 错误 不打乱
+UNCLASSIFIED = 0                        # 未归类题目的章节号
+MAX_RETRIES = 20                        # 抽到重复试卷时的重抽次数
+
+_CHAPTER_RE = re.compile(r'第\s*(\d+)\s*章\s*(.*?)(?:\.md)?$')
+
+
+def ensure_paper_schema(conn):
+    ensure_schema(conn)
+    for sql in SCHEMA:
+        conn.execute(sql)
+    conn.commit()
+
+
+def parse_spec(text):
+    """'single_choice=20,true_false=10' -> {'single_choice': 20, 'true_false': 10}"""
+    spec = {}
+    for part in text.split(","):
+        if part.strip():
+            q_type, _, count = part.partition("=")
+            spec[q_type.strip()] = int(count)
+    if not spec or any(count < 0 for count in spec.values()):
+        raise ValueError(f"题量格式错误: {text}")
+    return spec
+
+
+def parse_chapters(text):
+    """'1-3,5' -> [1, 2, 3, 5]; 空表示全部章节"""
+    if not text:
+        return None
+    chapters = set()
+    for part in text.split(","):
+        lo, _, hi = part.partition("-")
+        chapters.update(range(int(lo), int(hi or lo) + 1))
+    return sorted(chapters)
+
+
+def allocate(total, sizes):
+    """按各层题量成比例分配 total 道题 (最大余数法, 整数运算), 每层不超过其题量"""
+    n = sum(sizes)
+    alloc = [total * size // n for size in sizes]
+    order = sorted(range(len(sizes)), key=lambda i: total * sizes[i] % n, reverse=True)
+    for i in order[:total - sum(alloc)]:
+        alloc[i] += 1
+    return alloc
+
+
+def option_body(option):
+    """'A. 电子元件' -> '电子元件'"""
+    return option.split(".", 1)[1].strip() if "." in option else option
+
+
+def reorder_options(options, order):
+    """按 order ('CADB') 重排选项并重新编号"""
+    return [f"{LETTERS[i]}. {option_body(options[LETTERS.index(c)])}" for i, c in enumerate(order)]
+
+
+def answer_position(q_type, n_options, answer):
+    """可打乱的选择题返回答案字母的下标, 否则为 -1"""
+    pos = LETTERS.find(answer) if q_type in SHUFFLE_TYPES and len(answer) == 1 else -1
+    return pos if 0 <= pos < n_options else -1
+
+
+def shuffle_item(rng, n_options, answer_pos):
+    """随机打乱选项: (option_order, 重排后的答案)"""
+    order = "".join(rng.sample(LETTERS[:n_options], n_options))
+    return order, LETTERS[order.index(LETTERS[answer_pos])]
+
+
+class Stratum:
+    """同一题型、同一章节的全部题目; 选项数和答案位置与 ids 一一对应"""
+
+    __slots__ = ("ids", "n_options", "answer_pos")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.n_options = array("b")
+        self.answer_pos = array("b")    # 可打乱的选择题为答案字母的下标, 否则为 -1
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class StrataIndex:
+    """(题型, 章节) -> Stratum; 组卷前全库只扫描一遍, 之后抽题不再读库"""
+
+    def __init__(self, conn):
+        self.strata = {}
+        for qid, q_type, chapter, n_options, answer in conn.execute(
+                "SELECT id, type, IFNULL(chapter, 0), IFNULL(json_array_length(options), 0), answer "
+                "FROM questions ORDER BY id"):
+            stratum = self.strata.get((q_type, chapter))
+            if stratum is None:
+                stratum = self.strata[(q_type, chapter)] = Stratum()
+            stratum.ids.append(qid)
+            stratum.n_options.append(n_options)
+            stratum.answer_pos.append(answer_position(q_type, n_options, answer))
+
+    def chapters(self):
+        return sorted({chapter for _, chapter in self.strata})
+
+    def plan(self, spec, chapters=None):
+        """[(题型, 章节, Stratum, 抽题数), ...]; 题量不足时抛出 ValueError"""
+        plan = []
+        for q_type, total in spec.items():
+            strata = [(chapter, stratum) for (t, chapter), stratum in sorted(self.strata.items())
+                      if t == q_type and (chapters is None or chapter in chapters)]
+            available = sum(len(stratum) for _, stratum in strata)
+            if total > available:
+                raise ValueError(f"{TYPE_NAMES.get(q_type, q_type)} 只有 {available} 道, 不够抽 {total} 道")
+            if total:
+                alloc = allocate(total, [len(stratum) for _, stratum in strata])
+                plan.extend((q_type, chapter, stratum, k) for (chapter, stratum), k in zip(strata, alloc) if k)
+        return plan
+
+
+class PaperGenerator:
+    """按抽样计划生成试卷; 每份试卷: [(question_id, option_order, answer), ...]"""
+
+    def __init__(self, index, spec, chapters=None, seed=0):
+        self.spec = spec
+        self.chapters = chapters
+        self.seed = seed
+        self.plan = index.plan(spec, chapters)
+        self.duplicates = 0     # 重抽多次仍与已有试卷重复的份数
+
+    def paper(self, number, attempt=0):
+        # 字符串种子经 SHA-512 派生, 跨进程、跨平台都可重现
+        rng = random.Random(f"{self.seed}:{number}:{attempt}")
+        items = []
+        for _, _, stratum, k in self.plan:
+            for i in rng.sample(range(len(stratum)), k):
+                pos = stratum.answer_pos[i]
+                if pos < 0:
+                    items.append((stratum.ids[i], None, None))
+                    continue
+                items.append((stratum.ids[i],) + shuffle_item(rng, stratum.n_options[i], pos))
+        return items
+
+    def generate(self, count, start=1):
+        """依次产出 (编号, 试卷); 与已产出的试卷重复时换一个派生种子重抽"""
+        seen = set()
+        for number in range(start, start + count):
+            for attempt in range(MAX_RETRIES):
+                items = self.paper(number, attempt)
+                key = hash(tuple(items))
+                if key not in seen:
+                    break
+            else:
+                self.duplicates += 1
+            seen.add(key)
+            yield number, items
+
+
+# --- 写出 ---
+
+def write_papers_db(conn, generator, count, batch, chunk_size=1000):
+    """写入 papers / paper_items, 一个事务; 返回试卷数"""
+    created_at = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    spec = json.dumps({"spec": generator.spec, "chapters": generator.chapters}, ensure_ascii=False)
+    written = 0
+    with conn:
+        if conn.execute("SELECT 1 FROM papers WHERE batch = ? LIMIT 1", (batch,)).fetchone():
+            raise ValueError(f"批次已存在: {batch}")
+        rows = []
+        for number, items in generator.generate(count):
+            paper_id = conn.execute(
+                "INSERT INTO papers (batch, number, seed, spec, created_at) VALUES (?, ?, ?, ?, ?)",
+                (batch, number, str(generator.seed), spec, created_at)).lastrowid
+            rows.extend((paper_id, position, qid, order, answer)
+                        for position, (qid, order, answer) in enumerate(items, 1))
+            written += 1
+            if written % chunk_size == 0:
+                conn.executemany("INSERT INTO paper_items VALUES (?, ?, ?, ?, ?)", rows)
+                rows = []
+        conn.executemany("INSERT INTO paper_items VALUES (?, ?, ?, ?, ?)", rows)
+    return written
+
+
+def fetch_questions(conn, question_ids):
+    """id -> Question, 按块用 IN 查询"""
+    ids = sorted(set(question_ids))
+    result = {}
+    for start in range(0, len(ids), 900):
+        chunk = ids[start:start + 900]
+        for row in conn.execute("SELECT id, type, question, options, answer FROM questions "
+                                f"WHERE id IN ({','.join('?' * len(chunk))})", chunk):
+            result[row[0]] = QuestionSource._decode(row)
+    return result
+
+
+def write_papers_jsonl(conn, generator, count, batch, out_path, key_path, chunk_size=500):
+    """试卷 (不含答案) 和答案分别写成 JSON Lines; 题目内容按块批量读取"""
+    written = 0
+    with open(out_path, "w", encoding="utf-8") as out, open(key_path, "w", encoding="utf-8") as key:
+        papers = generator.generate(count)
+        while True:
+            chunk = [paper for _, paper in zip(range(chunk_size), papers)]
+            if not chunk:
+                break
+            questions = fetch_questions(conn, (qid for _, items in chunk for qid, _, _ in items))
+            for number, items in chunk:
+                rendered, answers = [], []
+                for position, (qid, order, answer) in enumerate(items, 1):
+                    q = questions[qid]
+                    rendered.append({"position": position, "question_id": qid, "type": q.type,
+                                     "question": q.question,
+                                     "options": reorder_options(q.options, order) if order else list(q.options)})
+                    answers.append(answer or q.answer)
+                out.write(json.dumps({"batch": batch, "paper": number, "items": rendered},
+                                     ensure_ascii=False) + "\n")
+                key.write(json.dumps({"batch": batch, "paper": number, "answers": answers},
+                                     ensure_ascii=False) + "\n")
+            written += len(chunk)
+    return written
+
+
+# --- 按试卷答题 ---
+
+class PaperSource:
+    """一份试卷的题目序列, 接口同 QuestionSource; 选项已按试卷顺序重排, 答案已重映射"""
+
+    def __init__(self, paper_id, title, questions, orders):
+        self.paper_id = paper_id
+        self.title = title
+        self.questions = questions
+        self.orders = orders                # 题目 id -> option_order (未打乱的题没有)
+        self.positions = {q.id: i for i, q in enumerate(questions)}
+
+    def __len__(self):
+        return len(self.questions)
+
+    def __bool__(self):
+        return bool(self.questions)
+
+    def __getitem__(self, index):
+        return self.questions[index]
+
+    def __iter__(self):
+        return iter(self.questions)
+
+    def indexes_of(self, question_ids):
+        return {qid: self.positions[qid] for qid in question_ids if qid in self.positions}
+
+    def original_answer(self, question, answer):
+        """试卷上的选项字母 -> 题库中的原选项字母, 作答记录按题库原选项保存"""
+        order = self.orders.get(question.id)
+        if order is None or answer not in LETTERS[:len(order)]:
+            return answer
+        return order[LETTERS.index(answer)]
+
+    def close(self):
+        pass
+
+
+def load_paper(db_path, paper_id):
+    """读出一份试卷; 不存在时返回 None"""
+    conn = sqlite3.connect(db_path)
+    try:
+        head = conn.execute("SELECT batch, number FROM papers WHERE id = ?", (paper_id,)).fetchone()
+        if head is None:
+            return None
+        questions, orders = [], {}
+        for qid, order, paper_answer, q_type, question, options, answer in conn.execute(
+                "SELECT i.question_id, i.option_order, i.answer, q.type, q.question, q.options, q.answer "
+                "FROM paper_items i JOIN questions q ON q.id = i.question_id "
+                "WHERE i.paper_id = ? ORDER BY i.position", (paper_id,)):
+            options = json.loads(options) if options else []
+            if order:
+                options = reorder_options(options, order)
+                orders[qid] = order
+            questions.append(Question(qid, q_type, question, options, paper_answer or answer))
+    finally:
+        conn.close()
+    return PaperSource(paper_id, f"{head[0]} 第 {head[1]} 卷", questions, orders)
+
+
+# --- 章节归类 ---
+
+def chapter_names(base_dir="."):
+    """章节号 -> 章名, 取自 '第N章 名称.md' 笔记文件名"""
+    names = {}
+    for name in os.listdir(base_dir):
+        m = _CHAPTER_RE.match(name)
+        if m and name.endswith(".md"):
+            names[int(m.group(1))] = m.group(2).strip()
+    return names
+
+
+def assign_chapters(db_path, base_dir=".", top=5):
+    """为 chapter 为空的题目标注章节: 用题干 + 选项检索章节笔记, 按前几条命中的相关度投票
+
+    返回 {章节号: 新归类题数}; 没有任何命中的题目保持未归类。
+    """
+    from search_index import SearchIndex, related_query
+
+    index = SearchIndex(db_path, base_dir)
+    index.refresh()
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        ensure_schema(conn)
+        updates = []
+        for qid, question, options in conn.execute(
+                "SELECT id, question, options FROM questions WHERE chapter IS NULL").fetchall():
+            match = related_query(question + " " + " ".join(json.loads(options) if options else []))
+            if match is None:
+                continue
+            votes = {}
+            for path, score in conn.execute(
+                    "SELECT s.path, bm25(note_fts) AS score FROM note_fts "
+                    "JOIN note_sections s ON s.id = note_fts.rowid "
+                    "WHERE note_fts MATCH ? ORDER BY score LIMIT ?",
+                    (match, top)):
+                m = _CHAPTER_RE.match(os.path.basename(path))
+                if m:
+                    # bm25 越小越相关
+                    chapter = int(m.group(1))
+                    votes[chapter] = votes.get(chapter, 0.0) - score
+            if votes:
+                updates.append((max(votes, key=votes.get), qid))
+        with conn:
+            conn.executemany("UPDATE questions SET chapter = ? WHERE id = ?", updates)
+    finally:
+        conn.close()
+
+    counts = {}
+    for chapter, _ in updates:
+        counts[chapter] = counts.get(chapter, 0) + 1
+    return counts
+
+
+# --- 命令行 ---
+
+def cmd_chapters(args):
+    counts = assign_chapters(args.db, os.path.dirname(os.path.abspath(__file__)))
+    names = chapter_names(os.path.dirname(os.path.abspath(__file__)))
+    print(f"新归类 {sum(counts.values())} 道题")
+    for chapter in sorted(counts):
+        print(f"  第{chapter}章 {names.get(chapter, '')}: {counts[chapter]}")
+    return 0
+
+
+def cmd_generate(args):
+    spec = parse_spec(args.spec)
+    chapters = parse_chapters(args.chapters)
+    batch = args.batch or f"{args.seed}-{datetime.datetime.now():%Y%m%d%H%M%S}"
+
+    started = time.perf_counter()
+    conn = sqlite3.connect(args.db)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        ensure_paper_schema(conn)
+        generator = PaperGenerator(StrataIndex(conn), spec, chapters, args.seed)
+        if args.out:
+            key_path = args.key or os.path.splitext(args.out)[0] + "_key.jsonl"
+            written = write_papers_jsonl(conn, generator, args.count, batch, args.out, key_path)
+        else:
+            written = write_papers_db(conn, generator, args.count, batch)
+    finally:
+        conn.close()
+
+    seconds = time.perf_counter() - started
+    print(f"批次 {batch}: 生成 {written} 份试卷, 每份 {sum(k for *_, k in generator.plan)} 题, "
+          f"重复 {generator.duplicates} 份  用时 {seconds:.2f}s")
+    for q_type, chapter, stratum, k in generator.plan:
+        where = f"第{chapter}章" if chapter != UNCLASSIFIED else "未归类"
+        print(f"  {TYPE_NAMES.get(q_type, q_type)} {where}: 每份 {k} 道, 取自 {len(stratum)} 道")
+    return 0
+
+
+def cmd_list(args):
+    conn = sqlite3.connect(args.db)
+    try:
+        ensure_paper_schema(conn)
+        rows = conn.execute("SELECT batch, MIN(id), MAX(id), COUNT(*), seed, spec, created_at "
+                            "FROM papers GROUP BY batch ORDER BY MIN(id)").fetchall()
+    finally:
+        conn.close()
+    for batch, first, last, count, seed, spec, created_at in rows:
+        print(f"{batch}: {count} 份 (试卷 id {first}-{last}), seed {seed}, {spec}, {created_at}")
+    return 0
+
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default="quiz.db", help="SQLite 数据库路径")
+    parser = argparse.ArgumentParser(description="分层抽样组卷")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("chapters", parents=[common], help="按课程笔记为未归类的题目标注章节")
+
+    generate = commands.add_parser("generate", parents=[common], help="批量生成试卷")
+    generate.add_argument("--count", type=int, default=1, help="试卷份数")
+    generate.add_argument("--spec", default="single_choice=20,true_false=10,fill_in=10",
+                          help="各题型题量, 如 single_choice=20,true_false=10,fill_in=10")
+    generate.add_argument("--chapters", help="抽题范围, 如 1-3,5 (0 为未归类); 默认全部")
+    generate.add_argument("--seed", default="0", help="随机种子")
+    generate.add_argument("--batch", help="批次名称, 默认由种子和时间生成")
+    generate.add_argument("--out", help="写成 JSON Lines 而不是写入数据库")
+    generate.add_argument("--key", help="答案文件路径, 默认为 <out>_key.jsonl")
+
+    commands.add_parser("list", parents=[common], help="列出已生成的试卷批次")
+
+    args = parser.parse_args(argv)
+    handler = {"chapters": cmd_chapters, "generate": cmd_generate, "list": cmd_list}[args.command]
+    try:
+        return handler(args)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"组卷失败: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""从 questions.json 导入 / 增量同步题库到 quiz.db
+
+用法:
+    python init_db.py [questions.json] [--db quiz.db] [--no-dedup]
+
+以 original_id (即 JSON 中的 id) 为键, 按内容哈希比较, 只写入新增或有变化的题目。
+"""
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+import argparse
+
+from dedup_index import merged_questions, check_imported
+
+# 题型规范化: 旧数据中的 fill_in_the_blank 统一为 fill_in
+TYPE_ALIASES = {
+    "fill_in_the_blank": "fill_in",
+}
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS questions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            original_id INTEGER,
+            type TEXT NOT NULL,
+            question TEXT NOT NULL,
+            options TEXT,
+            answer TEXT NOT NULL
+        )""",
+]
+
+UPSERT_SQL = """
+    INSERT INTO questions (original_id, type, question, options, answer, content_hash)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(original_id) DO UPDATE SET
+        type = excluded.type,
+        question = excluded.question,
+        options = excluded.options,
+        answer = excluded.answer,
+        content_hash = excluded.content_hash
+"""
+
+
+def ensure_schema(conn):
+    """建表, 并为旧库补上 content_hash / chapter 列和 original_id 唯一索引"""
+    for sql in SCHEMA:
+        conn.execute(sql)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(questions)")}
+    if "content_hash" not in columns:
+        conn.execute("ALTER TABLE questions ADD COLUMN content_hash TEXT")
+    # 所属章节号, 未归类为 NULL (见 exam_paper.py chapters)
+    if "chapter" not in columns:
+        conn.execute("ALTER TABLE questions ADD COLUMN chapter INTEGER")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_questions_original_id ON questions(original_id)")
+    conn.commit()
+
+
+def normalize_type(q_type):
+    return TYPE_ALIASES.get(q_type, q_type)
+
+
+def content_hash(q_type, question, options, answer):
+    payload = "\x1f".join((q_type, question, "\x1e".join(options), answer))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def normalize_question(item):
+    """JSON 对象 -> (original_id, type, question, options, answer, hash)
+
+    options 仍是列表, 只有需要写库的行才序列化成 JSON。
+    """
+    q_type = normalize_type(item["type"])
+    question = str(item["question"]).strip()
+    options = [str(opt) for opt in item.get("options") or []]
+    answer = str(item["answer"]).strip()
+    return (item["id"], q_type, question, options, answer,
+            content_hash(q_type, question, options, answer))
+
+
+def to_db_row(row):
+    original_id, q_type, question, options, answer, digest = row
+    return (original_id, q_type, question, json.dumps(options, ensure_ascii=False), answer, digest)
+
+
+def iter_json_array(f, chunk_size=1 << 16):
+    """逐个产出顶层 JSON 数组中的元素, 不把整个文件读入内存"""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    started = False
+    eof = False
+
+    while True:
+        # 跳过空白和分隔符
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            chunk = f.read(chunk_size)
+            buf, pos = buf[pos:] + chunk, 0
+            eof = not chunk
+
+        if pos >= len(buf):
+            raise ValueError("JSON 数组不完整")
+        if not started:
+            if buf[pos] != "[":
+                raise ValueError("题库文件的顶层必须是 JSON 数组")
+            started = True
+            pos += 1
+            continue
+        if buf[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # 当前对象跨越了块边界, 继续读入
+            chunk = f.read(chunk_size)
+            buf, pos = buf[pos:] + chunk, 0
+            eof = not chunk
+            continue
+        yield item
+        pos = end
+
+
+def load_existing_hashes(conn):
+    """original_id -> 内容哈希; 旧库没有哈希的行按当前内容现场计算并回填"""
+    hashes = {}
+    backfill = []
+    for row_id, original_id, q_type, question, options, answer, digest in conn.execute(
+            "SELECT id, original_id, type, question, options, answer, content_hash FROM questions "
+            "WHERE original_id IS NOT NULL"):
+        if digest is None:
+            digest = content_hash(q_type, question, json.loads(options) if options else [], answer)
+            backfill.append((digest, row_id))
+        hashes[original_id] = digest
+    if backfill:
+        conn.executemany("UPDATE questions SET content_hash = ? WHERE id = ?", backfill)
+    # 已合并掉的重复题按合并时的内容视为已存在, 内容没变就不会被重新导入
+    for original_id, digest in merged_questions(conn, "original_id, content_hash"):
+        if original_id is not None:
+            hashes.setdefault(original_id, digest)
+    return hashes
+
+
+def import_questions(json_path, db_path="quiz.db", batch_size=5000):
+    """返回统计字典: parsed / inserted / updated / unchanged / seconds, 以及写入的题目 id 列表 changed"""
+    started = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    ensure_schema(conn)
+
+    stats = {"parsed": 0, "inserted": 0, "updated": 0, "unchanged": 0}
+    written = []    # 新增或有变化的 original_id
+    try:
+        with conn:
+            existing = load_existing_hashes(conn)
+            batch = []
+            with open(json_path, "r", encoding="utf-8") as f:
+                for item in iter_json_array(f):
+                    row = normalize_question(item)
+                    stats["parsed"] += 1
+
+                    old = existing.get(row[0])
+                    if old == row[5]:
+                        stats["unchanged"] += 1
+                        continue
+                    stats["inserted" if old is None else "updated"] += 1
+                    existing[row[0]] = row[5]
+                    written.append(row[0])
+
+                    batch.append(to_db_row(row))
+                    if len(batch) >= batch_size:
+                        conn.executemany(UPSERT_SQL, batch)
+                        batch = []
+            if batch:
+                conn.executemany(UPSERT_SQL, batch)
+
+        changed = []
+        for i in range(0, len(written), 500):
+            chunk = written[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            changed.extend(r[0] for r in conn.execute(
+                f"SELECT id FROM questions WHERE original_id IN ({marks})", chunk))
+        stats["changed"] = changed
+    finally:
+        conn.close()
+
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="从 questions.json 导入题库到 quiz.db")
+    parser.add_argument("json_path", nargs="?", default="questions.json", help="题库 JSON 文件")
+    parser.add_argument("--db", default="quiz.db", help="SQLite 数据库路径")
+    parser.add_argument("--batch-size", type=int, default=5000, help="每批 executemany 的行数")
+    parser.add_argument("--no-dedup", action="store_true", help="导入后不检查近似重复")
+    args = parser.parse_args(argv)
+
+    try:
+        stats = import_questions(args.json_path, args.db, args.batch_size)
+    except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+        print(f"导入失败: {e}", file=sys.stderr)
+        return 1
+
+    rate = stats["parsed"] / stats["seconds"] if stats["seconds"] > 0 else 0
+    print(f"解析 {stats['parsed']} 题: 新增 {stats['inserted']}, 更新 {stats['updated']}, "
+          f"未变化 {stats['unchanged']}  用时 {stats['seconds']:.2f}s ({rate:,.0f} 行/秒)")
+    if not args.no_dedup:
+        check_imported(args.db, stats["changed"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
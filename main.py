@@ -1,89 +1,300 @@
+import os
 import sys
-import json
-import sqlite3  # [新增] 导入sqlite3
+import time
+import sqlite3
+import argparse
 import datetime
+import threading
+
+# 启动计时起点 (--profile-startup), 放在导入 PySide6 之前
+STARTED_AT = time.perf_counter()
+
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                               QHBoxLayout, QLabel, QPushButton, QRadioButton, 
-                               QLineEdit, QButtonGroup, QMessageBox, QScrollArea, 
-                               QDialog, QGridLayout, QFrame, QFileDialog)
+                               QHBoxLayout, QLabel, QPushButton, QMessageBox, QScrollArea, 
+                               QLineEdit, QFrame, QFileDialog, QProgressDialog)
 from PySide6.QtCore import Qt, QSize, QTimer
 from PySide6.QtGui import QFont, QKeyEvent
 
+# 首屏只需要以下模块; 概览、搜索、导出等在首次使用时才导入
+from question_source import QuestionSource, load_first_question
+from option_panel import OptionPanel, NavLatency
+from trace_overlay import FrameOverlay
+from session_state import SCORE_PER_CORRECT
+from quiz_engine import QuizEngine, TYPE_NAMES, CHOICE_TYPES, FILL_TYPES
+from startup_loader import StartupLoader, StartupProfiler
+from perf_trace import tracer
+
+DB_PATH = "quiz.db"
+
+IMPORTED_AT = time.perf_counter()
+
+# 间隔复习时预取的题目数
+REVIEW_PREFETCH = 3
+
+# 作答用时超过 10 分钟视为中途离开, 不计入平均用时
+MAX_ANSWER_MS = 10 * 60 * 1000
+
+# 快捷键 -> 选项值
+SHORTCUT_KEYS = {
+    Qt.Key_A: "A", Qt.Key_B: "B", Qt.Key_C: "C", Qt.Key_D: "D",
+    Qt.Key_T: "T", Qt.Key_F: "F",
+}
+
 class QuizApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, profile_startup=False, server=None, paper_id=None):
         super().__init__()
+        self.profiler = StartupProfiler(profile_startup, STARTED_AT)
+        self.profiler.mark("模块导入", IMPORTED_AT)
+        self.profiler.mark("创建窗口")
+        if tracer.enabled and tracer.widget_counter is None:
+            tracer.widget_counter = lambda: len(QApplication.allWidgets())
 
         self.setWindowTitle("计算机组成原理刷题系统 v4.0 (数据库版)")
         self.resize(1000, 700)
 
         # --- 数据初始化 ---
-        self.questions = []
+        # 服务器地址; 设置后题目、判分和作答记录都走答题服务 (quiz_server.py)
+        self.server = server
+        # 按试卷答题时的试卷 id 和 PaperSource (exam_paper.py)
+        self.paper_id = paper_id
+        self.paper = None
+        self.engine = QuizEngine([])
         self.current_index = 0
-        self.score = 0
-        self.question_status = [] 
-        self.user_answers_log = {} 
+        self.attempt_store = None
+        self.session_id = None
+        self.search_index = None
+        self.notes_viewer = None
+
+        # 启动加载: 首题先显示, 其余在后台线程中加载
+        self.loader = None
+        self.loading = True
+
+        # 间隔复习模式
+        self.scheduler = None
+        self.review_mode = False
+        self.review_result = None
+        self.review_index_cache = {}
+
+        # 后台导出任务
+        self.export_worker = None
+
+        # 作答计时: (题目 id, 显示时间)
+        self.answer_timer = (None, 0.0)
         
         # 字体设置
         self.font_title = QFont("Microsoft YaHei", 12, QFont.Bold)
         self.font_text = QFont("Microsoft YaHei", 12)
         self.font_option = QFont("Microsoft YaHei", 11)
 
-        # --- 加载数据 ---
-        self.load_data()
-
         # --- 界面布局初始化 ---
         self.setup_ui()
+        self.profiler.mark("界面构建")
+
+        # --- 启动: 先显示首题, 再后台加载 ---
+        self.start_loading()
+
+    # GUI 只是引擎的客户端, 以下属性都直接转发给引擎
+    @property
+    def questions(self):
+        return self.engine.questions
+
+    @property
+    def session(self):
+        return self.engine.session
+
+    @property
+    def user_answers_log(self):
+        return self.engine.answers
+
+    @tracer.traced("start_loading")
+    def start_loading(self):
+        """按主键只取首题并立即显示, 题库规模、上次会话等交给 StartupLoader"""
+        self.set_controls_enabled(False)
+        if self.server:
+            # 服务器模式: 连上服务器之前没有可显示的题目
+            self.status_label.setText(f"正在连接答题服务器 {self.server} ...")
+            for button in (self.btn_prev, self.btn_submit, self.btn_next):
+                button.setEnabled(False)
+        else:
+            try:
+                first = load_first_question(DB_PATH)
+                if self.paper_id is not None:
+                    # 一份试卷只有几十道题, 直接整份读出
+                    from exam_paper import load_paper
+                    self.paper = load_paper(DB_PATH, self.paper_id)
+            except sqlite3.Error as e:
+                self.show_load_error(f"无法读取数据库: {e}  请先运行 init_db.py")
+                return
+            if first is None:
+                self.show_load_error("数据库中没有题目数据, 请先运行 init_db.py")
+                return
+            if self.paper_id is not None and not self.paper:
+                self.show_load_error(f"试卷 {self.paper_id} 不存在或没有题目, 请先运行 exam_paper.py generate")
+                return
 
-        # --- 启动 ---
-        if self.questions:
+            # 加载期间先用只含首题 (或整份试卷) 的引擎, 用户可以直接作答
+            if self.paper is not None:
+                self.setWindowTitle(f"{self.windowTitle()} - 试卷: {self.paper.title}")
+                self.engine = QuizEngine(self.paper)
+            else:
+                self.engine = QuizEngine([first])
             self.show_question()
+            self.profiler.mark("首题就绪")
+
+        self.loader = StartupLoader(DB_PATH, self, server=self.server, paper_id=self.paper_id)
+        self.loader.loaded.connect(self.on_loaded)
+        self.loader.failed.connect(self.on_load_failed)
+        self.loader.start()
+
+    @tracer.traced("on_loaded")
+    def on_loaded(self, result):
+        preview = self.engine
+        if self.server:
+            from quiz_client import QuizClient, RemoteQuestionSource, RemoteQuizEngine
+            source = RemoteQuestionSource(QuizClient(self.server), result["count"], result["page_size"])
+            self.engine = RemoteQuizEngine(source, result["session_id"])
+        elif self.paper is not None:
+            self.engine = QuizEngine(self.paper)
         else:
-            QMessageBox.critical(self, "错误", "题库加载失败！请确保 'quiz.db' 文件存在。")
-
-    def load_data(self):
-        """[修改] 从 SQLite 数据库读取题目"""
+            self.engine = QuizEngine(QuestionSource(DB_PATH, count=result["count"]))
+        self.engine.restore(result["rows"], result["index_map"])
+        self.attempt_store = result["attempt_store"]
+        self.scheduler = result["scheduler"]
+        self.session_id = result["session_id"]
+
+        # 加载期间已经答过的题 (只可能是首题), 按正式会话补记
+        for index, answer in preview.answers.items():
+            is_correct = self.engine.submit(index, answer)
+            self.persist_attempt(self.questions[index], answer, is_correct)
+
+        self.finish_loading()
+        if not self.server:
+            self.start_search_index()
+
+    def on_load_failed(self, message):
+        # 只影响保存, 首题仍可作答
+        self.show_load_error(message)
+        self.finish_loading()
+        # 全文索引只在加载成功后建立
+        self.search_edit.setEnabled(False)
+
+    def finish_loading(self):
+        self.loading = False
+        self.loader = None
+        self.set_controls_enabled(True)
+        if self.questions:
+            self.show_question()
+        self.profiler.mark("后台加载完成")
+        self.report_startup()
+
+    def show_load_error(self, message):
+        """加载错误显示在状态栏, 不弹模态框"""
+        self.statusBar().showMessage(message)
+        if not self.questions:
+            self.status_label.setText("题库加载失败")
+            self.question_label.setText(message)
+            for button in (self.btn_prev, self.btn_submit, self.btn_next):
+                button.setEnabled(False)
+
+    def set_controls_enabled(self, enabled):
+        # 这些功能依赖完整题库或会话, 加载完成前禁用
+        for widget in (self.search_edit, self.btn_restart, self.btn_review, self.btn_export, self.btn_stats,
+                       self.btn_preview, self.btn_notes):
+            widget.setEnabled(enabled)
+        if self.server:
+            # 搜索、复习、导出、统计和笔记依赖本地数据库
+            for widget in (self.search_edit, self.btn_review, self.btn_export, self.btn_stats, self.btn_notes):
+                widget.setEnabled(False)
+        if self.paper is not None:
+            # 复习队列里的题不一定在这份试卷中
+            self.btn_review.setEnabled(False)
+
+    def report_startup(self):
+        # 首次绘制和后台加载都完成后才输出
+        if self.profiler.has("首次绘制") and not self.loading:
+            self.profiler.report()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.frame_overlay.isVisible():
+            self.frame_overlay.refresh()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.profiler.enabled and not self.profiler.has("首次绘制"):
+            self.profiler.mark("首次绘制")
+            self.report_startup()
+
+    def persist_attempt(self, q_data, user_ans, is_correct, elapsed_ms=None):
+        if self.paper is not None:
+            # 试卷中的选项顺序是打乱过的, 作答记录按题库原选项保存
+            user_ans = self.paper.original_answer(q_data, user_ans)
+        if self.attempt_store is not None:
+            self.attempt_store.log_attempt(self.session_id, q_data.id, user_ans, is_correct, elapsed_ms)
+            # 写库在后台线程, 之前批次的失败在这里报告
+            failure = self.attempt_store.take_error()
+            if failure is not None:
+                error, lost = failure
+                self.show_save_error(f"{lost} 条作答记录保存失败: {error}")
+        if self.scheduler is not None:
+            self.scheduler.record(q_data.id, is_correct)
+
+    def show_save_error(self, message):
+        """保存失败显示在状态栏, 同 show_load_error"""
+        self.statusBar().showMessage(message)
+
+    def flush_attempts(self):
+        """把写队列中的作答记录落盘; 写入失败时在状态栏提示"""
         try:
-            # 连接数据库
-            conn = sqlite3.connect("quiz.db")
-            cursor = conn.cursor()
-            
-            # 查询所有题目
-            cursor.execute("SELECT id, type, question, options, answer FROM questions ORDER BY id")
-            rows = cursor.fetchall()
-            
-            self.questions = []
-            
-            for row in rows:
-                # 数据库取出的 options 是 JSON 字符串，需要转回 Python 列表
-                options_list = json.loads(row[3]) if row[3] else []
-                
-                # 构造字典，保持与原有逻辑兼容
-                q_data = {
-                    "id": row[0],
-                    "type": row[1],
-                    "question": row[2],
-                    "options": options_list,
-                    "answer": row[4]
-                }
-                self.questions.append(q_data)
-                
-            conn.close()
-            
-            # 初始化状态列表
-            self.question_status = [None] * len(self.questions)
-            
-            if not self.questions:
-                raise ValueError("数据库中没有题目数据")
-
+            self.attempt_store.flush()
         except sqlite3.Error as e:
-            self.questions = []
-            QMessageBox.critical(self, "数据库错误", f"无法读取数据库: {e}\n请先运行 init_db.py")
-        except Exception as e:
-            self.questions = []
-            QMessageBox.critical(self, "错误", f"加载数据出错: {e}")
+            self.show_save_error(f"作答记录保存失败: {e}")
+
+    def start_new_session(self):
+        """开始新的一轮: 清空当前状态, 历史记录仍保留在数据库中"""
+        if self.session_id is None:
+            return
+        reply = QMessageBox.question(self, "重新开始", "确定开始新的一轮答题吗？\n当前进度会保存在历史记录中。")
+        if reply != QMessageBox.Yes:
+            return
+        self.set_review_mode(False)
+        if self.server:
+            try:
+                self.session_id = self.engine.new_session()
+            except OSError as e:
+                self.statusBar().showMessage(str(e))
+                return
+        else:
+            self.session_id = self.attempt_store.new_session(self.paper_id)
+            self.engine.reset()
+        self.current_index = 0
+        self.show_question()
+
+    def closeEvent(self, event):
+        # 后台加载还没结束时等它退出, 结果不再使用 (此时还没有待写入的作答)
+        if self.loader is not None:
+            self.loader.loaded.disconnect(self.on_loaded)
+            self.loader.wait()
+        # 未完成的导出直接取消
+        if self.export_worker is not None:
+            self.export_worker.requestInterruption()
+            self.export_worker.wait()
+        # 退出前把队列中的作答记录全部写入数据库
+        if self.attempt_store is not None:
+            try:
+                self.attempt_store.close()
+            except sqlite3.Error as e:
+                QMessageBox.warning(self, "保存失败", f"作答记录保存失败: {e}")
+            self.attempt_store = None
+        # 服务器模式下作答已由服务器落盘, 只需断开连接
+        if self.server and self.session_id is not None:
+            self.questions.close()
+        if tracer.enabled:
+            print(f"trace 已写入: {tracer.save()}", file=sys.stderr)
+        super().closeEvent(event)
 
     def setup_ui(self):
-        """构建主界面 UI (保持不变)"""
+        """构建主界面: 顶部状态栏与功能按钮、题型行 (含相关笔记按钮)、题干、可复用的选项区、反馈和底部翻题按钮"""
         # 主窗口部件
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -116,6 +327,22 @@ class QuizApp(QMainWindow):
         """)
         self.btn_export.clicked.connect(self.export_error_report)
 
+        # 统计按钮
+        self.btn_stats = QPushButton("📊 作答统计")
+        self.btn_stats.setCursor(Qt.PointingHandCursor)
+        self.btn_stats.setStyleSheet("""
+            QPushButton {
+                background-color: #009688; 
+                color: white; 
+                border-radius: 5px; 
+                padding: 8px 15px; 
+                font-weight: bold;
+                font-family: "Microsoft YaHei";
+            }
+            QPushButton:hover { background-color: #00796B; }
+        """)
+        self.btn_stats.clicked.connect(self.open_analytics)
+
         # 概览按钮
         self.btn_preview = QPushButton("📅 题目概览 / 跳转")
         self.btn_preview.setCursor(Qt.PointingHandCursor)
@@ -132,9 +359,54 @@ class QuizApp(QMainWindow):
         """)
         self.btn_preview.clicked.connect(self.open_question_board)
 
+        # 重新开始按钮
+        self.btn_restart = QPushButton("🔄 重新开始")
+        self.btn_restart.setCursor(Qt.PointingHandCursor)
+        self.btn_restart.setStyleSheet("""
+            QPushButton {
+                background-color: #9E9E9E; 
+                color: white; 
+                border-radius: 5px; 
+                padding: 8px 15px; 
+                font-weight: bold;
+                font-family: "Microsoft YaHei";
+            }
+            QPushButton:hover { background-color: #757575; }
+        """)
+        self.btn_restart.clicked.connect(self.start_new_session)
+
+        # 间隔复习按钮
+        self.btn_review = QPushButton("🔁 间隔复习")
+        self.btn_review.setCheckable(True)
+        self.btn_review.setCursor(Qt.PointingHandCursor)
+        self.btn_review.setStyleSheet("""
+            QPushButton {
+                background-color: #9C27B0; 
+                color: white; 
+                border-radius: 5px; 
+                padding: 8px 15px; 
+                font-weight: bold;
+                font-family: "Microsoft YaHei";
+            }
+            QPushButton:hover { background-color: #7B1FA2; }
+            QPushButton:checked { background-color: #4A148C; }
+        """)
+        self.btn_review.clicked.connect(self.toggle_review_mode)
+
+        # 搜索框
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("🔍 搜索题目 / 笔记")
+        self.search_edit.setFixedWidth(200)
+        self.search_edit.setStyleSheet("padding: 6px; border: 1px solid #ccc; border-radius: 5px;")
+        self.search_edit.returnPressed.connect(self.open_search)
+
         top_layout.addWidget(self.status_label)
         top_layout.addStretch() 
+        top_layout.addWidget(self.search_edit)
+        top_layout.addWidget(self.btn_restart)
+        top_layout.addWidget(self.btn_review)
         top_layout.addWidget(self.btn_export)
+        top_layout.addWidget(self.btn_stats)
         top_layout.addWidget(self.btn_preview)
         
         self.main_layout.addLayout(top_layout)
@@ -149,7 +421,27 @@ class QuizApp(QMainWindow):
         self.type_label = QLabel("")
         self.type_label.setFont(QFont("Microsoft YaHei", 12, QFont.Bold))
         self.type_label.setStyleSheet("color: #1976D2; margin-top: 10px;")
-        self.main_layout.addWidget(self.type_label)
+        self.btn_notes = QPushButton("📖 相关笔记")
+        self.btn_notes.setCursor(Qt.PointingHandCursor)
+        self.btn_notes.setToolTip("在课程笔记和课堂练习中查找与本题相关的小节")
+        self.btn_notes.setStyleSheet("""
+            QPushButton {
+                color: #1976D2;
+                border: 1px solid #1976D2;
+                border-radius: 4px;
+                padding: 4px 10px;
+                margin-top: 10px;
+                font-family: "Microsoft YaHei";
+            }
+            QPushButton:hover { background-color: #E3F2FD; }
+            QPushButton:disabled { color: #aaa; border-color: #ccc; }
+        """)
+        self.btn_notes.clicked.connect(self.open_related_notes)
+        type_layout = QHBoxLayout()
+        type_layout.addWidget(self.type_label)
+        type_layout.addStretch()
+        type_layout.addWidget(self.btn_notes)
+        self.main_layout.addLayout(type_layout)
 
         # 3. 题目内容
         self.question_label = QLabel("")
@@ -166,15 +458,18 @@ class QuizApp(QMainWindow):
         
         self.main_layout.addWidget(question_scroll)
 
-        # 4. 选项区域
-        self.options_widget = QWidget()
-        self.options_layout = QVBoxLayout(self.options_widget)
-        self.options_layout.setContentsMargins(10, 0, 0, 0)
-        self.options_layout.setAlignment(Qt.AlignTop)
-        
+        # 4. 选项区域 (控件复用, 翻题时只重新绑定)
+        self.option_panel = OptionPanel(self.font_option, self.font_text)
+        self.option_panel.input_field.returnPressed.connect(self.check_answer)
+        self.nav_latency = NavLatency()
+
+        # 翻题耗时浮层 (F12); 开启 --trace 时默认显示
+        self.frame_overlay = FrameOverlay(self.nav_latency, self)
+        self.frame_overlay.set_active(tracer.enabled)
+
         self.options_scroll = QScrollArea()
         self.options_scroll.setWidgetResizable(True)
-        self.options_scroll.setWidget(self.options_widget)
+        self.options_scroll.setWidget(self.option_panel)
         self.options_scroll.setFrameShape(QFrame.NoFrame)
         
         self.main_layout.addWidget(self.options_scroll)
@@ -236,309 +531,401 @@ class QuizApp(QMainWindow):
 
         self.main_layout.addLayout(bottom_layout)
 
-        # 变量存储
-        self.current_button_group = None 
-        self.input_field = None 
-
+    @tracer.traced("show_question")
     def show_question(self):
         """渲染题目逻辑"""
-        q_data = self.questions[self.current_index]
+        started = self.nav_latency.start()
+        try:
+            q_data = self.questions[self.current_index]
+        except OSError as e:
+            # 服务器模式下按页读取题目, 连接断开时留在当前显示的题
+            self.show_fetch_error(e)
+            return
         
         # 更新顶部状态
-        answered_count = sum(1 for s in self.question_status if s is not None)
-        self.status_label.setText(f"当前第 {self.current_index + 1} 题 / 共 {len(self.questions)} 题   |   得分: {self.score}   |   已完成: {answered_count}")
+        status_text = f"当前第 {self.current_index + 1} 题 / 共 {len(self.questions)} 题   |   得分: {self.session.score}   |   已完成: {self.session.answered}"
+        if self.loading:
+            status_text = f"当前第 {self.current_index + 1} 题   |   正在加载题库..."
+        if self.review_mode:
+            status_text = "【复习模式】 " + status_text
+        self.status_label.setText(status_text)
 
         # 显示题型
-        q_type_map = {
-            "single_choice": "选择题", 
-            "true_false": "判断题", 
-            "fill_in": "填空题",
-            "fill_in_the_blank": "填空题" # 兼容旧数据
-        }
-        self.type_label.setText(f"【{q_type_map.get(q_data['type'], '题目')}】")
+        self.type_label.setText(f"【{TYPE_NAMES.get(q_data.type, '题目')}】")
 
         # 显示题目
-        self.question_label.setText(q_data['question'])
+        self.question_label.setText(q_data.question)
+        if self.answer_timer[0] != q_data.id:
+            self.answer_timer = (q_data.id, time.perf_counter())
 
-        # 清空旧控件
-        self.clear_layout(self.options_layout)
-        self.current_button_group = None
-        self.input_field = None
         self.feedback_label.setText("")
 
         # 检查状态
-        status = self.question_status[self.current_index]
+        status = self.review_result if self.review_mode else self.session[self.current_index]
         is_answered = status is not None
 
         # 渲染选项
-        if q_data['type'] in ["single_choice", "true_false"]:
-            self.current_button_group = QButtonGroup(self)
-            
-            for idx, option in enumerate(q_data['options']):
-                val = option
-                if "." in option:
-                    val = option.split(".")[0].strip()
-                elif "(" in option:
-                    try:
-                        val = option.split("(")[1].split(")")[0].strip()
-                    except:
-                        val = option[0]
-
-                rb = QRadioButton(option)
-                rb.setFont(self.font_option)
-                rb.setProperty("value", val)
-                rb.setStyleSheet("padding: 5px;")
-                
-                self.options_layout.addWidget(rb)
-                self.current_button_group.addButton(rb, idx)
-                
-                if is_answered:
-                    rb.setEnabled(False)
-                    user_val = self.user_answers_log.get(self.current_index)
-                    if user_val and str(val).upper() == str(user_val).upper():
-                        rb.setChecked(True)
-            
-            self.options_layout.addStretch()
-
-        elif q_data['type'] in ["fill_in", "fill_in_the_blank"]:
-            self.input_field = QLineEdit()
-            self.input_field.setFont(self.font_text)
-            self.input_field.setPlaceholderText("请输入答案...")
-            self.input_field.setStyleSheet("padding: 8px; border: 1px solid #ccc; border-radius: 4px;")
-            self.options_layout.addWidget(self.input_field)
-            self.options_layout.addStretch()
-
-            if is_answered:
-                self.input_field.setEnabled(False)
-                # 恢复填空题的显示
-                user_val = self.user_answers_log.get(self.current_index, "")
-                self.input_field.setText(user_val)
-            else:
-                self.input_field.setFocus()
-                self.input_field.returnPressed.connect(self.check_answer)
+        with tracer.span("render_options"):
+            if q_data.type in CHOICE_TYPES:
+                options = self.engine.choices(self.current_index)
+                checked_value = self.user_answers_log.get(self.current_index) if is_answered else None
+                self.option_panel.show_choices(options, enabled=not is_answered, checked_value=checked_value)
+
+            elif q_data.type in FILL_TYPES:
+                # 已作答时恢复填空题的显示
+                user_val = self.user_answers_log.get(self.current_index, "") if is_answered else ""
+                self.option_panel.show_input(user_val, enabled=not is_answered)
 
         # 恢复状态
         if is_answered:
             self.btn_submit.setText("已作答")
             self.btn_submit.setEnabled(False)
-            if status == 'correct':
-                self.feedback_label.setText("✅ 回答正确")
-                self.feedback_label.setStyleSheet("color: green;")
-            else:
-                self.feedback_label.setText(f"❌ 回答错误。正确答案是: {q_data['answer']}")
-                self.feedback_label.setStyleSheet("color: red;")
+            with tracer.span("apply_style"):
+                if status == 'correct':
+                    self.feedback_label.setText("✅ 回答正确")
+                    self.feedback_label.setStyleSheet("color: green;")
+                else:
+                    self.feedback_label.setText(f"❌ 回答错误。正确答案是: {q_data.answer}")
+                    self.feedback_label.setStyleSheet("color: red;")
         else:
             self.btn_submit.setText("提交答案")
             self.btn_submit.setEnabled(True)
 
-        self.btn_prev.setEnabled(self.current_index > 0)
-        self.btn_next.setEnabled(self.current_index < len(self.questions) - 1)
+        if self.review_mode:
+            self.btn_prev.setEnabled(False)
+            self.btn_next.setEnabled(is_answered)
+        else:
+            self.btn_prev.setEnabled(self.current_index > 0)
+            self.btn_next.setEnabled(self.current_index < len(self.questions) - 1)
+
+        self.nav_latency.stop(started)
 
     def keyPressEvent(self, event: QKeyEvent):
         key = event.key()
 
+        if key == Qt.Key_F12:
+            self.frame_overlay.toggle()
+            return
+
         if key in (Qt.Key_Return, Qt.Key_Enter):
             if self.btn_submit.isEnabled():
-                if not (self.input_field and self.input_field.hasFocus()):
+                if not self.option_panel.input_has_focus():
                     self.check_answer()
             elif self.btn_next.isEnabled():
                 self.next_question()
             return
 
         if self.btn_submit.isEnabled():
-            q_data = self.questions[self.current_index]
-            target_val = None
-
-            if q_data['type'] == "single_choice":
-                if key == Qt.Key_A: target_val = "A"
-                elif key == Qt.Key_B: target_val = "B"
-                elif key == Qt.Key_C: target_val = "C"
-                elif key == Qt.Key_D: target_val = "D"
-
-            elif q_data['type'] == "true_false":
-                if key == Qt.Key_T: target_val = "T"
-                elif key == Qt.Key_F: target_val = "F"
-            
-            if target_val and self.current_button_group:
-                for btn in self.current_button_group.buttons():
-                    if str(btn.property("value")).upper() == target_val:
-                        btn.setChecked(True)
-                        btn.setFocus()
-                        break
+            # 选项值在加载时已解析好, 这里只做查表
+            target_val = SHORTCUT_KEYS.get(key)
+            if target_val and target_val in self.questions[self.current_index].values:
+                self.option_panel.select_value(target_val)
 
         super().keyPressEvent(event)
 
+    @tracer.traced("check_answer")
     def check_answer(self):
         user_ans = ""
         q_data = self.questions[self.current_index]
 
-        if q_data['type'] in ["single_choice", "true_false"]:
-            checked_btn = self.current_button_group.checkedButton()
-            if not checked_btn:
+        if q_data.type in CHOICE_TYPES:
+            user_ans = self.option_panel.checked_value()
+            if user_ans is None:
                 QMessageBox.warning(self, "提示", "请先选择一个选项！")
                 return
-            user_ans = checked_btn.property("value")
         
-        elif q_data['type'] in ["fill_in", "fill_in_the_blank"]:
-            user_ans = self.input_field.text().strip()
+        elif q_data.type in FILL_TYPES:
+            user_ans = self.option_panel.input_field.text().strip()
             if not user_ans:
                 QMessageBox.warning(self, "提示", "请输入答案！")
                 return
 
-        # 记录用户的原始答案
-        self.user_answers_log[self.current_index] = user_ans
+        timed_id, shown_at = self.answer_timer
+        elapsed_ms = int((time.perf_counter() - shown_at) * 1000) if timed_id == q_data.id else None
+        if elapsed_ms is not None and elapsed_ms > MAX_ANSWER_MS:
+            elapsed_ms = None
+
+        # 判分并记录用户的原始答案; 服务器模式下由服务器判分
+        try:
+            is_correct = self.engine.submit(self.current_index, user_ans, elapsed_ms)
+        except OSError as e:
+            QMessageBox.warning(self, "提交失败", str(e))
+            return
+        correct_ans = str(q_data.answer).strip()
+        # 同一题再次出现 (如复习) 时重新计时
+        self.answer_timer = (None, 0.0)
 
-        correct_ans = str(q_data['answer']).strip()
-        is_correct = user_ans.upper() == correct_ans.upper()
+        self.persist_attempt(q_data, user_ans, is_correct, elapsed_ms)
+        if self.review_mode:
+            self.review_result = 'correct' if is_correct else 'wrong'
 
         if is_correct:
-            self.score += 10
-            self.question_status[self.current_index] = 'correct'
-            self.feedback_label.setText("✅ 回答正确！+10分")
+            self.feedback_label.setText(f"✅ 回答正确！+{SCORE_PER_CORRECT}分")
             self.feedback_label.setStyleSheet("color: green;")
         else:
-            self.question_status[self.current_index] = 'wrong'
             self.feedback_label.setText(f"❌ 回答错误。正确答案是: {correct_ans}")
             self.feedback_label.setStyleSheet("color: red;")
 
         self.show_question()
 
+    def show_fetch_error(self, error):
+        """读取题目失败显示在状态栏, 同 show_load_error"""
+        self.statusBar().showMessage(f"读取题目失败: {error}")
+
+    def move_to(self, index):
+        """切换到第 index 题; 服务器模式下读取失败时停在当前题"""
+        try:
+            self.questions[index]
+        except OSError as e:
+            self.show_fetch_error(e)
+            return
+        self.current_index = index
+        self.show_question()
+
     def prev_question(self):
         if self.current_index > 0:
-            self.current_index -= 1
-            self.show_question()
+            self.move_to(self.current_index - 1)
 
     def next_question(self):
+        if self.review_mode:
+            self.next_review_question()
+            return
         if self.current_index < len(self.questions) - 1:
-            self.current_index += 1
-            self.show_question()
+            self.move_to(self.current_index + 1)
+
+    def set_review_mode(self, enabled):
+        self.review_mode = enabled
+        self.review_result = None
+        self.btn_review.setChecked(enabled)
+
+    def toggle_review_mode(self):
+        if not self.review_mode and self.scheduler is not None:
+            if self.scheduler.due_questions(limit=1):
+                self.set_review_mode(True)
+                self.next_review_question()
+                return
+
+            next_due = self.scheduler.next_due_time()
+            if next_due is None:
+                msg = "复习队列为空。\n答错的题目会自动加入复习队列。"
+            else:
+                when = datetime.datetime.fromtimestamp(next_due).strftime('%Y-%m-%d %H:%M')
+                msg = f"暂时没有到期的题目。\n下一道题将于 {when} 到期。"
+            QMessageBox.information(self, "间隔复习", msg)
+
+        self.set_review_mode(False)
+        self.show_question()
+
+    def next_review_question(self):
+        """取出最早到期的题目, 并在空闲时预取后面几道"""
+        while True:
+            due = self.scheduler.due_questions(limit=1 + REVIEW_PREFETCH)
+            if not due:
+                QMessageBox.information(self, "间隔复习", "本轮到期的题目已全部复习完成！")
+                self.set_review_mode(False)
+                self.show_question()
+                return
 
-    def clear_layout(self, layout):
-        while layout.count():
-            item = layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
+            index = self.review_index_cache.get(due[0])
+            if index is None:
+                index = self.questions.indexes_of(due[:1]).get(due[0])
+            if index is not None:
+                break
+            # 题目已从题库删除
+            self.scheduler.discard(due[0])
+        self.review_result = None
+        self.current_index = index
+        self.show_question()
+        QTimer.singleShot(0, lambda: self.prefetch_review(due[1:]))
+
+    def prefetch_review(self, question_ids):
+        # 提前算好下标并解码题目, 下一题可以直接从缓存显示
+        missing = [qid for qid in question_ids if qid not in self.review_index_cache]
+        if len(self.review_index_cache) > 4 * REVIEW_PREFETCH:
+            self.review_index_cache.clear()
+        self.review_index_cache.update(self.questions.indexes_of(missing))
+        for qid in question_ids:
+            index = self.review_index_cache.get(qid)
+            if index is not None:
+                self.questions[index]
 
     def open_question_board(self):
-        dialog = QDialog(self)
-        dialog.setWindowTitle("题目概览 (点击题号跳转)")
-        dialog.resize(700, 500)
-        
-        layout = QVBoxLayout(dialog)
-        
-        legend_layout = QHBoxLayout()
-        legend_layout.addWidget(QLabel("图例:"))
-        
-        def create_legend(text, color, fg="black"):
-            lbl = QLabel(text)
-            lbl.setStyleSheet(f"background-color: {color}; color: {fg}; border: 1px solid #ccc; padding: 2px 5px;")
-            return lbl
-
-        legend_layout.addWidget(create_legend("未作答", "#f0f0f0"))
-        legend_layout.addWidget(create_legend("正确", "#90EE90"))
-        legend_layout.addWidget(create_legend("错误", "#FFB6C1"))
-        legend_layout.addWidget(create_legend("当前题", "#2196F3", "white"))
-        legend_layout.addStretch()
-        
-        layout.addLayout(legend_layout)
+        with tracer.span("build_board", questions=len(self.questions)):
+            from question_board import QuestionBoardDialog
+            dialog = QuestionBoardDialog(self.session, self.current_index, self.jump_to, self)
+        dialog.exec()
 
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        content_widget = QWidget()
-        grid = QGridLayout(content_widget)
-        grid.setSpacing(5)
-        
-        cols = 10
-        for i, status in enumerate(self.question_status):
-            btn = QPushButton(str(i + 1))
-            btn.setFixedSize(50, 35)
-            
-            bg_color = "#f0f0f0"
-            fg_color = "black"
-            border = "1px solid #ccc"
-            
-            if i == self.current_index:
-                bg_color = "#2196F3"
-                fg_color = "white"
-                border = "1px solid #1976D2"
-            elif status == 'correct':
-                bg_color = "#90EE90"
-            elif status == 'wrong':
-                bg_color = "#FFB6C1"
-            
-            btn.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {bg_color};
-                    color: {fg_color};
-                    border: {border};
-                    border-radius: 3px;
-                }}
-                QPushButton:hover {{ filter: brightness(90%); }}
-            """)
-            
-            btn.clicked.connect(lambda checked=False, idx=i: [self.jump_to(idx), dialog.close()])
-            
-            grid.addWidget(btn, i // cols, i % cols)
-            
-        scroll.setWidget(content_widget)
-        layout.addWidget(scroll)
+    def start_search_index(self):
+        """后台增量更新全文索引, 不阻塞界面"""
+        from search_index import SearchIndex
+        self.search_index = SearchIndex(DB_PATH, os.path.dirname(os.path.abspath(__file__)))
+        threading.Thread(target=self.search_index.refresh, name="quiz-search-index", daemon=True).start()
+
+    def open_search(self):
+        if self.search_index is None:
+            self.statusBar().showMessage("全文索引不可用: 题库未加载成功", 5000)
+            return
+        from search_dialog import SearchDialog
+        dialog = SearchDialog(self.search_index, self.jump_to_question_id, self.search_edit.text().strip(), self,
+                              on_open_note=self.open_note)
         dialog.exec()
 
+    def show_notes_viewer(self):
+        """笔记查看器不是模态的, 只创建一次, 关掉后再打开保留已渲染的缓存"""
+        if self.notes_viewer is None:
+            from notes_viewer import NotesViewer
+            self.notes_viewer = NotesViewer(os.path.dirname(os.path.abspath(__file__)), self.search_index, self)
+        self.notes_viewer.show()
+        self.notes_viewer.raise_()
+        self.notes_viewer.activateWindow()
+        return self.notes_viewer
+
+    def open_related_notes(self):
+        q_data = self.questions[self.current_index]
+        text = " ".join((q_data.question,) + q_data.options)
+        self.show_notes_viewer().show_related(text)
+
+    def open_note(self, path, line):
+        self.show_notes_viewer().open_section(path, line)
+
+    def open_analytics(self):
+        from analytics import Analytics
+        from analytics_dialog import AnalyticsDialog
+
+        # 先把写队列中的作答记录落盘, 统计才包含刚答的题
+        if self.attempt_store is not None:
+            self.flush_attempts()
+        on_review = self.enqueue_review if self.scheduler is not None and self.paper is None else None
+        dialog = AnalyticsDialog(Analytics(DB_PATH), self.jump_to_question_id, on_review, self)
+        dialog.exec()
+
+    def enqueue_review(self, question_ids):
+        added = self.scheduler.enqueue(question_ids)
+        self.statusBar().showMessage(f"已加入复习队列 {added} 道, 点击 \"间隔复习\" 开始", 5000)
+        return added
+
+    def jump_to_question_id(self, question_id):
+        try:
+            index = self.questions.indexes_of([question_id]).get(question_id)
+        except OSError as e:
+            self.show_fetch_error(e)
+            return
+        if index is not None and index < len(self.questions):
+            self.jump_to(index)
+
     def jump_to(self, index):
-        self.current_index = index
-        self.show_question()
+        self.set_review_mode(False)
+        self.move_to(index)
 
     def export_error_report(self):
-        """导出错题报告逻辑"""
-        wrong_indices = [i for i, status in enumerate(self.question_status) if status == 'wrong']
-        
-        if not wrong_indices:
+        """导出错题报告: 在后台线程中逐行写出, 可选格式和范围"""
+        from report_export import ExportWorker, EXPORT_FORMATS, format_from_path
+
+        if self.attempt_store is None:
+            return
+        if self.export_worker is not None:
+            QMessageBox.information(self, "提示", "已有导出任务正在进行。")
+            return
+
+        box = QMessageBox(self)
+        box.setWindowTitle("导出错题")
+        box.setText("选择导出范围:")
+        btn_session = box.addButton("本次会话", QMessageBox.AcceptRole)
+        btn_all = box.addButton("全部历史", QMessageBox.AcceptRole)
+        box.addButton("取消", QMessageBox.RejectRole)
+        box.exec()
+        if box.clickedButton() is btn_session:
+            all_sessions = False
+        elif box.clickedButton() is btn_all:
+            all_sessions = True
+        else:
+            return
+
+        if not all_sessions and not self.session.wrong:
             QMessageBox.information(self, "棒棒哒", "目前没有错题！\n请继续加油或检查是否还未开始答题。")
             return
 
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         default_filename = f"错题本_{timestamp}.txt"
-        
-        file_path, _ = QFileDialog.getSaveFileName(self, "保存错题报告", default_filename, "Text Files (*.txt);;All Files (*)")
-        
-        if file_path:
-            try:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(f"=== 计算机组成原理错题报告 ===\n")
-                    f.write(f"生成时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write(f"错题数量: {len(wrong_indices)}\n")
-                    f.write("=" * 30 + "\n\n")
-
-                    for idx in wrong_indices:
-                        q = self.questions[idx]
-                        user_ans = self.user_answers_log.get(idx, "未记录")
-                        
-                        f.write(f"【第 {idx + 1} 题】 ({q['type']})\n")
-                        f.write(f"题目: {q['question']}\n")
-                        
-                        if q['type'] in ["single_choice", "true_false"]:
-                            f.write("选项:\n")
-                            for opt in q['options']:
-                                f.write(f"  {opt}\n")
-                        
-                        f.write(f"❌ 你的答案: {user_ans}\n")
-                        f.write(f"✅ 正确答案: {q['answer']}\n")
-                        f.write("-" * 30 + "\n\n")
-                        
-                QMessageBox.information(self, "成功", f"错题报告已保存至:\n{file_path}")
-                
-            except Exception as e:
-                QMessageBox.critical(self, "导出失败", f"保存文件时出错:\n{e}")
+        filters = ";;".join(EXPORT_FORMATS.values())
+        file_path, selected_filter = QFileDialog.getSaveFileName(self, "保存错题报告", default_filename, filters)
+        if not file_path:
+            return
+
+        # 扩展名优先, 否则按所选的过滤器决定格式并补上扩展名
+        fmt = format_from_path(file_path, default="")
+        if not fmt:
+            fmt = next((ext for ext, name in EXPORT_FORMATS.items() if name == selected_filter), "txt")
+            file_path += "." + fmt
+
+        # 先把写队列中的作答记录落盘, 导出线程才能读到
+        self.flush_attempts()
+
+        if all_sessions:
+            # 全部历史附上统计中最常答错的几道题
+            from analytics import Analytics
+            summary = ""
+            details = [f"  最常答错: 题目 {s.question_id} 错 {s.wrong}/{s.attempts} 次  {s.question[:30]}"
+                       for s in Analytics(DB_PATH).top_questions(limit=5)]
+        else:
+            summary = f"已作答: {self.session.answered}   得分: {self.session.score}"
+            details = [f"  {q_type}: 已作答 {stats.answered}, 正确 {stats.correct}, 错误 {stats.wrong}"
+                       for q_type, stats in self.session.by_type.items()]
+
+        worker = ExportWorker(DB_PATH, file_path, fmt,
+                              session_id=None if all_sessions else self.session_id,
+                              summary=summary, details=details, parent=self)
+        progress = QProgressDialog("正在导出错题报告...", "取消", 0, 0, self)
+        progress.setWindowTitle("导出错题")
+        progress.setMinimumDuration(300)
+        progress.canceled.connect(worker.requestInterruption)
+
+        def on_progress(done, total):
+            progress.setMaximum(max(total, 1))
+            progress.setValue(done)
+
+        def on_completed(path, count):
+            progress.reset()
+            QMessageBox.information(self, "成功", f"已导出 {count} 道错题至:\n{path}")
+
+        def on_failed(message):
+            progress.reset()
+            QMessageBox.critical(self, "导出失败", f"保存文件时出错:\n{message}")
+
+        def on_finished():
+            progress.close()
+            progress.deleteLater()
+            worker.deleteLater()
+            self.export_worker = None
+
+        worker.progress.connect(on_progress)
+        worker.completed.connect(on_completed)
+        worker.failed.connect(on_failed)
+        worker.finished.connect(on_finished)
+        self.export_worker = worker
+        worker.start()
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="计算机组成原理刷题")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="在 stderr 输出到首次绘制、后台加载完成等各阶段的耗时")
+    parser.add_argument("--trace", nargs="?", const="trace.json", metavar="路径",
+                        help="记录热路径耗时, 退出时写出 Chrome trace-event JSON (默认 trace.json)")
+    parser.add_argument("--server", nargs="?", const="127.0.0.1:8765", metavar="地址",
+                        help="作为客户端连接答题服务 (quiz_server.py), 不再读写本地 quiz.db")
+    parser.add_argument("--paper", type=int, metavar="试卷id",
+                        help="按 exam_paper.py 生成的试卷答题, 作为一个新的会话")
+    # 其余参数 (如 -style) 留给 Qt
+    args, qt_argv = parser.parse_known_args()
+    if args.trace:
+        tracer.enable(args.trace)
+    app = QApplication(sys.argv[:1] + qt_argv)
     app.setStyleSheet("""
         QMainWindow { background-color: white; }
         QScrollArea { background-color: transparent; border: none; }
         QRadioButton { spacing: 8px; }
         QRadioButton::indicator { width: 16px; height: 16px; }
     """)
-    window = QuizApp()
+    window = QuizApp(profile_startup=args.profile_startup, server=args.server, paper_id=args.paper)
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
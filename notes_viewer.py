@@ -0,0 +1,381 @@
+"""课程笔记 / 课堂练习查看器: 按小节按需渲染, HTML 缓存在磁盘上, 图片在后台线程解码
+
+Markdown 渲染成 HTML 只做一次, 按小节内容哈希缓存在 .cache/notes/ 下; 每个笔记文件的
+小节目录按 mtime + 内容哈希缓存, mtime 没变时打开笔记不读原文件。
+本地 PNG 由线程池按显示宽度缩放解码, 放入按字节数限制的 LRU; 网络图片不下载, 显示占位图。
+窗口不是模态的, 渲染和解码都在后台, 不影响答题。
+"""
+import os
+import glob
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QTreeWidget, QTreeWidgetItem, QTextBrowser, QSplitter,
+                               QLabel)
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, QSize, Signal
+from PySide6.QtGui import QTextDocument, QImage, QImageReader, QPainter, QColor, QFont
+
+from search_index import NOTE_PATTERNS, split_sections
+
+# 渲染方式变化时改这里, 旧的 HTML 缓存自然失效
+RENDER_VERSION = "1"
+
+THUMBNAIL_WIDTH = 720               # 图片按此宽度缩小后缓存
+THUMBNAIL_CACHE_BYTES = 64 << 20    # 缩略图缓存上限
+DECODE_THREADS = 2
+
+SECTION_ROLE = Qt.UserRole
+LOADED_ROLE = Qt.UserRole + 1
+
+
+def render_markdown(text):
+    """Markdown -> HTML; QTextDocument 不依赖界面, 可以在工作线程中使用"""
+    doc = QTextDocument()
+    doc.setMarkdown(text)
+    return doc.toHtml()
+
+
+def write_atomic(path, text):
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class NoteCache:
+    """笔记小节目录和渲染结果的磁盘缓存; 各方法可在工作线程中调用"""
+
+    def __init__(self, base_dir=".", cache_dir=None):
+        self.base_dir = base_dir
+        self.cache_dir = cache_dir or os.path.join(base_dir, ".cache", "notes")
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+        self.lock = threading.Lock()
+        self._index = None
+        self._bodies = {}       # 内容哈希 -> 刚切分出来还没渲染的正文, 免得渲染时再读一遍文件; 由 lock 保护
+
+    def note_paths(self):
+        """全部笔记文件 (相对路径), 章节笔记在前"""
+        paths = []
+        for pattern in NOTE_PATTERNS:
+            paths.extend(sorted(glob.glob(os.path.join(self.base_dir, pattern))))
+        return [os.path.relpath(p, self.base_dir) for p in paths]
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        write_atomic(self.index_path, json.dumps(self._index, ensure_ascii=False))
+
+    def sections(self, path):
+        """小节目录: [[起始行号, 标题, 内容哈希], ...]"""
+        full_path = os.path.join(self.base_dir, path)
+        mtime = os.path.getmtime(full_path)
+        with self.lock:
+            entry = self._load_index().get(path)
+            if entry and entry["mtime"] == mtime:
+                return entry["sections"]
+
+        # mtime 变了再比较内容哈希, 内容未变只更新 mtime
+        with open(full_path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()
+        if not entry or entry["hash"] != digest:
+            title = os.path.splitext(os.path.basename(path))[0]
+            sections, bodies = [], {}
+            for line, heading, body in split_sections(data.decode("utf-8", "replace"), title):
+                key = hashlib.sha1((RENDER_VERSION + body).encode("utf-8")).hexdigest()
+                sections.append([line, heading, key])
+                bodies[key] = body
+            with self.lock:
+                self._bodies.update(bodies)
+            entry = {"mtime": mtime, "hash": digest, "sections": sections}
+        else:
+            entry = dict(entry, mtime=mtime)
+        with self.lock:
+            self._load_index()[path] = entry
+            self._save_index()
+        return entry["sections"]
+
+    def html(self, path, line):
+        """从第 line 行开始的小节渲染成的 HTML: (标题, HTML); 已渲染过的直接读缓存文件"""
+        sections = self.sections(path)
+        # 取起始行号不超过 line 的最后一个小节, 行号对不上 (如笔记改过) 时也能定位到附近
+        line_no, title, key = next((s for s in reversed(sections) if s[0] <= line), sections[0])
+        cache_path = os.path.join(self.cache_dir, key + ".html")
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                return title, f.read()
+        except FileNotFoundError:
+            pass
+
+        with self.lock:
+            body = self._bodies.pop(key, None)
+        if body is None:
+            with open(os.path.join(self.base_dir, path), "r", encoding="utf-8", errors="replace") as f:
+                body = next((b for l, _, b in split_sections(f.read(), title) if l == line_no), "")
+        html = render_markdown(body)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        write_atomic(cache_path, html)
+        return title, html
+
+
+class ThumbnailCache:
+    """解码后的图片 LRU, 按占用字节数限制总大小; 只在界面线程中访问"""
+
+    def __init__(self, max_bytes=THUMBNAIL_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.images = OrderedDict()
+
+    def get(self, key):
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+        return image
+
+    def put(self, key, image):
+        old = self.images.pop(key, None)
+        if old is not None:
+            self.bytes -= old.sizeInBytes()
+        self.images[key] = image
+        self.bytes += image.sizeInBytes()
+        while self.bytes > self.max_bytes and len(self.images) > 1:
+            _, evicted = self.images.popitem(last=False)
+            self.bytes -= evicted.sizeInBytes()
+
+
+# --- 后台任务 ---
+
+class TaskSignals(QObject):
+    done = Signal(int, object)      # 请求序号, 结果
+    failed = Signal(int, str)
+
+
+class Task(QRunnable):
+    """在线程池中执行 fn(*args), 结果通过信号回到界面线程"""
+
+    def __init__(self, signals, token, fn, *args):
+        super().__init__()
+        self.signals = signals
+        self.token = token
+        self.fn = fn
+        self.args = args
+
+    def run(self):
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            # 异常不能越过 QRunnable.run, 否则界面一直停在 "加载中"
+            self.signals.failed.emit(self.token, str(e) or type(e).__name__)
+            return
+        self.signals.done.emit(self.token, result)
+
+
+class ImageSignals(QObject):
+    decoded = Signal(str, QImage)   # 缓存键, 图片
+
+
+class ImageDecodeTask(QRunnable):
+    """按显示宽度缩放解码: QImageReader 直接按目标尺寸解码, 不先解出原图"""
+
+    def __init__(self, signals, key, path, max_width):
+        super().__init__()
+        self.signals = signals
+        self.key = key
+        self.path = path
+        self.max_width = max_width
+
+    def run(self):
+        reader = QImageReader(self.path)
+        size = reader.size()
+        if size.isValid() and size.width() > self.max_width:
+            reader.setScaledSize(QSize(self.max_width, max(1, size.height() * self.max_width // size.width())))
+        image = reader.read()
+        if image.isNull():
+            image = placeholder_image(f"无法读取图片: {os.path.basename(self.path)}")
+        self.signals.decoded.emit(self.key, image)
+
+
+def placeholder_image(text, width=240, height=48):
+    image = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+    image.fill(QColor("#f0f0f0"))
+    painter = QPainter(image)
+    painter.setPen(QColor("#888888"))
+    painter.setFont(QFont("Microsoft YaHei", 9))
+    painter.drawText(image.rect(), Qt.AlignCenter, text)
+    painter.end()
+    return image
+
+
+class NoteBrowser(QTextBrowser):
+    """图片先显示占位图, 后台解码完成后替换, 渲染 HTML 时不阻塞"""
+
+    def __init__(self, thumbnails, pool, parent=None):
+        super().__init__(parent)
+        self.thumbnails = thumbnails
+        self.pool = pool
+        self.note_dir = ""
+        self.pending = {}       # 缓存键 -> 文档中的图片 URL
+        self.signals = ImageSignals(self)
+        self.signals.decoded.connect(self.on_decoded)
+        self.loading_image = placeholder_image("图片加载中...")
+        self.remote_image = placeholder_image("网络图片 (不自动下载)")
+
+    def set_note_html(self, note_dir, html):
+        self.note_dir = note_dir
+        self.setHtml(html)
+
+    def loadResource(self, rtype, url):
+        if rtype != QTextDocument.ImageResource:
+            return super().loadResource(rtype, url)
+        if url.scheme() in ("http", "https"):
+            return self.remote_image
+
+        path = os.path.normpath(os.path.join(self.note_dir, url.toLocalFile() if url.isLocalFile() else url.path()))
+        try:
+            key = f"{path}|{os.path.getmtime(path)}|{THUMBNAIL_WIDTH}"
+        except OSError:
+            return placeholder_image(f"找不到图片: {os.path.basename(path)}")
+        image = self.thumbnails.get(key)
+        if image is not None:
+            return image
+        if key not in self.pending:
+            self.pending[key] = url
+            self.pool.start(ImageDecodeTask(self.signals, key, path, THUMBNAIL_WIDTH))
+        return self.loading_image
+
+    def on_decoded(self, key, image):
+        self.thumbnails.put(key, image)
+        url = self.pending.pop(key, None)
+        if url is None:
+            return
+        # 替换文档中缓存的占位图并重新排版
+        doc = self.document()
+        doc.addResource(QTextDocument.ImageResource, url, image)
+        doc.markContentsDirty(0, doc.characterCount())
+
+
+class NotesViewer(QDialog):
+    """笔记查看器: 左侧为相关小节和全部笔记的目录 (展开时才读取小节), 右侧显示选中的小节"""
+
+    def __init__(self, base_dir=".", search_index=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("课程笔记")
+        self.resize(1000, 700)
+        self.base_dir = base_dir
+        self.search_index = search_index
+        self.cache = NoteCache(base_dir)
+        self.thumbnails = ThumbnailCache()
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(DECODE_THREADS)
+
+        self.signals = TaskSignals(self)
+        self.signals.done.connect(self.on_task_done)
+        self.signals.failed.connect(self.on_task_failed)
+        self.tasks = {}         # 请求序号 -> 结果的处理函数
+        self.next_token = 0
+        self.shown_token = None
+
+        layout = QVBoxLayout(self)
+        self.info_label = QLabel("")
+        self.info_label.setStyleSheet("color: #555;")
+        layout.addWidget(self.info_label)
+
+        splitter = QSplitter(Qt.Horizontal)
+        self.tree = QTreeWidget()
+        self.tree.setHeaderHidden(True)
+        self.tree.itemExpanded.connect(self.on_item_expanded)
+        self.tree.itemClicked.connect(self.on_item_clicked)
+        splitter.addWidget(self.tree)
+
+        self.browser = NoteBrowser(self.thumbnails, self.pool)
+        self.browser.setOpenExternalLinks(True)
+        splitter.addWidget(self.browser)
+        splitter.setSizes([280, 720])
+        layout.addWidget(splitter)
+
+        self.related_item = QTreeWidgetItem(["相关笔记"])
+        self.tree.addTopLevelItem(self.related_item)
+        for path in self.cache.note_paths():
+            item = QTreeWidgetItem([os.path.splitext(path)[0]])
+            item.setData(0, SECTION_ROLE, (path, 1))
+            # 先放一个空子项显示展开箭头, 展开时再读取小节目录
+            item.addChild(QTreeWidgetItem(["加载中..."]))
+            self.tree.addTopLevelItem(item)
+
+    def run(self, handler, fn, *args):
+        token = self.next_token = self.next_token + 1
+        self.tasks[token] = handler
+        self.pool.start(Task(self.signals, token, fn, *args))
+        return token
+
+    def on_task_done(self, token, result):
+        handler = self.tasks.pop(token, None)
+        if handler is not None:
+            handler(token, result)
+
+    def on_task_failed(self, token, message):
+        if self.tasks.pop(token, None) is not None:
+            self.info_label.setText(f"读取笔记失败: {message}")
+
+    # --- 目录 ---
+
+    def show_related(self, text):
+        """列出与题目最相关的笔记小节并打开第一个"""
+        self.related_item.takeChildren()
+        results = self.search_index.related_notes(text) if self.search_index is not None else []
+        for result in results:
+            child = QTreeWidgetItem([f"{result['title']}  ({os.path.splitext(result['path'])[0]})"])
+            child.setData(0, SECTION_ROLE, (result["path"], result["line"]))
+            child.setToolTip(0, result["path"])
+            self.related_item.addChild(child)
+        self.related_item.setExpanded(True)
+        if results:
+            self.open_section(results[0]["path"], results[0]["line"])
+        else:
+            self.info_label.setText("没有找到相关笔记 (全文索引可能还在建立)")
+
+    def on_item_expanded(self, item):
+        target = item.data(0, SECTION_ROLE)
+        if target is None or item.data(0, LOADED_ROLE):
+            return
+        item.setData(0, LOADED_ROLE, True)
+        path = target[0]
+
+        def fill(token, sections):
+            item.takeChildren()
+            for line, title, _ in sections:
+                child = QTreeWidgetItem([title])
+                child.setData(0, SECTION_ROLE, (path, line))
+                item.addChild(child)
+
+        self.run(fill, self.cache.sections, path)
+
+    def on_item_clicked(self, item, column=0):
+        target = item.data(0, SECTION_ROLE)
+        if target is not None:
+            self.open_section(*target)
+
+    # --- 正文 ---
+
+    def open_section(self, path, line):
+        self.info_label.setText(f"{path} 加载中...")
+
+        def show(token, result):
+            # 连续点击时只显示最后一次请求的小节
+            if token != self.shown_token:
+                return
+            title, html = result
+            self.browser.set_note_html(os.path.dirname(os.path.join(self.base_dir, path)), html)
+            self.info_label.setText(f"{path} › {title}")
+
+        self.shown_token = self.run(show, self.cache.html, path, line)
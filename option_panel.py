@@ -0,0 +1,133 @@
+import time
+from collections import deque
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QRadioButton, QLineEdit, QButtonGroup
+from PySide6.QtCore import Qt
+
+# 每次翻题 (show_question) 的耗时目标, 单位毫秒
+NAV_LATENCY_TARGET_MS = 16.0
+
+
+class NavLatency:
+    """记录最近若干次翻题耗时, 用于对照 NAV_LATENCY_TARGET_MS"""
+
+    def __init__(self, size=200, target_ms=NAV_LATENCY_TARGET_MS):
+        self.samples = deque(maxlen=size)
+        self.target_ms = target_ms
+        self.over_target = 0
+
+    def start(self):
+        return time.perf_counter()
+
+    def stop(self, started):
+        ms = (time.perf_counter() - started) * 1000
+        self.samples.append(ms)
+        if ms > self.target_ms:
+            self.over_target += 1
+        return ms
+
+    def percentile(self, p):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class OptionPanel(QWidget):
+    """选项区域: 复用固定的一组单选按钮和一个输入框, 翻题时只重新绑定内容"""
+
+    POOL_SIZE = 4
+
+    def __init__(self, font_option, font_text, parent=None):
+        super().__init__(parent)
+        self.font_option = font_option
+
+        self.panel_layout = QVBoxLayout(self)
+        self.panel_layout.setContentsMargins(10, 0, 0, 0)
+        self.panel_layout.setAlignment(Qt.AlignTop)
+
+        self.button_group = QButtonGroup(self)
+        self.radios = []
+        for _ in range(self.POOL_SIZE):
+            self._add_radio()
+
+        self.input_field = QLineEdit()
+        self.input_field.setFont(font_text)
+        self.input_field.setPlaceholderText("请输入答案...")
+        self.input_field.setStyleSheet("padding: 8px; border: 1px solid #ccc; border-radius: 4px;")
+        self.input_field.hide()
+        self.panel_layout.addWidget(self.input_field)
+        self.panel_layout.addStretch()
+
+        self.mode = None
+
+    def _add_radio(self):
+        rb = QRadioButton()
+        rb.setFont(self.font_option)
+        rb.setStyleSheet("padding: 5px;")
+        rb.hide()
+        # 插在输入框之前, 保持单选按钮在上
+        self.panel_layout.insertWidget(len(self.radios), rb)
+        self.button_group.addButton(rb, len(self.radios))
+        self.radios.append(rb)
+        return rb
+
+    def _clear_checked(self):
+        checked = self.button_group.checkedButton()
+        if checked:
+            # 互斥模式下无法直接取消选中
+            self.button_group.setExclusive(False)
+            checked.setChecked(False)
+            self.button_group.setExclusive(True)
+
+    def show_choices(self, options, enabled=True, checked_value=None):
+        """options 为 [(显示文本, 选项值), ...]"""
+        self.mode = 'choice'
+        self.input_field.hide()
+        self._clear_checked()
+
+        while len(self.radios) < len(options):
+            self._add_radio()
+
+        checked_value = str(checked_value).upper() if checked_value else None
+        for idx, rb in enumerate(self.radios):
+            if idx >= len(options):
+                rb.hide()
+                continue
+            text, val = options[idx]
+            rb.setText(text)
+            rb.setProperty("value", val)
+            rb.setEnabled(enabled)
+            if checked_value and str(val).upper() == checked_value:
+                rb.setChecked(True)
+            rb.show()
+
+    def show_input(self, text="", enabled=True):
+        self.mode = 'input'
+        self._clear_checked()
+        for rb in self.radios:
+            rb.hide()
+
+        self.input_field.setText(text)
+        self.input_field.setEnabled(enabled)
+        self.input_field.show()
+        if enabled:
+            self.input_field.setFocus()
+
+    def checked_value(self):
+        checked_btn = self.button_group.checkedButton()
+        if not checked_btn:
+            return None
+        return checked_btn.property("value")
+
+    def select_value(self, target_val):
+        """键盘快捷键选中对应选项, 找到则返回 True"""
+        for rb in self.radios:
+            if not rb.isHidden() and str(rb.property("value")).upper() == target_val:
+                rb.setChecked(True)
+                rb.setFocus()
+                return True
+        return False
+
+    def input_has_focus(self):
+        return self.mode == 'input' and self.input_field.hasFocus()
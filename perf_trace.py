@@ -0,0 +1,141 @@
+"""热路径计时: 输出 Chrome trace-event JSON (chrome://tracing / Perfetto 可直接打开)
+
+    from perf_trace import tracer
+
+    with tracer.span("show_question", index=3):
+        ...
+
+    @tracer.traced("check_answer")
+    def check_answer(self): ...
+
+未开启时 span() 返回共享的空上下文, traced() 包装的函数只多一次属性判断。
+开启方式: 设置环境变量 QUIZ_TRACE=trace.json, 或 main.py 的 --trace 参数。
+"""
+import os
+import json
+import time
+import threading
+import functools
+from collections import defaultdict
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start", "widgets", "queries")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        # 控件只能在界面线程里统计
+        counter = self.tracer.widget_counter
+        on_main = threading.current_thread() is threading.main_thread()
+        self.widgets = counter() if counter is not None and on_main else None
+        self.queries = self.tracer.counters["sql_queries"]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        if self.widgets is not None:
+            self.args["widgets_created"] = max(0, self.tracer.widget_counter() - self.widgets)
+        self.args["sql_queries"] = self.tracer.counters["sql_queries"] - self.queries
+        self.tracer._complete(self.name, self.start, end, self.args)
+        return False
+
+
+class Tracer:
+    """记录 "X" (完整区间) 和 "C" (计数器) 事件; 各线程可同时写入"""
+
+    MAX_EVENTS = 500000
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.events = []
+        self.counters = defaultdict(int)
+        self.widget_counter = None      # 返回当前控件总数的函数, 由界面设置
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+
+    def enable(self, path):
+        self.enabled = True
+        self.path = path
+        self.origin = time.perf_counter()
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def traced(self, name=None):
+        """方法装饰器; 未开启时直接调用原函数"""
+        def decorate(fn):
+            span_name = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Span(self, span_name, {}):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count(self, name, n=1):
+        """累加计数器 (如 SQL 查询数), 随下一个区间结束一并写出"""
+        if self.enabled:
+            self.counters[name] += n
+
+    def watch_connection(self, conn):
+        """统计该连接执行的 SQL 语句数"""
+        if self.enabled:
+            conn.set_trace_callback(lambda sql: self.count("sql_queries"))
+        return conn
+
+    def _complete(self, name, start, end, args):
+        ts = (start - self.origin) * 1e6
+        event = {"name": name, "ph": "X", "ts": ts, "dur": (end - start) * 1e6,
+                 "pid": self.pid, "tid": threading.get_ident(), "args": args}
+        with self.lock:
+            if len(self.events) >= self.MAX_EVENTS:
+                return
+            self.events.append(event)
+            if self.counters:
+                self.events.append({"name": "counters", "ph": "C", "ts": (end - self.origin) * 1e6,
+                                    "pid": self.pid, "args": dict(self.counters)})
+
+    def save(self, path=None):
+        path = path or self.path
+        if not path:
+            return None
+        with self.lock:
+            events = list(self.events)
+        # 线程名元数据, 便于在查看器中区分界面线程和后台线程
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for tid in {e["tid"] for e in events if "tid" in e}:
+            events.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid,
+                           "args": {"name": names.get(tid, str(tid))}})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        return path
+
+
+tracer = Tracer()
+if os.environ.get("QUIZ_TRACE"):
+    tracer.enable(os.environ["QUIZ_TRACE"])
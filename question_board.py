@@ -0,0 +1,186 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTableView,
+                               QAbstractItemView, QHeaderView, QStyledItemDelegate,
+                               QComboBox, QStyle)
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QRect
+from PySide6.QtGui import QColor, QPen, QPainter
+
+# 题目状态对应的颜色 (背景色, 前景色, 边框色)
+STATUS_COLORS = {
+    None: ("#f0f0f0", "black", "#cccccc"),
+    'correct': ("#90EE90", "black", "#cccccc"),
+    'wrong': ("#FFB6C1", "black", "#cccccc"),
+    'current': ("#2196F3", "white", "#1976D2"),
+}
+
+# 过滤器: (显示名称, 需要保留的状态)
+BOARD_FILTERS = [
+    ("全部题目", None),
+    ("只看错题", 'wrong'),
+    ("只看未作答", 'unanswered'),
+    ("只看正确", 'correct'),
+]
+
+class QuestionBoardModel(QAbstractTableModel):
+    """题目概览模型: 按 cols 列把题号排成网格, 不为每道题创建控件"""
+
+    def __init__(self, session, current_index, cols=10, parent=None):
+        super().__init__(parent)
+        self.session = session
+        self.current_index = current_index
+        self.cols = cols
+        # None 表示不过滤, 否则为过滤后保留的题目下标列表
+        self.visible_indices = None
+
+    def set_filter(self, wanted):
+        """切换过滤器, 直接使用会话维护好的下标序列"""
+        self.beginResetModel()
+        if wanted is None:
+            self.visible_indices = None
+        else:
+            self.visible_indices = self.session.indices_of(wanted)
+        self.endResetModel()
+
+    def item_count(self):
+        if self.visible_indices is None:
+            return len(self.session)
+        return len(self.visible_indices)
+
+    def question_index(self, model_index):
+        """网格单元 -> 题目下标, 空白单元返回 None"""
+        pos = model_index.row() * self.cols + model_index.column()
+        if pos >= self.item_count():
+            return None
+        if self.visible_indices is None:
+            return pos
+        return self.visible_indices[pos]
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return (self.item_count() + self.cols - 1) // self.cols
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.cols
+
+    def status_of(self, q_index):
+        if q_index == self.current_index:
+            return 'current'
+        return self.session[q_index]
+
+    def data(self, index, role=Qt.DisplayRole):
+        q_index = self.question_index(index)
+        if q_index is None:
+            return None
+        if role == Qt.DisplayRole:
+            return str(q_index + 1)
+        return None
+
+    def flags(self, index):
+        if self.question_index(index) is None:
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled
+
+
+class QuestionBoardDelegate(QStyledItemDelegate):
+    """直接绘制题号方块, 只有可见单元才会被绘制"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 颜色对象只创建一次, 绘制时直接复用
+        self.colors = {
+            status: (QColor(bg), QColor(fg), QPen(QColor(border)))
+            for status, (bg, fg, border) in STATUS_COLORS.items()
+        }
+
+    def paint(self, painter, option, index):
+        # 直接向模型取数, 不经过 index.data() 的 QVariant 转换
+        model = index.model()
+        q_index = model.question_index(index)
+        if q_index is None:
+            return
+
+        bg, fg, pen = self.colors.get(model.status_of(q_index), self.colors[None])
+        rect = QRect(option.rect).adjusted(3, 3, -3, -3)
+        if option.state & QStyle.State_MouseOver:
+            bg = bg.darker(110)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(pen)
+        painter.setBrush(bg)
+        painter.drawRoundedRect(rect, 3, 3)
+        painter.setPen(fg)
+        painter.drawText(rect, Qt.AlignCenter, str(q_index + 1))
+        painter.restore()
+
+
+class QuestionBoardDialog(QDialog):
+    """题目概览对话框 (点击题号跳转)"""
+
+    def __init__(self, session, current_index, on_jump, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("题目概览 (点击题号跳转)")
+        self.resize(700, 500)
+        self.on_jump = on_jump
+
+        layout = QVBoxLayout(self)
+
+        # 图例 + 过滤器
+        legend_layout = QHBoxLayout()
+        legend_layout.addWidget(QLabel("图例:"))
+
+        def create_legend(text, status):
+            bg, fg, border = STATUS_COLORS[status]
+            lbl = QLabel(text)
+            lbl.setStyleSheet(f"background-color: {bg}; color: {fg}; border: 1px solid {border}; padding: 2px 5px;")
+            return lbl
+
+        legend_layout.addWidget(create_legend(f"未作答 {len(session) - session.answered}", None))
+        legend_layout.addWidget(create_legend(f"正确 {session.correct}", 'correct'))
+        legend_layout.addWidget(create_legend(f"错误 {session.wrong}", 'wrong'))
+        legend_layout.addWidget(create_legend("当前题", 'current'))
+        legend_layout.addStretch()
+
+        self.filter_box = QComboBox()
+        for name, _ in BOARD_FILTERS:
+            self.filter_box.addItem(name)
+        self.filter_box.currentIndexChanged.connect(self.apply_filter)
+        legend_layout.addWidget(self.filter_box)
+
+        layout.addLayout(legend_layout)
+
+        # 网格视图: 固定单元尺寸, 滚动时只绘制可见区域
+        self.model = QuestionBoardModel(session, current_index, parent=self)
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.setItemDelegate(QuestionBoardDelegate(self.view))
+        self.view.setShowGrid(False)
+        self.view.setMouseTracking(True)
+        self.view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.view.setFocusPolicy(Qt.NoFocus)
+        self.view.setStyleSheet("QTableView { border: none; }")
+
+        for header, size in ((self.view.horizontalHeader(), 56), (self.view.verticalHeader(), 41)):
+            header.hide()
+            header.setSectionResizeMode(QHeaderView.Fixed)
+            header.setDefaultSectionSize(size)
+
+        self.view.clicked.connect(self.on_cell_clicked)
+        layout.addWidget(self.view)
+
+        # 打开时滚动到当前题
+        current_pos = self.model.index(current_index // self.model.cols, current_index % self.model.cols)
+        self.view.scrollTo(current_pos, QAbstractItemView.PositionAtCenter)
+
+    def apply_filter(self, combo_index):
+        self.model.set_filter(BOARD_FILTERS[combo_index][1])
+
+    def on_cell_clicked(self, model_index):
+        q_index = self.model.question_index(model_index)
+        if q_index is None:
+            return
+        self.on_jump(q_index)
+        self.close()
@@ -0,0 +1,189 @@
+import sys
+import json
+import sqlite3
+from collections import OrderedDict
+
+from perf_trace import tracer
+
+# 题型名 <-> 紧凑的题型码; 每道题只存一个小整数, 题型名全局共享一份
+TYPE_KEYS = ["single_choice", "true_false", "fill_in"]
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_KEYS)}
+TYPE_CODES["fill_in_the_blank"] = TYPE_CODES["fill_in"]  # 兼容旧数据
+
+
+def type_code(name):
+    code = TYPE_CODES.get(name)
+    if code is None:
+        code = TYPE_CODES[name] = len(TYPE_KEYS)
+        TYPE_KEYS.append(sys.intern(name))
+    return code
+
+
+def option_value(option):
+    """'A. 电子元件' -> 'A', '正确 (T)' -> 'T'; 只在加载时解析一次"""
+    if "." in option:
+        value = option.split(".")[0].strip()
+    elif "(" in option:
+        value = option.split("(")[1].split(")")[0].strip() or option[0]
+    else:
+        value = option
+    return sys.intern(value)
+
+
+class Question:
+    """单道题目; options / values 为元组, values 是预先解析好的选项值 ('A' / 'T' ...)"""
+
+    __slots__ = ("id", "type_code", "question", "options", "values", "answer")
+
+    def __init__(self, qid, q_type, question, options, answer):
+        self.id = qid
+        self.type_code = type_code(q_type)
+        self.question = question
+        self.options = tuple(options)
+        self.values = tuple(option_value(option) for option in self.options)
+        self.answer = answer
+
+    @property
+    def type(self):
+        return TYPE_KEYS[self.type_code]
+
+
+class QuestionSource:
+    """按需分页读取题库 (按 id 键集分页 + LRU 缓存)
+
+    打开题库只执行一次 COUNT, 不再 fetchall 整张表;
+    每页读出后立即转成 Question, 缓存中不再同时保留原始行和解码结果。
+    """
+
+    PAGE_SIZE = 200        # 每页读取的行数
+    MAX_PAGES = 16         # 页缓存上限
+
+    def __init__(self, db_path="quiz.db", count=None):
+        self.conn = tracer.watch_connection(sqlite3.connect(db_path))
+        # 启动时题数已由后台线程统计过, 可直接传入
+        if count is None:
+            count = self.conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+        self._count = count
+
+        # 页号 -> 该页第一题的 id (键集分页的锚点)
+        self._anchors = {}
+        # 页号 -> Question 列表
+        self._pages = OrderedDict()
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("题目下标越界")
+
+        page_no, offset = divmod(index, self.PAGE_SIZE)
+        return self._load_page(page_no)[offset]
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def indexes_of(self, question_ids):
+        """题目 id -> 下标; 按 id 排序后逐段计数, 避免对每个 id 做一次全量统计
+
+        题库中不存在 (如已删除) 的 id 不出现在结果中。
+        """
+        result = {}
+        index = 0
+        prev_id = None
+        for qid in sorted(set(question_ids)):
+            if prev_id is None:
+                sql, params = "SELECT COUNT(*), EXISTS(SELECT 1 FROM questions WHERE id = ?) " \
+                              "FROM questions WHERE id < ?", (qid, qid)
+            else:
+                sql, params = "SELECT COUNT(*), EXISTS(SELECT 1 FROM questions WHERE id = ?) " \
+                              "FROM questions WHERE id >= ? AND id < ?", (qid, prev_id, qid)
+            count, exists = self.conn.execute(sql, params).fetchone()
+            index += count
+            if exists:
+                result[qid] = index
+            prev_id = qid
+        return result
+
+    def close(self):
+        self.conn.close()
+
+    # --- 内部实现 ---
+
+    @staticmethod
+    def _decode(row):
+        # 数据库取出的 options 是 JSON 字符串，需要转回 Python 列表
+        qid, q_type, question, options, answer = row
+        return Question(qid, q_type, question, json.loads(options) if options else (), answer)
+
+    def _load_page(self, page_no):
+        page = self._pages.get(page_no)
+        if page is not None:
+            self._pages.move_to_end(page_no)
+            return page
+
+        with tracer.span("load_page", page=page_no):
+            return self._read_page(page_no)
+
+    def _read_page(self, page_no):
+        anchor = self._find_anchor(page_no)
+        rows = self.conn.execute(
+            "SELECT id, type, question, options, answer FROM questions "
+            "WHERE id >= ? ORDER BY id LIMIT ?",
+            (anchor, self.PAGE_SIZE)
+        ).fetchall()
+
+        # 顺带记录下一页的锚点, 顺序翻页时无需 OFFSET 定位
+        if len(rows) == self.PAGE_SIZE:
+            nxt = self.conn.execute(
+                "SELECT id FROM questions WHERE id > ? ORDER BY id LIMIT 1",
+                (rows[-1][0],)
+            ).fetchone()
+            if nxt:
+                self._anchors[page_no + 1] = nxt[0]
+
+        with tracer.span("decode_page", rows=len(rows)):
+            page = self._pages[page_no] = [self._decode(row) for row in rows]
+        if len(self._pages) > self.MAX_PAGES:
+            self._pages.popitem(last=False)
+        return page
+
+    def _find_anchor(self, page_no):
+        anchor = self._anchors.get(page_no)
+        if anchor is not None:
+            return anchor
+
+        # 前一页已加载时, 直接用它最后一行的 id 做键集定位
+        prev_page = self._pages.get(page_no - 1)
+        if prev_page:
+            row = self.conn.execute(
+                "SELECT id FROM questions WHERE id > ? ORDER BY id LIMIT 1",
+                (prev_page[-1].id,)
+            ).fetchone()
+        else:
+            # 跳转到从未访问过的页, 只在这里用一次 OFFSET
+            row = self.conn.execute(
+                "SELECT id FROM questions ORDER BY id LIMIT 1 OFFSET ?",
+                (page_no * self.PAGE_SIZE,)
+            ).fetchone()
+
+        anchor = row[0]
+        self._anchors[page_no] = anchor
+        return anchor
+
+
+def load_first_question(db_path="quiz.db"):
+    """只按主键取第一道题, 用于启动时先把首题显示出来; 题库为空时返回 None"""
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute(
+            "SELECT id, type, question, options, answer FROM questions ORDER BY id LIMIT 1").fetchone()
+    finally:
+        conn.close()
+    return QuestionSource._decode(row) if row else None
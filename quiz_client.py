@@ -0,0 +1,155 @@
+"""答题服务 (quiz_server.py) 的客户端: 与本地的 QuestionSource / QuizEngine 接口相同,
+QuizApp 用 --server 启动时换成这里的实现即可。
+"""
+import json
+import http.client
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from question_source import Question
+from quiz_engine import QuizEngine
+
+
+class QuizServerError(OSError):
+    """连接不上服务器或服务器拒绝请求"""
+
+
+class QuizClient:
+    """阻塞式 HTTP 客户端, 复用一条 keep-alive 连接; 每个线程各用一个实例"""
+
+    def __init__(self, base_url, timeout=10):
+        url = urlsplit(base_url if "://" in base_url else "http://" + base_url)
+        self.host = url.hostname or "127.0.0.1"
+        self.port = url.port or 8765
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method, path, body=None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        # 服务器可能已关闭空闲连接, 失败时重连一次; POST 不是幂等的 (重发会重复记录作答),
+        # 只有请求还没发出去时才重试, 发出后失败 (如读超时) 直接报错
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            sent = False
+            try:
+                self.conn.request(method, path, payload, headers)
+                sent = True
+                response = self.conn.getresponse()
+                data = json.loads(response.read())
+                break
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                self.close()
+                if attempt or (sent and method != "GET"):
+                    raise QuizServerError(f"无法连接答题服务器 {self.host}:{self.port}: {e}") from e
+        if response.status != 200:
+            raise QuizServerError(data.get("error") or f"服务器返回 {response.status}")
+        return data
+
+    def info(self):
+        return self.request("GET", "/api/info")
+
+    def page(self, page_no):
+        """第 page_no 页题目: [Question, ...], 标准答案为 None"""
+        rows = self.request("GET", f"/api/questions?page={page_no}")["questions"]
+        return [Question(qid, q_type, question, json.loads(options) if options else (), None)
+                for qid, q_type, question, options in rows]
+
+    def indexes_of(self, question_ids):
+        ids = ",".join(str(qid) for qid in question_ids)
+        if not ids:
+            return {}
+        result = self.request("GET", f"/api/indexes?ids={ids}")["indexes"]
+        return {int(qid): index for qid, index in result.items()}
+
+    def new_session(self):
+        return self.request("POST", "/api/sessions", {})["session_id"]
+
+    def submit(self, session_id, question_id, answer, elapsed_ms=None):
+        """服务器判分并记录, 返回 (是否正确, 标准答案)"""
+        result = self.request("POST", "/api/answers",
+                              {"session_id": session_id, "question_id": question_id, "answer": answer,
+                               "elapsed_ms": elapsed_ms})
+        return result["is_correct"], result["answer"]
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class RemoteQuestionSource:
+    """按页从服务器读取题目, 接口同 QuestionSource
+
+    服务器不下发标准答案; 作答后拿到的答案记在 revealed 中, 页被换出后重新读取也能恢复。
+    """
+
+    MAX_PAGES = 16
+
+    def __init__(self, client, count, page_size=200):
+        self.client = client
+        self._count = count
+        self.page_size = page_size
+        self._pages = OrderedDict()
+        self.revealed = {}      # 题目 id -> 标准答案
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("题目下标越界")
+
+        page_no, offset = divmod(index, self.page_size)
+        page = self._pages.get(page_no)
+        if page is None:
+            page = self._pages[page_no] = self.client.page(page_no)
+            for q in page:
+                q.answer = self.revealed.get(q.id)
+            if len(self._pages) > self.MAX_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_no)
+        return page[offset]
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def indexes_of(self, question_ids):
+        return self.client.indexes_of(sorted(set(question_ids)))
+
+    def reveal(self, question, answer):
+        question.answer = answer
+        self.revealed[question.id] = answer
+
+    def close(self):
+        self.client.close()
+
+
+class RemoteQuizEngine(QuizEngine):
+    """判分交给服务器 (同时记录作答), 本地只维护会话状态"""
+
+    def __init__(self, questions, session_id):
+        self.session_id = session_id
+        super().__init__(questions)
+
+    def submit(self, index, answer, elapsed_ms=None):
+        q = self.questions[index]
+        correct, correct_answer = self.questions.client.submit(self.session_id, q.id, answer, elapsed_ms)
+        self.questions.reveal(q, correct_answer)
+        self.answers[index] = answer
+        self.session.record(index, q.type, correct)
+        return correct
+
+    def new_session(self):
+        self.session_id = self.questions.client.new_session()
+        self.reset()
+        return self.session_id
+
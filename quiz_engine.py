@@ -0,0 +1,274 @@
+"""无界面的答题引擎: 题目模型、答案规范化、判分与批量阅卷
+
+GUI (main.py) 只是它的一个客户端; 阅卷也可以脱离 Qt 直接在命令行运行:
+
+    python quiz_engine.py submissions.csv [--db quiz.db] [--out graded.csv] [--stats stats.csv]
+    python quiz_engine.py --from-attempts [--db quiz.db]    # 按当前规则重新批改历史作答
+
+提交文件为 CSV (含 question_id, answer 列) 或 JSON Lines (每行一个对象),
+可选 student 列用于按学生汇总得分。
+"""
+import sys
+import csv
+import json
+import time
+import sqlite3
+import argparse
+
+from session_state import SessionState, SCORE_PER_CORRECT
+from answer_matcher import AnswerMatcher, CompiledAnswer
+
+CHOICE_TYPES = ("single_choice", "true_false")
+FILL_TYPES = ("fill_in", "fill_in_the_blank")
+
+TYPE_NAMES = {
+    "single_choice": "选择题",
+    "true_false": "判断题",
+    "fill_in": "填空题",
+    "fill_in_the_blank": "填空题",  # 兼容旧数据
+}
+
+
+def normalize_answer(text):
+    return str(text).strip().upper()
+
+
+def is_correct(q_type, correct_answer, user_answer):
+    """单次判分; 填空题按规范形式和等价写法匹配, 见 answer_matcher"""
+    if q_type in FILL_TYPES:
+        return CompiledAnswer(correct_answer).matches(user_answer)
+    return normalize_answer(user_answer) == normalize_answer(correct_answer)
+
+
+class QuizEngine:
+    """一次答题会话: 题库 (Question 序列) + 作答状态 + 每题最后一次的原始答案"""
+
+    def __init__(self, questions):
+        self.questions = questions
+        self.matcher = AnswerMatcher()
+        self.reset()
+
+    def reset(self):
+        self.session = SessionState(len(self.questions))
+        self.answers = {}   # 下标 -> 用户原始答案
+
+    def __len__(self):
+        return len(self.questions)
+
+    def question(self, index):
+        return self.questions[index]
+
+    def choices(self, index):
+        """选择 / 判断题的 [(选项文本, 选项值), ...]; 填空题返回空列表"""
+        q = self.questions[index]
+        if q.type not in CHOICE_TYPES:
+            return []
+        return list(zip(q.options, q.values))
+
+    def status(self, index):
+        return self.session[index]
+
+    def restore(self, rows, index_map=None):
+        """按数据库中的作答记录 [(question_id, type, answer, is_correct), ...] 恢复状态
+
+        index_map (题目 id -> 下标) 可以事先在后台线程算好传入; 题库中已删除的题目跳过。
+        """
+        if index_map is None:
+            index_map = self.questions.indexes_of(row[0] for row in rows)
+        for question_id, q_type, answer, correct in rows:
+            index = index_map.get(question_id)
+            if index is None:
+                continue
+            self.session.record(index, q_type, bool(correct))
+            self.answers[index] = answer
+
+    def submit(self, index, answer, elapsed_ms=None):
+        """判分并登记, 返回是否正确; 作答用时由调用方记录, 这里不用"""
+        q = self.questions[index]
+        if q.type in FILL_TYPES:
+            correct = self.matcher.matches(q.id, q.answer, answer)
+        else:
+            correct = normalize_answer(answer) == normalize_answer(q.answer)
+        self.answers[index] = answer
+        self.session.record(index, q.type, correct)
+        return correct
+
+
+# --- 批量阅卷 ---
+
+class AnswerKey:
+    """question_id -> (题型, 标准答案), 整个题库只读一遍
+
+    选择 / 判断题存规范化后的字符串, 填空题存编译好的 CompiledAnswer。
+    """
+
+    def __init__(self, db_path="quiz.db"):
+        self.entries = {}
+        conn = sqlite3.connect(db_path)
+        try:
+            for qid, q_type, answer in conn.execute("SELECT id, type, answer FROM questions"):
+                if q_type in FILL_TYPES:
+                    self.entries[qid] = (q_type, CompiledAnswer(answer))
+                else:
+                    self.entries[qid] = (q_type, normalize_answer(answer))
+        finally:
+            conn.close()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def grade(self, question_id, answer):
+        """返回 (题型, 是否正确); 题库中没有的题返回 (None, None)"""
+        entry = self.entries.get(question_id)
+        if entry is None:
+            return None, None
+        q_type, expected = entry
+        if q_type in FILL_TYPES:
+            return q_type, expected.matches(answer)
+        return q_type, normalize_answer(answer) == expected
+
+
+class GradeReport:
+    """批量阅卷的汇总结果"""
+
+    def __init__(self):
+        self.total = 0
+        self.correct = 0
+        self.unknown = 0            # 题库中不存在的 question_id
+        self.by_question = {}       # question_id -> [作答数, 正确数]
+        self.by_type = {}           # 题型 -> [作答数, 正确数]
+        self.by_student = {}        # 学生 -> [作答数, 正确数]
+
+    @property
+    def score(self):
+        return self.correct * SCORE_PER_CORRECT
+
+    def add(self, question_id, q_type, correct, student=None):
+        self.total += 1
+        self.correct += correct
+        self._count(self.by_question, question_id, correct)
+        self._count(self.by_type, q_type, correct)
+        if student is not None:
+            self._count(self.by_student, student, correct)
+
+    @staticmethod
+    def _count(table, key, correct):
+        counts = table.get(key)
+        if counts is None:
+            counts = table[key] = [0, 0]
+        counts[0] += 1
+        counts[1] += correct
+
+
+def iter_submissions(path):
+    """逐条产出 (student, question_id, answer), 按扩展名识别 CSV / JSON Lines"""
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    yield item.get("student"), int(item["question_id"]), item.get("answer", "")
+    else:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for item in csv.DictReader(f):
+                yield item.get("student") or None, int(item["question_id"]), item.get("answer") or ""
+
+
+def iter_attempts(db_path):
+    """按当前判分规则重新批改 attempts 表中的全部作答, 按会话汇总"""
+    conn = sqlite3.connect(db_path)
+    try:
+        for session_id, qid, answer in conn.execute(
+                "SELECT session_id, question_id, answer FROM attempts ORDER BY id"):
+            yield f"会话 {session_id}", qid, answer or ""
+    finally:
+        conn.close()
+
+
+def iter_chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def grade_submissions(submissions, key, on_graded=None, chunk_size=10000):
+    """分块阅卷; on_graded(chunk, results) 可用于流式写出逐条结果"""
+    report = GradeReport()
+    grade = key.grade
+    add = report.add
+    for chunk in iter_chunks(submissions, chunk_size):
+        results = [grade(qid, answer) for _, qid, answer in chunk]
+        for (student, qid, _), (q_type, correct) in zip(chunk, results):
+            if q_type is None:
+                report.unknown += 1
+            else:
+                add(qid, q_type, correct, student)
+        if on_graded is not None:
+            on_graded(chunk, results)
+    return report
+
+
+def write_stats(path, report):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["question_id", "attempts", "correct", "accuracy"])
+        for qid in sorted(report.by_question):
+            attempts, correct = report.by_question[qid]
+            writer.writerow([qid, attempts, correct, f"{correct / attempts:.4f}"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="按 quiz.db 中的标准答案批量阅卷")
+    parser.add_argument("submissions", nargs="?", help="提交文件 (.csv 或 .jsonl)")
+    parser.add_argument("--from-attempts", action="store_true", help="重新批改数据库 attempts 表中的作答记录")
+    parser.add_argument("--db", default="quiz.db", help="SQLite 数据库路径")
+    parser.add_argument("--out", help="逐条判分结果 CSV")
+    parser.add_argument("--stats", help="按题汇总的正确率 CSV")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="每块阅卷的提交数")
+    args = parser.parse_args(argv)
+    if not args.submissions and not args.from_attempts:
+        parser.error("需要提交文件或 --from-attempts")
+
+    started = time.perf_counter()
+    out = None
+    try:
+        key = AnswerKey(args.db)
+        if args.out:
+            out = open(args.out, "w", encoding="utf-8", newline="")
+            writer = csv.writer(out)
+            writer.writerow(["student", "question_id", "answer", "is_correct"])
+
+        def write_results(chunk, results):
+            writer.writerows((student or "", qid, answer, "" if correct is None else int(correct))
+                             for (student, qid, answer), (_, correct) in zip(chunk, results))
+
+        on_graded = write_results if args.out else None
+        submissions = iter_attempts(args.db) if args.from_attempts else iter_submissions(args.submissions)
+        report = grade_submissions(submissions, key, on_graded, args.chunk_size)
+        if args.stats:
+            write_stats(args.stats, report)
+    except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+        print(f"阅卷失败: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if out is not None:
+            out.close()
+
+    seconds = time.perf_counter() - started
+    rate = report.total / seconds if seconds > 0 else 0
+    print(f"阅卷 {report.total} 条: 正确 {report.correct}, 错误 {report.total - report.correct}, "
+          f"未知题目 {report.unknown}, 总分 {report.score}  用时 {seconds:.2f}s ({rate:,.0f} 条/秒)")
+    for q_type, (attempts, correct) in sorted(report.by_type.items()):
+        print(f"  {TYPE_NAMES.get(q_type, q_type)}: 作答 {attempts}, 正确 {correct}")
+    for student, (attempts, correct) in sorted(report.by_student.items()):
+        print(f"  {student}: 作答 {attempts}, 正确 {correct}, 得分 {correct * SCORE_PER_CORRECT}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
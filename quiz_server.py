@@ -0,0 +1,360 @@
+"""局域网答题服务: 全班共用一份题库和判分规则, 学生端不再各自持有 quiz.db
+
+    python quiz_server.py [--db quiz.db] [--host 127.0.0.1] [--port 8765] [--readers 8]
+    python main.py --server http://<服务器地址>:8765
+
+服务没有身份验证, 默认只监听本机; 需要让局域网内的学生端连接时显式指定 --host 0.0.0.0。
+
+asyncio 单线程处理所有连接 (HTTP/1.1 keep-alive, JSON); 读库交给 WAL 模式下的
+只读连接池, 作答记录仍由 attempt_store 的 DbWriter 攒批写入。
+
+接口:
+    GET  /api/info                      题数、分页大小
+    GET  /api/questions?page=N          第 N 页题目 (不含答案)
+    GET  /api/indexes?ids=3,17          题目 id -> 下标
+    POST /api/sessions                  新建会话
+    POST /api/answers                   {"session_id", "question_id", "answer", "elapsed_ms"}
+                                        判分并记录 (用时可省略), 返回是否正确和标准答案
+"""
+import sys
+import json
+import http
+import asyncio
+import sqlite3
+import argparse
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+
+from attempt_store import AttemptStore
+from answer_matcher import AnswerMatcher
+from quiz_engine import FILL_TYPES, normalize_answer
+from perf_trace import tracer
+
+PAGE_SIZE = 200         # 与 QuestionSource 一致
+MAX_PAGES = 64          # 已编码页的缓存上限
+MAX_ANSWERS = 20000     # 标准答案缓存上限
+MAX_BODY = 64 * 1024    # 请求体上限
+MAX_HEADERS = 64
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ReadPool:
+    """只读连接池: 执行器的每个线程各自持有一条连接, 读请求不占用事件循环"""
+
+    def __init__(self, db_path, size=8):
+        self.db_path = db_path
+        self.local = threading.local()
+        self.conns = []
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(size, thread_name_prefix="quiz-reader", initializer=self._open)
+
+    def _open(self):
+        conn = tracer.watch_connection(sqlite3.connect(self.db_path, check_same_thread=False))
+        conn.execute("PRAGMA query_only=ON")
+        self.local.conn = conn
+        with self.lock:
+            self.conns.append(conn)
+
+    async def run(self, fn, *args):
+        """在连接池线程中执行 fn(conn, *args)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._call, fn, args)
+
+    def _call(self, fn, args):
+        return fn(self.local.conn, *args)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        with self.lock:
+            for conn in self.conns:
+                conn.close()
+            self.conns = []
+
+
+# --- 读库 (在连接池线程中执行) ---
+
+def read_page(conn, first_id):
+    return conn.execute(
+        "SELECT id, type, question, options, answer FROM questions WHERE id >= ? ORDER BY id LIMIT ?",
+        (first_id, PAGE_SIZE)
+    ).fetchall()
+
+
+def read_answer(conn, question_id):
+    return conn.execute("SELECT type, answer FROM questions WHERE id = ?", (question_id,)).fetchone()
+
+
+class QuizService:
+    """题库、判分和会话; 除读库外都在事件循环线程中执行, 无需加锁"""
+
+    def __init__(self, db_path="quiz.db", readers=8):
+        self.db_path = db_path
+        conn = sqlite3.connect(db_path)
+        try:
+            # WAL 模式记录在库文件中, 读连接和写线程互不阻塞
+            conn.execute("PRAGMA journal_mode=WAL")
+            # 全部题目 id 按序常驻内存 (100 万题约 8 MB), 下标 <-> id 直接查表
+            self.ids = array("q", (row[0] for row in conn.execute("SELECT id FROM questions ORDER BY id")))
+        finally:
+            conn.close()
+
+        self.store = AttemptStore(db_path)
+        self.last_session_id = self._max_session_id()
+        self.pool = ReadPool(db_path, readers)
+        self.matcher = AnswerMatcher()
+
+        # 页号 -> 编码好的响应 (Future); 同一页的并发请求只读一次库
+        self.pages = OrderedDict()
+        # 题目 id -> (题型, 标准答案)
+        self.answers = OrderedDict()
+
+        self.routes = {
+            ("GET", "/api/info"): self.info,
+            ("GET", "/api/questions"): self.questions,
+            ("GET", "/api/indexes"): self.indexes,
+            ("POST", "/api/sessions"): self.new_session,
+            ("POST", "/api/answers"): self.submit_answer,
+        }
+
+    def _max_session_id(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT MAX(id) FROM sessions").fetchone()[0] or 0
+        finally:
+            conn.close()
+
+    def close(self):
+        self.pool.close()
+        # 写完队列中剩余的作答记录
+        try:
+            self.store.close()
+        except sqlite3.Error as e:
+            print(f"作答记录保存失败: {e}", file=sys.stderr)
+
+    # --- 接口 ---
+
+    async def info(self, query, body):
+        return {"count": len(self.ids), "page_size": PAGE_SIZE}
+
+    async def questions(self, query, body):
+        page_no = int_param(query, "page")
+        if not 0 <= page_no * PAGE_SIZE < len(self.ids):
+            raise HttpError(404, "页号越界")
+
+        future = self.pages.get(page_no)
+        if future is not None:
+            self.pages.move_to_end(page_no)
+            return await asyncio.shield(future)
+
+        future = self.pages[page_no] = asyncio.get_running_loop().create_future()
+        try:
+            rows = await self.pool.run(read_page, self.ids[page_no * PAGE_SIZE])
+        except Exception as e:
+            del self.pages[page_no]
+            future.set_exception(e)
+            future.exception()      # 已由本请求处理, 避免 "never retrieved" 警告
+            raise
+        # 学生答题前总会先取到所在页, 顺带缓存标准答案, 提交时不必再查库
+        for qid, q_type, _, _, answer in rows:
+            self.remember_answer(qid, (q_type, answer))
+        # 不下发答案; options 原样转发 JSON 字符串, 由客户端解码
+        payload = json.dumps({"page": page_no, "questions": [row[:4] for row in rows]},
+                             ensure_ascii=False).encode("utf-8")
+        future.set_result(payload)
+        if len(self.pages) > MAX_PAGES:
+            self.pages.popitem(last=False)
+        return payload
+
+    async def indexes(self, query, body):
+        result = {}
+        for part in query.get("ids", [""])[0].split(","):
+            if part.strip():
+                qid = int(part)
+                i = bisect_left(self.ids, qid)
+                if i < len(self.ids) and self.ids[i] == qid:
+                    result[qid] = i
+        return {"indexes": result}
+
+    async def new_session(self, query, body):
+        # 会话 id 由 SQLite 分配: 桌面端可能同时在用同一个 quiz.db, 不能在内存中自行编号
+        session_id = await asyncio.get_running_loop().run_in_executor(None, self.store.new_session)
+        self.last_session_id = max(self.last_session_id, session_id)
+        return {"session_id": session_id}
+
+    async def submit_answer(self, query, body):
+        try:
+            session_id = int(body["session_id"])
+            question_id = int(body["question_id"])
+            answer = str(body["answer"]).strip()
+            elapsed_ms = body.get("elapsed_ms")
+            elapsed_ms = None if elapsed_ms is None else max(0, int(elapsed_ms))
+        except (KeyError, TypeError, ValueError):
+            raise HttpError(400, "需要 session_id, question_id, answer")
+        if not 0 < session_id <= self.last_session_id:
+            raise HttpError(404, "会话不存在")
+
+        entry = self.answers.get(question_id)
+        if entry is None:
+            entry = await self.pool.run(read_answer, question_id)
+            if entry is None:
+                raise HttpError(404, "题目不存在")
+            self.remember_answer(question_id, entry)
+        q_type, correct_answer = entry
+
+        # 与 QuizEngine.submit 相同的判分规则
+        if q_type in FILL_TYPES:
+            is_correct = self.matcher.matches(question_id, correct_answer, answer)
+        else:
+            is_correct = normalize_answer(answer) == normalize_answer(correct_answer)
+        self.store.log_attempt(session_id, question_id, answer, is_correct, elapsed_ms)
+        failure = self.store.take_error()
+        if failure is not None:
+            print(f"{failure[1]} 条作答记录保存失败: {failure[0]}", file=sys.stderr)
+        return {"is_correct": is_correct, "answer": correct_answer, "type": q_type}
+
+    def remember_answer(self, question_id, entry):
+        self.answers[question_id] = entry
+        if len(self.answers) > MAX_ANSWERS:
+            self.answers.popitem(last=False)
+
+    # --- HTTP ---
+
+    async def handle(self, reader, writer):
+        """一条连接上依次处理多个请求 (keep-alive)"""
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HttpError as e:
+                    await send(writer, e.status, encode_error(str(e)), keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, payload = await self.dispatch(method, target, body)
+                await send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # 服务退出时空闲的 keep-alive 连接会被取消, 连接随之关闭即可
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            return 404, encode_error("接口不存在")
+        with tracer.span("api", path=url.path):
+            try:
+                data = json.loads(body) if body else {}
+                result = await handler(parse_qs(url.query), data)
+            except HttpError as e:
+                return e.status, encode_error(str(e))
+            except (ValueError, AttributeError) as e:
+                return 400, encode_error(f"请求格式错误: {e}")
+            except sqlite3.Error as e:
+                return 500, encode_error(f"数据库错误: {e}")
+        if isinstance(result, bytes):
+            return 200, result
+        return 200, json.dumps(result, ensure_ascii=False).encode("utf-8")
+
+
+def int_param(query, name):
+    try:
+        return int(query[name][0])
+    except (KeyError, ValueError):
+        raise HttpError(400, f"缺少整数参数 {name}")
+
+
+def encode_error(message):
+    return json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+
+
+async def read_request(reader):
+    """读取一个请求: (方法, 路径, 头部, 请求体); 对端关闭连接时返回 None"""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "请求行格式错误")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise HttpError(431, "请求头过多")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HttpError(400, "Content-Length 不是整数")
+    if length < 0:
+        raise HttpError(400, "Content-Length 不能为负数")
+    if length > MAX_BODY:
+        raise HttpError(413, "请求体过大")
+    body = await reader.readexactly(length) if length else b""
+    return method, target, headers, body
+
+
+async def send(writer, status, payload, keep_alive):
+    head = (f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode("latin-1") + payload)
+    await writer.drain()
+
+
+async def serve(args):
+    service = QuizService(args.db, args.readers)
+    server = await asyncio.start_server(service.handle, args.host, args.port, backlog=1024)
+    print(f"答题服务已启动: http://{args.host}:{args.port}  题目 {len(service.ids)} 道, "
+          f"读连接 {args.readers} 条", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+        if tracer.enabled:
+            print(f"trace 已写入: {tracer.save()}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="局域网答题服务")
+    parser.add_argument("--db", default="quiz.db", help="SQLite 数据库路径")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址; 对局域网开放需显式指定 0.0.0.0")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--readers", type=int, default=8, help="只读连接数")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    except (OSError, sqlite3.Error) as e:
+        print(f"答题服务启动失败: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
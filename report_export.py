@@ -0,0 +1,199 @@
+import os
+import csv
+import json
+import sqlite3
+import datetime
+
+from PySide6.QtCore import QThread, Signal
+
+from perf_trace import tracer
+
+# 支持的导出格式: 扩展名 -> 显示名称
+EXPORT_FORMATS = {
+    "txt": "Text Files (*.txt)",
+    "csv": "CSV Files (*.csv)",
+    "jsonl": "JSON Lines (*.jsonl)",
+    "md": "Markdown (*.md)",
+}
+
+CSV_FIELDS = ["session_id", "number", "question_id", "type", "question", "options",
+              "user_answer", "answer", "answered_at"]
+
+# 每道题最后一次作答为错误的记录; session_id 为 NULL 时导出全部会话
+WRONG_ROWS_SQL = """
+    SELECT a.session_id, q.id, q.type, q.question, q.options, a.answer, q.answer, a.answered_at
+    FROM attempts a JOIN questions q ON q.id = a.question_id
+    WHERE a.id IN (
+        SELECT MAX(id) FROM attempts
+        WHERE (:session_id IS NULL OR session_id = :session_id)
+        GROUP BY session_id, question_id
+    ) AND a.is_correct = 0
+    ORDER BY a.session_id, q.id
+"""
+
+COUNT_SQL = "SELECT COUNT(*) FROM (" + WRONG_ROWS_SQL + ")"
+
+
+class IdRanker:
+    """题目 id -> 题号; 按 id 递增访问时只统计增量区间"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.last_id = None
+        self.last_rank = 0
+
+    def rank(self, question_id):
+        if self.last_id is None or question_id < self.last_id:
+            count = self.conn.execute(
+                "SELECT COUNT(*) FROM questions WHERE id < ?", (question_id,)).fetchone()[0]
+        else:
+            count = self.last_rank + self.conn.execute(
+                "SELECT COUNT(*) FROM questions WHERE id >= ? AND id < ?",
+                (self.last_id, question_id)).fetchone()[0]
+        self.last_id, self.last_rank = question_id, count
+        return count + 1
+
+
+def iter_wrong_rows(conn, session_id=None):
+    """逐行产出错题记录 (字典), 不在内存中攒整份报告"""
+    ranker = IdRanker(conn)
+    cursor = conn.execute(WRONG_ROWS_SQL, {"session_id": session_id})
+    for sid, qid, q_type, question, options, user_ans, answer, answered_at in cursor:
+        yield {
+            "session_id": sid,
+            "number": ranker.rank(qid),
+            "question_id": qid,
+            "type": q_type,
+            "question": question,
+            "options": json.loads(options) if options else [],
+            "user_answer": user_ans,
+            "answer": answer,
+            "answered_at": answered_at,
+        }
+
+
+def count_wrong_rows(conn, session_id=None):
+    return conn.execute(COUNT_SQL, {"session_id": session_id}).fetchone()[0]
+
+
+# --- 各格式的写出函数: 每写一行 yield 一次, 便于上报进度和取消 ---
+
+def write_txt(f, rows, header):
+    f.write("=== 计算机组成原理错题报告 ===\n")
+    for line in header:
+        f.write(line + "\n")
+    f.write("=" * 30 + "\n\n")
+    for row in rows:
+        f.write(f"【第 {row['number']} 题】 ({row['type']})\n")
+        f.write(f"题目: {row['question']}\n")
+        if row["options"]:
+            f.write("选项:\n")
+            for opt in row["options"]:
+                f.write(f"  {opt}\n")
+        f.write(f"❌ 你的答案: {row['user_answer']}\n")
+        f.write(f"✅ 正确答案: {row['answer']}\n")
+        f.write("-" * 30 + "\n\n")
+        yield row
+
+
+def write_csv(f, rows, header):
+    writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(dict(row, options=" | ".join(row["options"])))
+        yield row
+
+
+def write_jsonl(f, rows, header):
+    for row in rows:
+        f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        yield row
+
+
+def write_md(f, rows, header):
+    f.write("# 计算机组成原理错题报告\n\n")
+    for line in header:
+        f.write(f"- {line.strip()}\n")
+    f.write("\n")
+    for row in rows:
+        f.write(f"## 第 {row['number']} 题 ({row['type']})\n\n")
+        f.write(f"{row['question']}\n\n")
+        for opt in row["options"]:
+            f.write(f"- {opt}\n")
+        if row["options"]:
+            f.write("\n")
+        f.write(f"- ❌ 你的答案: `{row['user_answer']}`\n")
+        f.write(f"- ✅ 正确答案: `{row['answer']}`\n\n")
+        yield row
+
+
+WRITERS = {
+    "txt": write_txt,
+    "csv": write_csv,
+    "jsonl": write_jsonl,
+    "md": write_md,
+}
+
+
+def format_from_path(path, default="txt"):
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    return ext if ext in WRITERS else default
+
+
+class ExportWorker(QThread):
+    """后台导出错题报告: 逐行读库、逐行写文件, 可取消"""
+
+    progress = Signal(int, int)     # 已写行数, 总行数
+    completed = Signal(str, int)    # 文件路径, 写出行数
+    failed = Signal(str)
+
+    PROGRESS_EVERY = 200
+
+    def __init__(self, db_path, file_path, fmt, session_id=None, summary="", details=None, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.file_path = file_path
+        self.fmt = fmt
+        self.session_id = session_id
+        self.summary = summary              # 接在 "错题数量" 之后的统计
+        self.details = list(details or [])  # 其余表头行 (如分题型统计)
+
+    def run(self):
+        with tracer.span("export", format=self.fmt):
+            self._export()
+
+    def _export(self):
+        written = 0
+        try:
+            conn = tracer.watch_connection(sqlite3.connect(self.db_path))
+            try:
+                total = count_wrong_rows(conn, self.session_id)
+                count_line = f"错题数量: {total}" + (f"   {self.summary}" if self.summary else "")
+                header = [f"生成时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                          count_line] + self.details
+                self.progress.emit(0, total)
+
+                newline = "" if self.fmt == "csv" else None
+                with open(self.file_path, "w", encoding="utf-8", newline=newline) as f:
+                    for _ in WRITERS[self.fmt](f, iter_wrong_rows(conn, self.session_id), header):
+                        written += 1
+                        if written % self.PROGRESS_EVERY == 0:
+                            self.progress.emit(written, total)
+                            if self.isInterruptionRequested():
+                                break
+            finally:
+                conn.close()
+        except (OSError, sqlite3.Error, ValueError) as e:
+            self.failed.emit(str(e))
+            return
+
+        if self.isInterruptionRequested():
+            # 取消时删除写了一半的文件
+            try:
+                os.remove(self.file_path)
+            except OSError:
+                pass
+            return
+
+        self.progress.emit(written, written)
+        self.completed.emit(self.file_path, written)
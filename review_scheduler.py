@@ -0,0 +1,198 @@
+import time
+import heapq
+import sqlite3
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS review_state (
+        question_id INTEGER PRIMARY KEY,
+        ease REAL NOT NULL,
+        interval REAL NOT NULL,
+        reps INTEGER NOT NULL,
+        lapses INTEGER NOT NULL,
+        due REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_review_state_due ON review_state(due)",
+]
+
+UPSERT_STATE = """
+    INSERT INTO review_state (question_id, ease, interval, reps, lapses, due)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(question_id) DO UPDATE SET
+        ease = excluded.ease,
+        interval = excluded.interval,
+        reps = excluded.reps,
+        lapses = excluded.lapses,
+        due = excluded.due
+"""
+
+DELETE_STATE = "DELETE FROM review_state WHERE question_id = ?"
+
+DAY_SECONDS = 86400
+# 答错后隔多久再出现 (秒), 保证同一次复习里能再练一遍
+AGAIN_DELAY_SECONDS = 60
+MIN_EASE = 1.3
+DEFAULT_EASE = 2.5
+
+# 答对 / 答错对应的 SM-2 评分 (0-5)
+QUALITY_CORRECT = 4
+QUALITY_WRONG = 1
+
+
+def ensure_schema(conn):
+    for sql in SCHEMA:
+        conn.execute(sql)
+    conn.commit()
+
+
+class ReviewCard:
+    """单道题的复习状态 (SM-2)"""
+
+    __slots__ = ("question_id", "ease", "interval", "reps", "lapses", "due")
+
+    def __init__(self, question_id, ease=DEFAULT_EASE, interval=0.0, reps=0, lapses=0, due=0.0):
+        self.question_id = question_id
+        self.ease = ease
+        self.interval = interval    # 单位: 天
+        self.reps = reps
+        self.lapses = lapses
+        self.due = due              # 到期时间戳 (秒)
+
+    def review(self, quality, now):
+        """按 SM-2 更新间隔和易度因子"""
+        if quality < 3:
+            self.reps = 0
+            self.lapses += 1
+            self.interval = 0.0
+            self.due = now + AGAIN_DELAY_SECONDS
+        else:
+            if self.reps == 0:
+                self.interval = 1.0
+            elif self.reps == 1:
+                self.interval = 6.0
+            else:
+                self.interval = round(self.interval * self.ease, 2)
+            self.reps += 1
+            self.due = now + self.interval * DAY_SECONDS
+
+        self.ease = max(MIN_EASE, self.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+    def as_row(self):
+        return (self.question_id, self.ease, self.interval, self.reps, self.lapses, self.due)
+
+
+class ReviewScheduler:
+    """间隔重复调度: 小顶堆按到期时间取下一题, O(log n)
+
+    启动时只读入 (question_id, due) 建堆, 完整的 ReviewCard 在作答时才按主键读取。
+    堆中可能有过期条目 (同一题被重新排期), 取堆顶时按 due_at 中的最新值惰性丢弃。
+    状态变化交给 submit(sql, params) 异步写库。
+    """
+
+    def __init__(self, db_path, submit):
+        self.db_path = db_path
+        self.submit = submit
+        self.due_at = None      # question_id -> 最新到期时间
+        self.heap = []
+        self.cards = {}         # 本次运行中读过或改过的卡片, 比数据库 (可能还在写队列中) 更新
+
+        conn = sqlite3.connect(db_path)
+        try:
+            ensure_schema(conn)
+        finally:
+            conn.close()
+
+    def _ensure_loaded(self):
+        if self.due_at is not None:
+            return
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self.due_at = dict(conn.execute("SELECT question_id, due FROM review_state"))
+        finally:
+            conn.close()
+        self.heap = [(due, qid) for qid, due in self.due_at.items()]
+        heapq.heapify(self.heap)
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self.due_at)
+
+    def _clean_top(self):
+        # 丢弃已失效的堆顶条目
+        while self.heap:
+            due, qid = self.heap[0]
+            if self.due_at.get(qid) == due:
+                return
+            heapq.heappop(self.heap)
+
+    def next_due_time(self):
+        self._ensure_loaded()
+        self._clean_top()
+        return self.heap[0][0] if self.heap else None
+
+    def due_questions(self, now=None, limit=1):
+        """最早到期的至多 limit 道题 id (不出堆), 用于取当前题和预取"""
+        self._ensure_loaded()
+        now = time.time() if now is None else now
+        popped = []
+        result = []
+        while len(result) < limit:
+            self._clean_top()
+            if not self.heap or self.heap[0][0] > now:
+                break
+            entry = heapq.heappop(self.heap)
+            popped.append(entry)
+            result.append(entry[1])
+        for entry in popped:
+            heapq.heappush(self.heap, entry)
+        return result
+
+    def _card(self, question_id):
+        card = self.cards.get(question_id)
+        if card is None and question_id in self.due_at:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                row = conn.execute(
+                    "SELECT question_id, ease, interval, reps, lapses, due FROM review_state "
+                    "WHERE question_id = ?", (question_id,)).fetchone()
+            finally:
+                conn.close()
+            if row:
+                card = self.cards[question_id] = ReviewCard(*row)
+        return card
+
+    def record(self, question_id, is_correct, now=None):
+        """登记一次作答; 答错的题自动加入复习队列, 答对的题只更新已在队列中的"""
+        self._ensure_loaded()
+        now = time.time() if now is None else now
+        card = self._card(question_id)
+        if card is None:
+            if is_correct:
+                return
+            card = self.cards[question_id] = ReviewCard(question_id)
+
+        card.review(QUALITY_CORRECT if is_correct else QUALITY_WRONG, now)
+        self.due_at[question_id] = card.due
+        heapq.heappush(self.heap, (card.due, question_id))
+        self.submit(UPSERT_STATE, card.as_row())
+
+    def discard(self, question_id):
+        """移出复习队列 (如题目已从题库删除); 堆中的条目由 _clean_top 惰性丢弃"""
+        self._ensure_loaded()
+        self.cards.pop(question_id, None)
+        if self.due_at.pop(question_id, None) is not None:
+            self.submit(DELETE_STATE, (question_id,))
+
+    def enqueue(self, question_ids, now=None):
+        """把题目加入复习队列并立即到期 (如统计中最常答错的题); 已在队列中的保持原排期, 返回新加入的题数"""
+        self._ensure_loaded()
+        now = time.time() if now is None else now
+        added = 0
+        for question_id in question_ids:
+            if question_id in self.due_at:
+                continue
+            card = self.cards[question_id] = ReviewCard(question_id, due=now)
+            self.due_at[question_id] = card.due
+            heapq.heappush(self.heap, (card.due, question_id))
+            self.submit(UPSERT_STATE, card.as_row())
+            added += 1
+        return added
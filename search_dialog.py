@@ -0,0 +1,94 @@
+import time
+
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QListWidget,
+                               QListWidgetItem, QLabel, QTextBrowser)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QFont
+
+from quiz_engine import TYPE_NAMES
+
+
+class NoteSectionDialog(QDialog):
+    """显示单个笔记小节"""
+
+    def __init__(self, result, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"{result['path']} - {result['title']}")
+        self.resize(800, 600)
+
+        layout = QVBoxLayout(self)
+        browser = QTextBrowser()
+        browser.setOpenExternalLinks(True)
+        browser.setMarkdown(result["body"])
+        layout.addWidget(browser)
+
+
+class SearchDialog(QDialog):
+    """全文搜索: 题目 + 课程笔记, 按相关度排序"""
+
+    def __init__(self, search_index, on_jump_question, query="", parent=None, on_open_note=None):
+        super().__init__(parent)
+        self.setWindowTitle("搜索题目 / 笔记")
+        self.resize(800, 550)
+        self.search_index = search_index
+        self.on_jump_question = on_jump_question
+        # 给定时笔记结果在笔记查看器 (notes_viewer.py) 中打开, 否则弹出单个小节
+        self.on_open_note = on_open_note
+
+        layout = QVBoxLayout(self)
+
+        search_layout = QHBoxLayout()
+        self.query_edit = QLineEdit(query)
+        self.query_edit.setFont(QFont("Microsoft YaHei", 11))
+        self.query_edit.setPlaceholderText("输入关键词, 回车搜索...")
+        self.query_edit.setStyleSheet("padding: 6px; border: 1px solid #ccc; border-radius: 4px;")
+        self.query_edit.returnPressed.connect(self.run_search)
+        search_layout.addWidget(self.query_edit)
+        layout.addLayout(search_layout)
+
+        self.info_label = QLabel("")
+        self.info_label.setStyleSheet("color: #555;")
+        layout.addWidget(self.info_label)
+
+        self.result_list = QListWidget()
+        self.result_list.setFont(QFont("Microsoft YaHei", 10))
+        self.result_list.setWordWrap(True)
+        self.result_list.itemClicked.connect(self.open_result)
+        layout.addWidget(self.result_list)
+
+        if query:
+            self.run_search()
+
+    def run_search(self):
+        query = self.query_edit.text().strip()
+        self.result_list.clear()
+        if not query:
+            self.info_label.setText("")
+            return
+
+        started = time.perf_counter()
+        results = self.search_index.search(query)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        for result in results:
+            if result["kind"] == "question":
+                text = f"【{TYPE_NAMES.get(result['type'], '题目')} #{result['question_id']}】 {result['snippet']}"
+            else:
+                text = f"【笔记】 {result['path']} › {result['title']}\n    {result['snippet']}"
+            item = QListWidgetItem(text)
+            item.setData(Qt.UserRole, result)
+            self.result_list.addItem(item)
+
+        self.info_label.setText(f"找到 {len(results)} 条结果 ({elapsed_ms:.1f} ms)")
+
+    def open_result(self, item):
+        result = item.data(Qt.UserRole)
+        if result["kind"] == "question":
+            self.on_jump_question(result["question_id"])
+            self.close()
+        elif self.on_open_note is not None:
+            # 查看器不是模态的, 先关掉搜索框, 否则查看器无法操作
+            self.on_open_note(result["path"], result["line"])
+            self.close()
+        else:
+            NoteSectionDialog(result, self).exec()
@@ -0,0 +1,262 @@
+import os
+import re
+import glob
+import json
+import itertools
+import hashlib
+import sqlite3
+import unicodedata
+
+# 参与索引的笔记文件 (相对于项目目录)
+NOTE_PATTERNS = ["第*章*.md", os.path.join("课堂练习", "*.md")]
+
+SCHEMA = [
+    # 题目全文索引, rowid 即题目 id
+    "CREATE VIRTUAL TABLE IF NOT EXISTS question_fts USING fts5(terms, tokenize='unicode61')",
+    # 题目增删改由触发器登记到这里, refresh 时只处理这些 id
+    "CREATE TABLE IF NOT EXISTS search_dirty (question_id INTEGER PRIMARY KEY)",
+    """CREATE TRIGGER IF NOT EXISTS questions_search_ai AFTER INSERT ON questions BEGIN
+        INSERT OR IGNORE INTO search_dirty VALUES (new.id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS questions_search_au AFTER UPDATE ON questions BEGIN
+        INSERT OR IGNORE INTO search_dirty VALUES (old.id);
+        INSERT OR IGNORE INTO search_dirty VALUES (new.id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS questions_search_ad AFTER DELETE ON questions BEGIN
+        INSERT OR IGNORE INTO search_dirty VALUES (old.id);
+    END""",
+    # 笔记按标题切分成小节, rowid 即 note_sections.id
+    """CREATE TABLE IF NOT EXISTS note_files (
+        path TEXT PRIMARY KEY,
+        mtime REAL NOT NULL,
+        hash TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS note_sections (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        path TEXT NOT NULL,
+        line INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        body TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_note_sections_path ON note_sections(path)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS note_fts USING fts5(terms, tokenize='unicode61')",
+]
+
+_TOKEN_RE = re.compile(r'[㐀-䶿一-鿿豈-﫿]+|[0-9a-z_]+')
+_HEADING_RE = re.compile(r'^(#{1,6})\s*(.*?)\s*#*\s*$')
+
+
+def _is_cjk(run):
+    return run[0] > '⿿'
+
+
+def segment(text, for_query=False):
+    """中文按单字 + 相邻双字切分, 英文数字按词切分
+
+    unicode61 分词器会把整段汉字当成一个词, 这里先把文本切好再交给 FTS5;
+    查询时只用双字 (单字查询除外), 索引时单字、双字都写入。
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    tokens = []
+    for m in _TOKEN_RE.finditer(text):
+        run = m.group()
+        if not _is_cjk(run):
+            tokens.append(run)
+            continue
+        bigrams = [run[i:i + 2] for i in range(len(run) - 1)]
+        if for_query:
+            tokens.extend(bigrams or [run])
+        else:
+            tokens.extend(run)
+            tokens.extend(bigrams)
+    return tokens
+
+
+def split_sections(text, default_title):
+    """按 Markdown 标题切分: [(起始行号, 标题, 正文), ...], 行号从 1 开始"""
+    sections = []
+    title, start, lines = default_title, 1, []
+    for lineno, line in enumerate(text.splitlines(), 1):
+        m = _HEADING_RE.match(line)
+        if m and m.group(2):
+            if any(l.strip() for l in lines):
+                sections.append((start, title, "\n".join(lines)))
+            title = m.group(2).replace("*", "").strip() or default_title
+            start, lines = lineno, [line]
+        else:
+            lines.append(line)
+    if any(l.strip() for l in lines):
+        sections.append((start, title, "\n".join(lines)))
+    return sections
+
+
+def related_query(text, max_terms=64):
+    """按一段文本 (如题干 + 选项) 找相关内容的 MATCH 表达式: 双字词取 OR; 没有可用的词时返回 None"""
+    tokens = list(dict.fromkeys(segment(text, for_query=True)))[:max_terms]
+    return " OR ".join(f'"{t}"' for t in tokens) if tokens else None
+
+
+def make_snippet(text, query, width=40):
+    """截取正文中命中查询词附近的一小段"""
+    flat = " ".join(text.split())
+    pos = flat.lower().find(query.lower())
+    if pos < 0:
+        for token in segment(query, for_query=True):
+            pos = flat.lower().find(token)
+            if pos >= 0:
+                break
+    pos = max(pos, 0)
+    start = max(0, pos - width // 2)
+    snippet = flat[start:start + width * 2]
+    if start > 0:
+        snippet = "…" + snippet
+    if start + width * 2 < len(flat):
+        snippet += "…"
+    return snippet
+
+
+class SearchIndex:
+    """题库 + 课程笔记的全文索引 (SQLite FTS5, 存放在 quiz.db 中)"""
+
+    REFRESH_CHUNK = 1000
+
+    def __init__(self, db_path="quiz.db", base_dir="."):
+        self.db_path = db_path
+        self.base_dir = base_dir
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def refresh(self):
+        """增量重建索引: 只处理变化过的题目和笔记文件"""
+        conn = self._connect()
+        try:
+            fresh = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'question_fts'").fetchone() is None
+            with conn:
+                for sql in SCHEMA:
+                    conn.execute(sql)
+                if fresh:
+                    conn.execute("INSERT OR IGNORE INTO search_dirty SELECT id FROM questions")
+            self._refresh_questions(conn)
+            self._refresh_notes(conn)
+        finally:
+            conn.close()
+
+    def _refresh_questions(self, conn):
+        while True:
+            ids = [r[0] for r in conn.execute(
+                "SELECT question_id FROM search_dirty LIMIT ?", (self.REFRESH_CHUNK,))]
+            if not ids:
+                return
+            marks = ",".join("?" * len(ids))
+            rows = conn.execute(
+                f"SELECT id, question, options FROM questions WHERE id IN ({marks})", ids).fetchall()
+            with conn:
+                conn.execute(f"DELETE FROM question_fts WHERE rowid IN ({marks})", ids)
+                conn.executemany(
+                    "INSERT INTO question_fts (rowid, terms) VALUES (?, ?)",
+                    [(qid, " ".join(segment(question + " " + " ".join(json.loads(options) if options else []))))
+                     for qid, question, options in rows]
+                )
+                conn.execute(f"DELETE FROM search_dirty WHERE question_id IN ({marks})", ids)
+
+    def note_paths(self):
+        paths = []
+        for pattern in NOTE_PATTERNS:
+            paths.extend(glob.glob(os.path.join(self.base_dir, pattern)))
+        return sorted(os.path.relpath(p, self.base_dir) for p in paths)
+
+    def _refresh_notes(self, conn):
+        known = {path: (mtime, digest) for path, mtime, digest in
+                 conn.execute("SELECT path, mtime, hash FROM note_files")}
+        current = self.note_paths()
+
+        for path in current:
+            full_path = os.path.join(self.base_dir, path)
+            mtime = os.path.getmtime(full_path)
+            old = known.get(path)
+            if old and old[0] == mtime:
+                continue
+
+            # mtime 变了再比较内容哈希, 内容未变只更新 mtime
+            with open(full_path, "rb") as f:
+                data = f.read()
+            digest = hashlib.sha1(data).hexdigest()
+            with conn:
+                if not old or old[1] != digest:
+                    self._delete_note(conn, path)
+                    title = os.path.splitext(os.path.basename(path))[0]
+                    for line, heading, body in split_sections(data.decode("utf-8", "replace"), title):
+                        cursor = conn.execute(
+                            "INSERT INTO note_sections (path, line, title, body) VALUES (?, ?, ?, ?)",
+                            (path, line, heading, body))
+                        conn.execute("INSERT INTO note_fts (rowid, terms) VALUES (?, ?)",
+                                     (cursor.lastrowid, " ".join(segment(heading + " " + body))))
+                conn.execute("INSERT OR REPLACE INTO note_files (path, mtime, hash) VALUES (?, ?, ?)",
+                             (path, mtime, digest))
+
+        # 已删除的笔记文件
+        with conn:
+            for path in set(known) - set(current):
+                self._delete_note(conn, path)
+                conn.execute("DELETE FROM note_files WHERE path = ?", (path,))
+
+    def _delete_note(self, conn, path):
+        conn.execute("DELETE FROM note_fts WHERE rowid IN (SELECT id FROM note_sections WHERE path = ?)", (path,))
+        conn.execute("DELETE FROM note_sections WHERE path = ?", (path,))
+
+    def related_notes(self, text, limit=5):
+        """与一段文本 (如题干 + 选项) 最相关的笔记小节: [{path, line, title, score}, ...]"""
+        match = related_query(text)
+        if match is None:
+            return []
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT s.path, s.line, s.title, bm25(note_fts) AS score "
+                "FROM note_fts JOIN note_sections s ON s.id = note_fts.rowid "
+                "WHERE note_fts MATCH ? ORDER BY score LIMIT ?", (match, limit)).fetchall()
+        except sqlite3.OperationalError:
+            # 索引尚未建立
+            return []
+        finally:
+            conn.close()
+        return [{"path": path, "line": line, "title": title, "score": score} for path, line, title, score in rows]
+
+    def search(self, query, limit=50):
+        """返回结果字典列表, kind 为 'question' 或 'note'; 两类结果各按相关度排序后交替排列"""
+        tokens = segment(query, for_query=True)
+        if not tokens:
+            return []
+        match = " ".join(f'"{t}"' for t in tokens)
+
+        conn = self._connect()
+        try:
+            results = []
+            try:
+                q_rows = conn.execute(
+                    "SELECT q.id, q.type, q.question, bm25(question_fts) AS score "
+                    "FROM question_fts JOIN questions q ON q.id = question_fts.rowid "
+                    "WHERE question_fts MATCH ? ORDER BY score LIMIT ?", (match, limit)).fetchall()
+                n_rows = conn.execute(
+                    "SELECT s.id, s.path, s.line, s.title, s.body, bm25(note_fts) AS score "
+                    "FROM note_fts JOIN note_sections s ON s.id = note_fts.rowid "
+                    "WHERE note_fts MATCH ? ORDER BY score LIMIT ?", (match, limit)).fetchall()
+            except sqlite3.OperationalError:
+                # 索引尚未建立
+                return []
+
+            questions = [{"kind": "question", "question_id": qid, "type": q_type,
+                          "title": question, "snippet": make_snippet(question, query), "score": score}
+                         for qid, q_type, question, score in q_rows]
+            notes = [{"kind": "note", "section_id": sid, "path": path, "line": line,
+                      "title": title, "snippet": make_snippet(body, query), "body": body, "score": score}
+                     for sid, path, line, title, body, score in n_rows]
+
+            # 两张表的 bm25 基于各自的词频统计, 不能直接比较; 各自按名次排好后交替合并
+            for pair in itertools.zip_longest(questions, notes):
+                results.extend(r for r in pair if r is not None)
+            return results[:limit]
+        finally:
+            conn.close()
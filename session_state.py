@@ -0,0 +1,119 @@
+from array import array
+from bisect import bisect_right, insort
+
+# 每答对一题的得分
+SCORE_PER_CORRECT = 10
+
+# 状态码: 每道题只占一个字节
+UNANSWERED = 0
+CORRECT = 1
+WRONG = 2
+
+STATUS_NAMES = {UNANSWERED: None, CORRECT: 'correct', WRONG: 'wrong'}
+STATUS_CODES = {name: code for code, name in STATUS_NAMES.items()}
+
+
+class TypeStats:
+    """单个题型的作答统计"""
+
+    __slots__ = ("answered", "correct", "wrong")
+
+    def __init__(self):
+        self.answered = 0
+        self.correct = 0
+        self.wrong = 0
+
+
+class UnansweredView:
+    """未作答题目下标的只读序列, 由已作答的有序下标反推, 不占用 O(n) 内存"""
+
+    def __init__(self, session):
+        self.session = session
+
+    def __len__(self):
+        return len(self.session) - self.session.answered
+
+    def __getitem__(self, r):
+        if not 0 <= r < len(self):
+            raise IndexError("下标越界")
+        # 找最小的 x, 使 [0, x] 内未作答题数 >= r + 1
+        lo, hi = 0, len(self.session) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if mid + 1 - self.session.answered_upto(mid) >= r + 1:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+
+class SessionState:
+    """本次答题的状态: 状态数组 + O(1) 计数器 + 错题/正确题的有序下标"""
+
+    def __init__(self, size):
+        self.status = array('B', bytes(size))
+        self.answered = 0
+        self.correct = 0
+        self.wrong = 0
+        self.by_type = {}
+        # 有序下标列表, 概览过滤和导出直接读取
+        self.correct_indices = []
+        self.wrong_indices = []
+
+    def __len__(self):
+        return len(self.status)
+
+    def __getitem__(self, index):
+        return STATUS_NAMES[self.status[index]]
+
+    @property
+    def score(self):
+        return self.correct * SCORE_PER_CORRECT
+
+    @property
+    def unanswered_indices(self):
+        return UnansweredView(self)
+
+    def indices_of(self, name):
+        """按状态名取下标序列: 'correct' / 'wrong' / 'unanswered'"""
+        if name == 'correct':
+            return self.correct_indices
+        if name == 'wrong':
+            return self.wrong_indices
+        if name == 'unanswered':
+            return self.unanswered_indices
+        raise ValueError(f"未知状态: {name}")
+
+    def answered_upto(self, index):
+        """[0, index] 内已作答的题数"""
+        return bisect_right(self.correct_indices, index) + bisect_right(self.wrong_indices, index)
+
+    def record(self, index, q_type, is_correct):
+        """登记一次作答; 重复作答时先撤销旧状态"""
+        old = self.status[index]
+        if old != UNANSWERED:
+            self._apply(index, q_type, old, -1)
+        new = CORRECT if is_correct else WRONG
+        self.status[index] = new
+        self._apply(index, q_type, new, 1)
+
+    def _apply(self, index, q_type, code, delta):
+        stats = self.by_type.get(q_type)
+        if stats is None:
+            stats = self.by_type[q_type] = TypeStats()
+
+        self.answered += delta
+        stats.answered += delta
+        if code == CORRECT:
+            self.correct += delta
+            stats.correct += delta
+            indices = self.correct_indices
+        else:
+            self.wrong += delta
+            stats.wrong += delta
+            indices = self.wrong_indices
+
+        if delta > 0:
+            insort(indices, index)
+        else:
+            indices.pop(bisect_right(indices, index) - 1)
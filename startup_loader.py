@@ -0,0 +1,119 @@
+import sys
+import time
+import sqlite3
+
+from PySide6.QtCore import QThread, Signal
+
+from question_source import QuestionSource
+from perf_trace import tracer
+
+
+class StartupProfiler:
+    """--profile-startup: 记录启动各阶段相对 main 模块开始导入时的耗时; 未开启时 mark 为空操作"""
+
+    def __init__(self, enabled, started_at):
+        self.enabled = enabled
+        self.started_at = started_at
+        self.marks = []
+
+    def mark(self, name, at=None):
+        if self.enabled:
+            self.marks.append((name, time.perf_counter() if at is None else at))
+
+    def has(self, name):
+        return any(mark == name for mark, _ in self.marks)
+
+    def report(self, file=sys.stderr):
+        if not self.enabled:
+            return
+        print("=== 启动耗时 ===", file=file)
+        for name, at in self.marks:
+            print(f"  {name:<12} {(at - self.started_at) * 1000:8.1f} ms", file=file)
+
+
+class StartupLoader(QThread):
+    """后台加载题库规模、上次会话和复习队列; 首题已在界面上时用户可以先答题
+
+    SQLite 连接默认不能跨线程使用 (check_same_thread), 所以这里打开的 QuestionSource
+    在本线程内关闭, 由界面线程凭 count 重新打开。AttemptStore 和 ReviewScheduler 在这里
+    创建后交给界面线程使用: 二者不持有连接, 每次调用都在调用方线程上临时打开连接;
+    唯一的长连接属于 AttemptStore 启动的 DbWriter 线程, 只在该线程内打开和使用,
+    其他线程经线程安全的 queue.Queue 提交写入。
+    """
+
+    loaded = Signal(object)     # 结果字典
+    failed = Signal(str)
+
+    def __init__(self, db_path="quiz.db", parent=None, server=None, paper_id=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.server = server
+        self.paper_id = paper_id
+
+    def run(self):
+        with tracer.span("startup_load"):
+            if self.server:
+                self._load_remote()
+            else:
+                self._load()
+
+    def _load(self):
+        # 这些模块只在后台用到, 推迟到这里导入
+        from attempt_store import AttemptStore
+        from review_scheduler import ReviewScheduler
+
+        store = None
+        try:
+            source = QuestionSource(self.db_path)
+            try:
+                count = len(source)
+                store = AttemptStore(self.db_path)
+                scheduler = ReviewScheduler(self.db_path, store.writer.submit)
+                if self.paper_id is not None:
+                    # 按试卷答题: 每次都是一个新的试卷会话
+                    session_id, rows = store.new_session(self.paper_id), []
+                else:
+                    session_id, rows = store.last_session()
+                    if session_id is None:
+                        session_id = store.new_session()
+                index_map = source.indexes_of(row[0] for row in rows)
+            finally:
+                source.close()
+        except sqlite3.Error as e:
+            if store is not None:
+                store.close()
+            self.failed.emit(f"无法读取作答记录, 本次答题将不会保存: {e}")
+            return
+
+        self.loaded.emit({
+            "count": count,
+            "attempt_store": store,
+            "scheduler": scheduler,
+            "session_id": session_id,
+            "rows": rows,
+            "index_map": index_map,
+        })
+
+    def _load_remote(self):
+        """服务器模式: 只取题数并新建会话, 作答记录和复习队列都不在本地"""
+        from quiz_client import QuizClient
+
+        client = QuizClient(self.server)
+        try:
+            info = client.info()
+            session_id = client.new_session()
+        except OSError as e:
+            self.failed.emit(str(e))
+            return
+        finally:
+            client.close()
+
+        self.loaded.emit({
+            "count": info["count"],
+            "page_size": info["page_size"],
+            "attempt_store": None,
+            "scheduler": None,
+            "session_id": session_id,
+            "rows": [],
+            "index_map": {},
+        })
@@ -0,0 +1,46 @@
+"""测试公用的夹具: 临时题库, 不改动仓库中的 quiz.db"""
+import os
+import sys
+import json
+import sqlite3
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from init_db import import_questions, ensure_schema, content_hash, to_db_row  # noqa: E402
+
+
+@pytest.fixture
+def bank_db(tmp_path):
+    """由仓库中的 questions.json 导入的完整题库"""
+    path = str(tmp_path / "quiz.db")
+    import_questions(os.path.join(ROOT, "questions.json"), path)
+    return path
+
+
+@pytest.fixture
+def make_db(tmp_path):
+    """make_db([(type, question, options, answer), ...]) -> 只含这些题的题库路径, id 从 1 起"""
+    def make(questions):
+        path = str(tmp_path / "bank.db")
+        conn = sqlite3.connect(path)
+        try:
+            ensure_schema(conn)
+            with conn:
+                conn.executemany(
+                    "INSERT INTO questions (original_id, type, question, options, answer, content_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [to_db_row((i, q_type, question, options, answer,
+                                content_hash(q_type, question, options, answer)))
+                     for i, (q_type, question, options, answer) in enumerate(questions, 1)])
+        finally:
+            conn.close()
+        return path
+    return make
+
+
+def write_json(path, items):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(items, f, ensure_ascii=False)
@@ -0,0 +1,13 @@
+"""填空题答案匹配"""
+import pytest
+
+from answer_matcher import SELF_CHECKS, CompiledAnswer, self_check
+
+
+@pytest.mark.parametrize("answer, user_answer, expected", SELF_CHECKS)
+def test_self_checks(answer, user_answer, expected):
+    assert CompiledAnswer(answer).matches(user_answer) is expected
+
+
+def test_bank_answers_match_themselves(bank_db):
+    assert self_check(bank_db) == []
@@ -0,0 +1,30 @@
+"""作答记录的后台写入"""
+import sqlite3
+
+import pytest
+
+from attempt_store import AttemptStore, DbWriter, INSERT_ATTEMPT, now_text
+
+
+def test_failed_batch_drops_only_the_bad_row(bank_db):
+    store = AttemptStore(bank_db)
+    session_id = store.new_session()
+    store.close()
+
+    # 线程启动前先排好队, 三行落在同一批里
+    writer = DbWriter(bank_db)
+    writer.submit(INSERT_ATTEMPT, (session_id, 1, "A", 1, now_text(), None))
+    # is_correct 为 NOT NULL, 这一行写不进去
+    writer.submit(INSERT_ATTEMPT, (session_id, 2, "B", None, now_text(), None))
+    writer.submit(INSERT_ATTEMPT, (session_id, 3, "C", 0, now_text(), None))
+    writer.start()
+    with pytest.raises(sqlite3.OperationalError, match="1 条记录写入失败"):
+        writer.close()
+
+    conn = sqlite3.connect(bank_db)
+    try:
+        rows = conn.execute("SELECT question_id FROM attempts WHERE session_id = ? ORDER BY id",
+                            (session_id,)).fetchall()
+    finally:
+        conn.close()
+    assert rows == [(1,), (3,)]
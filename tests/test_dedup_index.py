@@ -0,0 +1,83 @@
+import sqlite3
+
+from dedup_index import DedupIndex
+from exam_paper import ensure_paper_schema, load_paper, LETTERS
+
+STEM = "下列关于存储器层次结构中高速缓存与主存之间地址映射方式的描述, 正确的是( )。"
+
+
+def add_paper(db, paper_id, items):
+    conn = sqlite3.connect(db)
+    try:
+        ensure_paper_schema(conn)
+        with conn:
+            conn.execute("INSERT INTO papers VALUES (?, 'b', ?, '0', '{}', 'now')", (paper_id, paper_id))
+            conn.executemany("INSERT INTO paper_items VALUES (?, ?, ?, ?, ?)",
+                             [(paper_id, pos) + item for pos, item in enumerate(items, 1)])
+    finally:
+        conn.close()
+
+
+def test_merge_remaps_paper_items_to_kept_question(make_db):
+    db = make_db([
+        ("single_choice", STEM, ["A. 全相联", "B. 直接", "C. 组相联"], "C"),
+        ("single_choice", STEM + " ", ["A. 直接", "B. 全相联", "C. 组相联", "D. 段相联"], "A"),
+        ("true_false", "Cache 对程序员透明。", ["正确 (T)", "错误 (F)"], "T"),
+    ])
+    # 试卷 1 只有重复题 (四个选项的打乱顺序); 试卷 2 同时有两道题
+    add_paper(db, 1, [(2, "CADB", "C"), (3, None, None)])
+    add_paper(db, 2, [(1, "BCA", "B"), (2, "DCBA", "D")])
+
+    DedupIndex(db).merge(1, [2])
+
+    paper = load_paper(db, 1)
+    first = paper[0]
+    assert first.id == 1
+    assert sorted(paper.orders[1]) == list(LETTERS[:3])
+    # 重排后的答案仍指向保留的题的 "组相联"
+    assert first.options[LETTERS.index(first.answer)].endswith("组相联")
+    assert paper.original_answer(first, first.answer) == "C"
+
+    paper = load_paper(db, 2)
+    assert [q.id for q in paper] == [1]
+    assert paper.indexes_of([1]) == {1: 0}
+
+
+def test_similar_to_lists_each_pair_once(make_db):
+    db = make_db([
+        ("single_choice", STEM, ["A. 全相联", "B. 直接"], "A"),
+        ("single_choice", STEM + "!", ["A. 全相联", "B. 直接"], "A"),
+    ])
+    index = DedupIndex(db)
+    index.refresh()
+    pairs = index.similar_to([1, 2])
+    assert [(a, b) for a, b, _ in pairs] == [(1, 2)]
+
+
+def report_pairs(db):
+    index = DedupIndex(db)
+    index.refresh()
+    groups, _ = index.find_groups()
+    return {frozenset(group) for group in groups}
+
+
+def test_template_questions_with_different_answers_are_not_duplicates(bank_db):
+    groups = report_pairs(bank_db)
+    grouped = set().union(*groups)
+    # "英文缩写…的中文名称" 和 "设n=8…需做…次移位/加法" 只是模板相同
+    for qid in (83, 84, 85, 86, 98, 99, 100, 101, 102, 103, 104):
+        assert qid not in grouped
+
+
+def test_rewordings_are_grouped(bank_db):
+    groups = report_pairs(bank_db)
+    # 云计算的填空题与改写成的判断题; 同一道选择题的两种措辞
+    assert frozenset((14, 22)) in groups
+    assert frozenset((144, 168)) in groups
+
+
+def test_similar_to_checks_only_given_questions(bank_db):
+    index = DedupIndex(bank_db)
+    index.refresh()
+    assert [(a, b) for a, b, _ in index.similar_to([22])] == [(14, 22)]
+    assert index.similar_to([83, 84, 86]) == []
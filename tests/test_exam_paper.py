@@ -0,0 +1,77 @@
+"""分层抽样组卷"""
+import json
+import sqlite3
+
+import pytest
+
+from exam_paper import (StrataIndex, PaperGenerator, allocate, ensure_paper_schema, load_paper, option_body,
+                        write_papers_db, LETTERS)
+
+SPEC = {"single_choice": 10, "true_false": 5, "fill_in": 5}
+
+
+@pytest.mark.parametrize("total, sizes", [(8, [3, 3, 3]), (9, [3, 3, 3]), (7, [50, 30, 20]), (5, [1, 1, 100]), (4, [4]), (0, [2, 5])])
+def test_allocate_is_proportional(total, sizes):
+    alloc = allocate(total, sizes)
+    assert sum(alloc) == total
+    n = sum(sizes)
+    for k, size in zip(alloc, sizes):
+        assert k <= size
+        assert abs(k - total * size / n) < 1
+
+
+@pytest.fixture
+def paper_db(bank_db):
+    conn = sqlite3.connect(bank_db)
+    try:
+        ensure_paper_schema(conn)
+        with conn:
+            conn.execute("UPDATE questions SET chapter = id % 3 + 1")
+    finally:
+        conn.close()
+    return bank_db
+
+
+def test_papers_are_reproducible_and_stratified(paper_db):
+    conn = sqlite3.connect(paper_db)
+    try:
+        index = StrataIndex(conn)
+    finally:
+        conn.close()
+    generator = PaperGenerator(index, SPEC, chapters=[1, 2], seed=7)
+    assert sum(k for *_, k in generator.plan) == 20
+    assert {chapter for _, chapter, _, _ in generator.plan} == {1, 2}
+
+    papers = dict(generator.generate(30))
+    assert len({tuple(items) for items in papers.values()}) == 30
+    assert generator.duplicates == 0
+    # 第 n 份试卷只由 (seed, n) 决定
+    assert PaperGenerator(index, SPEC, chapters=[1, 2], seed=7).paper(5) == generator.paper(5)
+    for items in papers.values():
+        assert len({qid for qid, _, _ in items}) == 20
+
+
+def test_loaded_paper_maps_answers_back(paper_db):
+    conn = sqlite3.connect(paper_db)
+    try:
+        generator = PaperGenerator(StrataIndex(conn), SPEC, seed=1)
+        assert write_papers_db(conn, generator, 3, "b1") == 3
+        paper_id = conn.execute("SELECT id FROM papers WHERE batch = 'b1' AND number = 2").fetchone()[0]
+        bank = {qid: (json.loads(options) if options else [], answer)
+                for qid, options, answer in conn.execute("SELECT id, options, answer FROM questions")}
+    finally:
+        conn.close()
+
+    paper = load_paper(paper_db, paper_id)
+    assert len(paper) == 20
+    shuffled = 0
+    for q in paper:
+        options, answer = bank[q.id]
+        assert paper.original_answer(q, q.answer) == answer
+        if q.id in paper.orders:
+            shuffled += 1
+            # 重排后答案字母指向的仍是原来的正确选项
+            assert option_body(q.options[LETTERS.index(q.answer)]) == \
+                option_body(options[LETTERS.index(answer)])
+    assert shuffled == SPEC["single_choice"]
+    assert load_paper(paper_db, paper_id + 100) is None
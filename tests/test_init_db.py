@@ -0,0 +1,38 @@
+"""questions.json 增量导入"""
+import os
+import json
+import sqlite3
+
+from init_db import import_questions
+from tests.conftest import ROOT, write_json
+
+QUESTIONS_JSON = os.path.join(ROOT, "questions.json")
+
+
+def test_reimport_is_idempotent(bank_db):
+    stats = import_questions(QUESTIONS_JSON, bank_db)
+    assert stats["parsed"] == 195
+    assert (stats["inserted"], stats["updated"], stats["unchanged"]) == (0, 0, 195)
+    assert stats["changed"] == []
+
+
+def test_reimport_writes_only_changed_questions(bank_db, tmp_path):
+    with open(QUESTIONS_JSON, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    items[0]["answer"] = "B" if items[0]["answer"] != "B" else "C"
+    items.append(dict(items[1], id=max(item["id"] for item in items) + 1, question="新增的题目"))
+    path = str(tmp_path / "questions.json")
+    write_json(path, items)
+
+    stats = import_questions(path, bank_db)
+    assert (stats["inserted"], stats["updated"], stats["unchanged"]) == (1, 1, 194)
+
+    conn = sqlite3.connect(bank_db)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0] == 196
+        changed = conn.execute(
+            "SELECT original_id, answer FROM questions WHERE id IN ({}) ORDER BY original_id".format(
+                ",".join("?" * len(stats["changed"]))), stats["changed"]).fetchall()
+    finally:
+        conn.close()
+    assert changed == [(items[0]["id"], items[0]["answer"]), (items[-1]["id"], items[-1]["answer"])]
@@ -0,0 +1,40 @@
+"""题库分页读取与题目 id -> 下标"""
+import sqlite3
+
+from question_source import QuestionSource
+from quiz_engine import QuizEngine
+
+
+def delete_questions(db, ids):
+    conn = sqlite3.connect(db)
+    try:
+        with conn:
+            conn.executemany("DELETE FROM questions WHERE id = ?", [(qid,) for qid in ids])
+    finally:
+        conn.close()
+
+
+def test_indexes_of_skips_unknown_ids(bank_db):
+    delete_questions(bank_db, [10, 11])
+    source = QuestionSource(bank_db)
+    try:
+        indexes = source.indexes_of([1, 10, 11, 12, 999])
+        assert indexes == {1: 0, 12: 9}
+        assert source[indexes[12]].id == 12
+        # 与逐页读出的顺序一致
+        ids = [q.id for q in source]
+        assert source.indexes_of(ids[::7]) == {qid: i for i, qid in enumerate(ids) if i % 7 == 0}
+    finally:
+        source.close()
+
+
+def test_restore_skips_deleted_questions(bank_db):
+    delete_questions(bank_db, [2])
+    source = QuestionSource(bank_db)
+    try:
+        engine = QuizEngine(source)
+        engine.restore([(1, source[0].type, source[0].answer, 1), (2, "fill_in", "x", 0)])
+        assert engine.session.answered == 1
+        assert engine.answers == {0: source[0].answer}
+    finally:
+        source.close()
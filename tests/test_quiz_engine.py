@@ -0,0 +1,33 @@
+"""批量阅卷"""
+from quiz_engine import AnswerKey, grade_submissions
+from session_state import SCORE_PER_CORRECT
+
+QUESTIONS = [
+    ("single_choice", "CPU 中保存下一条指令地址的是( )。", ["A. PC", "B. IR", "C. MAR", "D. MDR"], "A"),
+    ("true_false", "主存储器由 SRAM 构成。", ["正确 (T)", "错误 (F)"], "F"),
+    ("fill_in", "2 的 6 次方是______, 十六进制写作______。", [], "64、40H"),
+]
+
+
+def test_grade_submissions(make_db):
+    key = AnswerKey(make_db(QUESTIONS))
+    assert len(key) == 3
+    submissions = [
+        ("张三", 1, " a "),
+        ("张三", 2, "T"),
+        ("张三", 3, "2^6, 0x40"),
+        ("李四", 1, "B"),
+        ("李四", 3, "64 40h"),
+        ("李四", 99, "A"),
+    ]
+    graded = []
+    report = grade_submissions(submissions, key, lambda chunk, results: graded.extend(results), chunk_size=4)
+
+    assert [correct for _, correct in graded] == [True, False, True, False, True, None]
+    assert report.total == 5
+    assert report.correct == 3
+    assert report.unknown == 1
+    assert report.score == 3 * SCORE_PER_CORRECT
+    assert report.by_student == {"张三": [3, 2], "李四": [2, 1]}
+    assert report.by_type == {"single_choice": [2, 1], "true_false": [1, 0], "fill_in": [2, 2]}
+    assert report.by_question[3] == [2, 2]
@@ -0,0 +1,108 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from attempt_store import AttemptStore
+from quiz_client import QuizClient, QuizServerError
+from quiz_server import QuizService
+
+
+@pytest.fixture
+def server(bank_db):
+    """在后台线程的事件循环中运行 QuizService, 产出 (数据库路径, 地址)"""
+    service = QuizService(bank_db, 2)
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    holder = {}
+
+    async def start():
+        holder["server"] = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+        ready.set()
+
+    thread = threading.Thread(target=lambda: (loop.run_until_complete(start()), loop.run_forever()), daemon=True)
+    thread.start()
+    ready.wait(5)
+    port = holder["server"].sockets[0].getsockname()[1]
+    yield bank_db, f"127.0.0.1:{port}"
+
+    async def stop():
+        holder["server"].close()
+        await holder["server"].wait_closed()
+        # wait_closed 不等连接处理协程; 取消并等它们收尾, 免得留到垃圾回收时才结束
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(stop(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+    service.close()
+
+
+def test_round_trip_grades_and_records(server):
+    db, address = server
+    client = QuizClient(address)
+    try:
+        info = client.info()
+        assert info["count"] == 195
+        first = client.page(0)[0]
+        assert first.answer is None
+        session_id = client.new_session()
+        assert client.submit(session_id, first.id, "a") == (True, "A")
+        assert client.submit(session_id, first.id, "B") == (False, "A")
+        assert client.indexes_of([first.id]) == {first.id: 0}
+        with pytest.raises(QuizServerError):
+            client.submit(session_id + 1000, first.id, "A")
+    finally:
+        client.close()
+
+
+def test_sessions_do_not_collide_with_another_writer(server):
+    db, address = server
+    client = QuizClient(address)
+    desktop = AttemptStore(db)
+    try:
+        first = client.new_session()
+        # 桌面端在服务运行期间也新建了会话
+        other = desktop.new_session()
+        second = client.new_session()
+        assert len({first, other, second}) == 3
+        client.submit(second, 1, "A")
+    finally:
+        client.close()
+        desktop.close()
+
+    conn = sqlite3.connect(db)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM sessions WHERE id IN (?, ?, ?)",
+                            (first, other, second)).fetchone()[0] == 3
+    finally:
+        conn.close()
+
+
+def test_post_is_not_resent_after_the_request_went_out(server, monkeypatch):
+    db, address = server
+    client = QuizClient(address)
+    sent = []
+    try:
+        session_id = client.new_session()
+        real_request = client.conn.request
+
+        def request(method, path, body=None, headers={}):
+            sent.append(path)
+            real_request(method, path, body, headers)
+
+        def lost_response():
+            raise TimeoutError("timed out")
+
+        monkeypatch.setattr(client.conn, "request", request)
+        monkeypatch.setattr(client.conn, "getresponse", lost_response)
+        with pytest.raises(QuizServerError):
+            client.submit(session_id, 1, "A")
+        assert sent == ["/api/answers"]
+    finally:
+        client.close()
@@ -0,0 +1,63 @@
+"""间隔复习调度 (SM-2 + 小顶堆)"""
+import pytest
+
+from review_scheduler import (ReviewCard, ReviewScheduler, UPSERT_STATE, DELETE_STATE, DAY_SECONDS,
+                              AGAIN_DELAY_SECONDS, MIN_EASE, QUALITY_CORRECT, QUALITY_WRONG)
+
+
+def test_sm2_intervals():
+    card = ReviewCard(1)
+    for expected in (1.0, 6.0, 6.0 * card.ease):
+        ease = card.ease
+        card.review(QUALITY_CORRECT, now=0)
+        assert card.interval == pytest.approx(round(expected, 2))
+        assert card.due == pytest.approx(card.interval * DAY_SECONDS)
+        # 评分 4 时易度因子不变
+        assert card.ease == ease
+
+    card.review(QUALITY_WRONG, now=100)
+    assert (card.reps, card.lapses, card.interval) == (0, 1, 0.0)
+    assert card.due == 100 + AGAIN_DELAY_SECONDS
+    for _ in range(10):
+        card.review(QUALITY_WRONG, now=100)
+    assert card.ease == MIN_EASE
+
+
+def test_scheduler_orders_by_due_time(tmp_path):
+    writes = []
+    scheduler = ReviewScheduler(str(tmp_path / "review.db"), lambda sql, params: writes.append((sql, params)))
+    assert scheduler.due_questions(now=0) == []
+
+    # 答对且不在队列中的题不加入; 答错的题一分钟后到期
+    scheduler.record(1, True, now=0)
+    assert len(scheduler) == 0
+    scheduler.record(2, False, now=0)
+    assert scheduler.enqueue([3, 2], now=10) == 1
+    assert scheduler.due_questions(now=20, limit=5) == [3]
+    assert scheduler.due_questions(now=AGAIN_DELAY_SECONDS, limit=5) == [3, 2]
+
+    # 重新排期后旧的堆条目失效
+    scheduler.record(3, True, now=30)
+    assert scheduler.due_questions(now=AGAIN_DELAY_SECONDS, limit=5) == [2]
+    assert scheduler.next_due_time() == AGAIN_DELAY_SECONDS
+
+    scheduler.discard(2)
+    assert scheduler.next_due_time() == 30 + DAY_SECONDS
+    assert [sql for sql, _ in writes] == [UPSERT_STATE] * 3 + [DELETE_STATE]
+
+
+def test_state_survives_restart(tmp_path):
+    from attempt_store import DbWriter
+
+    db = str(tmp_path / "review.db")
+    writer = DbWriter(db)
+    scheduler = ReviewScheduler(db, writer.submit)
+    writer.start()
+    scheduler.record(5, False, now=0)
+    scheduler.record(5, True, now=100)
+    writer.close()
+
+    reloaded = ReviewScheduler(db, lambda sql, params: None)
+    assert reloaded.next_due_time() == 100 + DAY_SECONDS
+    reloaded.record(5, True, now=200)
+    assert reloaded.cards[5].reps == 2
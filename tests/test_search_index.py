@@ -0,0 +1,17 @@
+"""题库 + 笔记全文检索"""
+from search_index import SearchIndex
+
+
+def test_search_interleaves_questions_and_notes(bank_db, tmp_path):
+    (tmp_path / "第3章 存储系统.md").write_text(
+        "# 存储器\n\n" + "".join(f"## 第{i}节\n\n主存储器与高速缓存的地址映射{i}。\n\n" for i in range(5)),
+        encoding="utf-8")
+    index = SearchIndex(bank_db, str(tmp_path))
+    index.refresh()
+
+    results = index.search("存储器", limit=6)
+    kinds = [r["kind"] for r in results]
+    assert kinds == ["question", "note"] * 3
+    for kind in ("question", "note"):
+        scores = [r["score"] for r in results if r["kind"] == kind]
+        assert scores == sorted(scores)
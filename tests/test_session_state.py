@@ -0,0 +1,12 @@
+from session_state import SessionState, SCORE_PER_CORRECT
+
+
+def test_record_counts_each_question_once():
+    session = SessionState(3)
+    session.record(0, "single_choice", False)
+    session.record(0, "single_choice", True)
+    session.record(2, "fill_in", True)
+    assert session.answered == 2
+    assert session.score == 2 * SCORE_PER_CORRECT
+    assert session[0] == "correct"
+    assert session[1] is None
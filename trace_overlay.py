@@ -0,0 +1,54 @@
+from PySide6.QtWidgets import QLabel
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QFont
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+class FrameOverlay(QLabel):
+    """浮在主窗口右下角 (底部按钮上方), 显示最近 N 次翻题耗时 (来自 NavLatency); F12 开关"""
+
+    def __init__(self, nav_latency, parent, count=40, interval_ms=250):
+        super().__init__(parent)
+        self.nav_latency = nav_latency
+        self.count = count
+        self.setFont(QFont("Consolas", 9))
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 170); color: #7CFC00; padding: 4px 6px; "
+                           "border-radius: 4px;")
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.hide()
+
+        # 只在可见时刷新
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.refresh)
+
+    def toggle(self):
+        self.set_active(not self.isVisible())
+
+    def set_active(self, active):
+        if active:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start()
+        else:
+            self.timer.stop()
+            self.hide()
+
+    def refresh(self):
+        samples = list(self.nav_latency.samples)[-self.count:]
+        target = self.nav_latency.target_ms
+        if samples:
+            # 以耗时目标为满格, 超出目标的统一显示为最高格
+            top = len(SPARK_CHARS) - 1
+            spark = "".join(SPARK_CHARS[min(top, int(ms / target * top))] for ms in samples)
+            last = samples[-1]
+        else:
+            spark, last = "-", 0.0
+        self.setText(f"翻题 {len(samples)} 次  最近 {last:.2f} ms\n{spark}\n"
+                     f"p50 {self.nav_latency.percentile(50):.2f}  p95 {self.nav_latency.percentile(95):.2f}  "
+                     f"超时 {self.nav_latency.over_target} (>{target:.0f} ms)")
+        self.adjustSize()
+        parent = self.parentWidget()
+        self.move(parent.width() - self.width() - 10, parent.height() - self.height() - 80)